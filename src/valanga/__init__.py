@@ -1,6 +1,7 @@
 """Common types and utilities shared by multiple libraries."""
 
 from .checkpoints import (
+    BatchStateCheckpointCodec,
     CheckpointStateSummary,
     IncrementalStateCheckpointCodec,
     StateCheckpointCodec,
@@ -25,16 +26,18 @@ from .game import (
     StateTag,
     TurnState,
 )
-from .over_event import Outcome, OverEvent
+from .over_event import Outcome, OverEvent, intern_over_event
 from .progress_messsage import PlayerProgressMessage
 from .representation_factory import RepresentationFactory
 from .represention_for_evaluation import ContentRepresentation
 from .reversible_dynamics import ReversibleDynamics
+from .transposition_table import ReplacementPolicy, TranspositionTable
 
 __all__ = [
     "BLACK",
     "SOLO",
     "WHITE",
+    "BatchStateCheckpointCodec",
     "BranchKey",
     "BranchKeyGeneratorP",
     "Color",
@@ -47,6 +50,7 @@ __all__ = [
     "Outcome",
     "OverEvent",
     "PlayerProgressMessage",
+    "ReplacementPolicy",
     "RepresentationFactory",
     "ReversibleDynamics",
     "Role",
@@ -59,5 +63,7 @@ __all__ = [
     "StateModifications",
     "StateTag",
     "Transition",
+    "TranspositionTable",
     "TurnState",
+    "intern_over_event",
 ]
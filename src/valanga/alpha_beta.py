@@ -0,0 +1,348 @@
+"""Iterative-deepening negamax search over ``ReversibleDynamics``.
+
+``AlphaBetaSelector`` is a reference ``BranchSelector`` for two-player games
+whose acting roles are :class:`~valanga.game.Color`. It explores the tree by
+pushing and popping actions on a single reversible dynamics object, so no state
+is copied during the search.
+
+``recommend`` runs a plain recursive negamax. :meth:`AlphaBetaSelector.start`
+returns a session that runs in bounded steps; it searches with a generator
+twin of negamax that can pause after any node, which costs a generator per
+node and is only paid by stepped searches.
+"""
+
+import math
+import random
+from collections.abc import Callable, Generator, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from .evaluations import Certainty, StateEvaluator, Value
+from .game import BranchKey, BranchName, Color, Seed, TurnState
+from .policy import (
+    NoBranchToRecommendError,
+    NotifyProgressCallable,
+    Recommendation,
+    SearchSession,
+    run_to_completion,
+)
+from .reversible_dynamics import ReversibleDynamics
+
+__all__ = ["AlphaBetaSelector"]
+
+
+def _sign(turn: Color) -> float:
+    """Return +1 when white is to act and -1 when black is to act."""
+    return 1.0 if turn is Color.WHITE else -1.0
+
+
+type _SearchResult = tuple[float, list[BranchKey], Value]
+
+
+class _NegamaxSearch[StateT: TurnState[Color], UndoT]:
+    """State of one iterative-deepening search."""
+
+    def __init__(
+        self,
+        dynamics: ReversibleDynamics[StateT, UndoT],
+        evaluator: StateEvaluator[StateT],
+    ) -> None:
+        self.dynamics = dynamics
+        self.evaluator = evaluator
+        self.nodes = 0
+        self.pause_at = math.inf
+        self.pv_hint: list[BranchKey] = []
+
+    def _ordered(
+        self, actions: Sequence[BranchKey], ply: int, on_pv: bool
+    ) -> Sequence[BranchKey]:
+        """Try the previous iteration's principal move first."""
+        if not on_pv or ply >= len(self.pv_hint):
+            return actions
+        hint = self.pv_hint[ply]
+        if hint not in actions:
+            return actions
+        return [hint, *(action for action in actions if action != hint)]
+
+    def _children(
+        self, state: StateT, depth: int, ply: int, on_pv: bool
+    ) -> Sequence[BranchKey]:
+        """Return the actions to search from ``state``, none at a leaf."""
+        if depth <= 0 or state.is_game_over():
+            return ()
+        return self._ordered(self.dynamics.legal_actions().get_all(), ply, on_pv)
+
+    def _leaf(self, state: StateT) -> _SearchResult:
+        """Return the static evaluation of ``state`` as a search result."""
+        leaf = self.evaluator(state)
+        return _sign(state.turn) * leaf.score, [], leaf
+
+    def negamax(
+        self, depth: int, alpha: float, beta: float, ply: int, on_pv: bool
+    ) -> _SearchResult:
+        """Return the side-to-act score, principal variation and its leaf value."""
+        self.nodes += 1
+        state = self.dynamics.state
+        actions = self._children(state, depth, ply, on_pv)
+        if not actions:
+            return self._leaf(state)
+
+        best: _SearchResult | None = None
+        best_score = -math.inf
+        first = True
+        for action in actions:
+            undo = self.dynamics.push(action)
+            try:
+                child = self.negamax(depth - 1, -beta, -alpha, ply + 1, on_pv and first)
+            finally:
+                self.dynamics.pop(undo)
+            first = False
+            score = -child[0]
+            if score > best_score:
+                best_score = score
+                best = score, [action, *child[1]], child[2]
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        assert best is not None
+        return best
+
+    def negamax_steps(
+        self, depth: int, alpha: float, beta: float, ply: int, on_pv: bool
+    ) -> Generator[None, None, _SearchResult]:
+        """Run :meth:`negamax` as a generator that can pause the whole search.
+
+        The generator yields once ``pause_at`` nodes have been visited.
+        """
+        self.nodes += 1
+        if self.nodes >= self.pause_at:
+            yield
+        state = self.dynamics.state
+        actions = self._children(state, depth, ply, on_pv)
+        if not actions:
+            return self._leaf(state)
+
+        best: _SearchResult | None = None
+        best_score = -math.inf
+        first = True
+        for action in actions:
+            undo = self.dynamics.push(action)
+            try:
+                child = yield from self.negamax_steps(
+                    depth - 1, -beta, -alpha, ply + 1, on_pv and first
+                )
+            finally:
+                self.dynamics.pop(undo)
+            first = False
+            score = -child[0]
+            if score > best_score:
+                best_score = score
+                best = score, [action, *child[1]], child[2]
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        assert best is not None
+        return best
+
+
+def _root_value(score: float, leaf: Value, line: list[BranchKey]) -> Value:
+    """Build the value of a root branch from the leaf of its exact line."""
+    certainty = (
+        Certainty.ESTIMATE if leaf.certainty is Certainty.ESTIMATE else Certainty.FORCED
+    )
+    return Value(
+        score=score, certainty=certainty, over_event=leaf.over_event, line=line
+    )
+
+
+class _AlphaBetaSession[StateT: TurnState[Color], UndoT]:
+    """Resumable iterative-deepening search of one root state.
+
+    Only a ``stepped`` session pauses within a depth; the others run every
+    depth through the plain recursive negamax.
+    """
+
+    def __init__(
+        self,
+        selector: "AlphaBetaSelector[StateT, UndoT, Any]",
+        dynamics: ReversibleDynamics[StateT, UndoT],
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None,
+        *,
+        stepped: bool,
+    ) -> None:
+        if dynamics.state.is_game_over():
+            raise NoBranchToRecommendError
+        self.search = _NegamaxSearch(dynamics, selector.evaluator)
+        self.root_actions = list(dynamics.legal_actions().get_all())
+        if not self.root_actions:
+            raise NoBranchToRecommendError
+        random.Random(seed).shuffle(self.root_actions)
+        self.selector = selector
+        self.notify_progress = notify_progress
+        self._stepped = stepped
+        self._best: Recommendation | None = None
+        self._iterations: Generator[None] | None = self._deepen()
+
+    @property
+    def nodes(self) -> int:
+        """Return the number of nodes searched so far."""
+        return self.search.nodes
+
+    def best(self) -> Recommendation | None:
+        """Return the recommendation of the last completed depth."""
+        return self._best
+
+    def step(self, max_nodes: float = math.inf) -> bool:
+        """Search about ``max_nodes`` more nodes and return whether it is over."""
+        if self._iterations is None:
+            return True
+        self.search.pause_at = self.search.nodes + max_nodes
+        try:
+            next(self._iterations)
+        except StopIteration:
+            self._iterations = None
+        return self._iterations is None
+
+    def _deepen(self) -> Generator[None]:
+        root_actions = self.root_actions
+        max_depth = self.selector.max_depth
+        for depth in range(1, max_depth + 1):
+            best_action = yield from self._search_depth(depth)
+            # Search the principal branch first at the next depth.
+            root_actions.remove(best_action)
+            root_actions.insert(0, best_action)
+            if self.notify_progress is not None:
+                self.notify_progress(100 * depth // max_depth)
+
+    def _search_depth(self, depth: int) -> Generator[None, None, BranchKey]:
+        """Search every root branch to ``depth`` and return the best one.
+
+        Without ``exact_root_evals``, a branch that fails low only has an upper
+        bound and a refutation instead of a principal variation, so its
+        evaluation is a bare estimate.
+        """
+        dynamics = self.search.dynamics
+        sign = _sign(dynamics.state.turn)
+        branch_evals: dict[BranchName, Value] = {}
+        alpha = -math.inf
+        best: tuple[BranchKey, Value] | None = None
+        for index, action in enumerate(self.root_actions):
+            undo = dynamics.push(action)
+            try:
+                child = yield from self._search_branch(
+                    depth - 1,
+                    math.inf if self.selector.exact_root_evals else -alpha,
+                    on_pv=index == 0,
+                )
+            finally:
+                dynamics.pop(undo)
+            score = -child[0]
+            line = [action, *child[1]]
+            if best is None or score > alpha or self.selector.exact_root_evals:
+                value = _root_value(sign * score, child[2], line)
+            else:
+                value = Value(score=sign * score, certainty=Certainty.ESTIMATE)
+            branch_evals[dynamics.action_name(action)] = value
+            if best is None or score > alpha:
+                best = action, value
+                self.search.pv_hint = line
+                alpha = score
+
+        assert best is not None
+        self._best = Recommendation(
+            recommended_name=dynamics.action_name(best[0]),
+            evaluation=best[1],
+            branch_evals=branch_evals,
+        )
+        return best[0]
+
+    def _search_branch(
+        self, depth: int, beta: float, on_pv: bool
+    ) -> Generator[None, None, _SearchResult]:
+        """Search below a root branch, pausing only in a stepped session."""
+        if self._stepped:
+            return (
+                yield from self.search.negamax_steps(
+                    depth, -math.inf, beta, ply=1, on_pv=on_pv
+                )
+            )
+        return self.search.negamax(depth, -math.inf, beta, ply=1, on_pv=on_pv)
+
+
+@dataclass
+class AlphaBetaSelector[StateT: TurnState[Color], UndoT, RootT = StateT]:
+    """Iterative-deepening negamax with alpha-beta pruning.
+
+    ``RootT`` is the type of the states given to ``recommend``, and ``StateT``
+    the type of the live state of the reversible dynamics, which may be a
+    mutable board standing for the same positions.
+
+    Attributes:
+        dynamics_factory: Builds the reversible dynamics positioned at the root
+            state. The search only uses ``push``/``pop`` on that object.
+        evaluator: Static evaluation of the live state at leaves and terminal
+            positions, with scores from the point of view of ``Color.WHITE``.
+        max_depth: The last iterative-deepening depth, in plies.
+        exact_root_evals: Whether to search every root branch with a full
+            window so that ``branch_evals`` holds exact scores instead of
+            bounds. Root branches are then not pruned.
+
+    """
+
+    dynamics_factory: Callable[[RootT], ReversibleDynamics[StateT, UndoT]]
+    evaluator: StateEvaluator[StateT]
+    max_depth: int = 4
+    exact_root_evals: bool = False
+
+    def recommend(
+        self,
+        state: RootT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> Recommendation:
+        """Search ``state`` and recommend the branch of the principal variation.
+
+        Args:
+            state (RootT): The root state.
+            seed (Seed): Seed used to break ties between equally scored branches.
+            notify_progress (NotifyProgressCallable | None): Optional callback
+                receiving the completed percentage after each depth.
+
+        Returns:
+            Recommendation: The best branch, its evaluation with ``line`` set to
+            the principal variation, and the evaluations of the root branches.
+
+        Raises:
+            NoBranchToRecommendError: If ``state`` is over or has no action.
+
+        """
+        return run_to_completion(
+            _AlphaBetaSession(
+                self,
+                self.dynamics_factory(state),
+                seed,
+                notify_progress,
+                stepped=False,
+            )
+        )
+
+    def start(
+        self,
+        state: RootT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> SearchSession:
+        """Return a search of ``state`` that runs when stepped.
+
+        The best recommendation is updated after each completed depth.
+
+        Raises:
+            NoBranchToRecommendError: If ``state`` is over or has no action.
+
+        """
+        return _AlphaBetaSession(
+            self, self.dynamics_factory(state), seed, notify_progress, stepped=True
+        )
@@ -0,0 +1,168 @@
+"""Policies deciding when an incremental checkpoint records an anchor.
+
+Deltas are small but every delta added to a chain makes restoring its
+descendants slower. An ``AnchorPolicy`` is consulted by
+:meth:`valanga.checkpoint_store.CheckpointStore.append_child` for every child
+and answers whether the child should be stored as a self-contained anchor
+instead of a delta from its parent.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from .checkpoints import IncrementalStateCheckpointCodec
+
+__all__ = ["AdaptiveAnchorPolicy", "AnchorPolicy", "FixedIntervalAnchorPolicy"]
+
+
+class AnchorPolicy[StateT, AnchorRefT, DeltaRefT](Protocol):
+    """Decide between an anchor and a delta for each recorded child."""
+
+    def should_anchor(
+        self,
+        *,
+        parent_chain_depth: int,
+        parent_state: StateT,
+        delta_ref: DeltaRefT,
+        delta_size: int,
+    ) -> bool:
+        """Return whether the child should be recorded as an anchor.
+
+        Args:
+            parent_chain_depth: The number of deltas replayed to restore the
+                parent, 0 when the parent is an anchor.
+            parent_state: The parent state, which the child delta applies to.
+            delta_ref: The delta payload that would be recorded.
+            delta_size: The serialized size of ``delta_ref`` in bytes.
+
+        """
+        ...
+
+    def record_anchor(
+        self, *, state: StateT, anchor_ref: AnchorRefT, anchor_size: int
+    ) -> None:
+        """Observe an anchor that was just recorded."""
+        ...
+
+
+@dataclass
+class FixedIntervalAnchorPolicy[StateT, AnchorRefT, DeltaRefT]:
+    """Record an anchor every ``interval`` deltas along a chain."""
+
+    interval: int
+
+    def should_anchor(
+        self,
+        *,
+        parent_chain_depth: int,
+        parent_state: StateT,
+        delta_ref: DeltaRefT,
+        delta_size: int,
+    ) -> bool:
+        """Anchor once the chain would exceed ``interval`` deltas."""
+        del parent_state, delta_ref, delta_size
+        return parent_chain_depth + 1 > self.interval
+
+    def record_anchor(
+        self, *, state: StateT, anchor_ref: AnchorRefT, anchor_size: int
+    ) -> None:
+        """Ignore anchor statistics, which fixed intervals do not use."""
+        del state, anchor_ref, anchor_size
+
+
+def _smooth(average: float | None, sample: float, smoothing: float) -> float:
+    """Return the exponential moving average updated with ``sample``."""
+    if average is None:
+        return sample
+    return average + smoothing * (sample - average)
+
+
+@dataclass
+# pylint: disable-next=too-many-instance-attributes
+class AdaptiveAnchorPolicy[StateT, AnchorRefT, DeltaRefT]:
+    """Bound the worst-case restore latency with as few anchors as possible.
+
+    The policy times ``load_child_from_delta`` and ``load_anchor_ref`` on a
+    sample of the recorded payloads, and tracks moving averages of those costs
+    and of the anchor size. A child is anchored when:
+
+    - restoring it would take ``anchor_load + depth * delta_load`` seconds,
+      which exceeds ``max_restore_seconds``, or
+    - its delta is not smaller than ``max_delta_size_ratio`` times an average
+      anchor, so the anchor costs no more storage than the delta, or
+    - its chain would exceed ``max_chain_depth``, when one is given.
+
+    The bound can only be met when it exceeds the time to load one anchor.
+
+    Attributes:
+        codec: The codec whose load costs are measured.
+        max_restore_seconds: The restore latency bound of any node.
+        sample_every: Time one payload every ``sample_every`` records.
+        smoothing: Weight of a new sample in the moving averages.
+        max_delta_size_ratio: Delta-to-anchor size ratio above which anchoring
+            is always preferred.
+        max_chain_depth: Optional hard cap on the delta chain length.
+
+    """
+
+    codec: IncrementalStateCheckpointCodec[StateT, AnchorRefT, DeltaRefT]
+    max_restore_seconds: float
+    sample_every: int = 64
+    smoothing: float = 0.1
+    max_delta_size_ratio: float = 1.0
+    max_chain_depth: int | None = None
+    delta_load_seconds: float | None = field(default=None, init=False)
+    anchor_load_seconds: float | None = field(default=None, init=False)
+    anchor_size: float | None = field(default=None, init=False)
+    _delta_count: int = field(default=0, init=False, repr=False)
+    _anchor_count: int = field(default=0, init=False, repr=False)
+
+    def predicted_restore_seconds(self, chain_depth: int) -> float:
+        """Return the estimated time to restore a node ``chain_depth`` deltas deep."""
+        return (self.anchor_load_seconds or 0.0) + chain_depth * (
+            self.delta_load_seconds or 0.0
+        )
+
+    def should_anchor(
+        self,
+        *,
+        parent_chain_depth: int,
+        parent_state: StateT,
+        delta_ref: DeltaRefT,
+        delta_size: int,
+    ) -> bool:
+        """Return whether the child should be recorded as an anchor."""
+        if self._delta_count % self.sample_every == 0:
+            start = time.perf_counter()
+            self.codec.load_child_from_delta(
+                parent_state=parent_state, delta_ref=delta_ref
+            )
+            self.delta_load_seconds = _smooth(
+                self.delta_load_seconds, time.perf_counter() - start, self.smoothing
+            )
+        self._delta_count += 1
+
+        depth = parent_chain_depth + 1
+        if self.max_chain_depth is not None and depth > self.max_chain_depth:
+            return True
+        if (
+            self.anchor_size is not None
+            and delta_size >= self.max_delta_size_ratio * self.anchor_size
+        ):
+            return True
+        return self.predicted_restore_seconds(depth) > self.max_restore_seconds
+
+    def record_anchor(
+        self, *, state: StateT, anchor_ref: AnchorRefT, anchor_size: int
+    ) -> None:
+        """Update the anchor size and, on sampled anchors, the anchor load time."""
+        del state
+        self.anchor_size = _smooth(self.anchor_size, anchor_size, self.smoothing)
+        if self._anchor_count % self.sample_every == 0:
+            start = time.perf_counter()
+            self.codec.load_anchor_ref(anchor_ref)
+            self.anchor_load_seconds = _smooth(
+                self.anchor_load_seconds, time.perf_counter() - start, self.smoothing
+            )
+        self._anchor_count += 1
@@ -0,0 +1,263 @@
+"""Asyncio front end for branch selectors, with budgets and cancellation.
+
+A game server multiplexing many games on one event loop cannot block it for a
+whole search, nor dedicate a thread to every game. ``SteppedAsyncSelector``
+runs a :class:`~valanga.policy.SteppableBranchSelector` in small node
+chunks, yielding to the event loop between chunks, so thousands of searches
+can share one loop. ``ThreadedAsyncSelector`` is the fallback for selectors
+that cannot be stepped: their search runs in a worker thread through
+:func:`asyncio.to_thread`.
+
+Both return an :class:`AsyncSearch` handle from ``start``. The handle gives
+the best recommendation found so far at any time, can be cancelled
+cooperatively, and resolves to the best recommendation once the search ends,
+its :class:`SearchBudget` runs out or it is cancelled.
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from typing import Protocol, Self
+
+from .game import Seed, State
+from .policy import (
+    BranchSelector,
+    Recommendation,
+    SearchSession,
+    StateT_contra,
+    SteppableBranchSelector,
+)
+
+__all__ = [
+    "AsyncBranchSelector",
+    "AsyncSearch",
+    "NoRecommendationYetError",
+    "SearchBudget",
+    "SteppedAsyncSelector",
+    "ThreadedAsyncSelector",
+]
+
+
+class NoRecommendationYetError(RuntimeError):
+    """The search stopped before finding any recommendation."""
+
+
+@dataclass(frozen=True, slots=True)
+class SearchBudget:
+    """Limits of one search.
+
+    Attributes:
+        deadline: Optional :func:`time.monotonic` time at which to stop.
+        max_nodes: Optional number of nodes after which to stop.
+
+    """
+
+    deadline: float | None = None
+    max_nodes: int | None = None
+
+    @classmethod
+    def from_timeout(cls, seconds: float, max_nodes: int | None = None) -> Self:
+        """Return a budget expiring ``seconds`` from now."""
+        return cls(deadline=time.monotonic() + seconds, max_nodes=max_nodes)
+
+    def remaining_seconds(self) -> float | None:
+        """Return the time left before the deadline, None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def expired(self) -> bool:
+        """Return whether the deadline has passed."""
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+
+_UNLIMITED = SearchBudget()
+
+
+class AsyncSearch:
+    """Handle on a search running on the event loop."""
+
+    def __init__(
+        self,
+        run: Callable[["AsyncSearch"], Coroutine[object, object, None]],
+        best: Callable[[], Recommendation | None],
+        nodes: Callable[[], int],
+    ) -> None:
+        """Schedule ``run`` on the running event loop.
+
+        Args:
+            run: Drives the search until it ends or :attr:`cancelled` is set.
+            best: Returns the best recommendation so far.
+            nodes: Returns the number of nodes searched so far.
+
+        """
+        self._best = best
+        self._nodes = nodes
+        self.cancelled = asyncio.Event()
+        self._task: asyncio.Task[None] = asyncio.get_running_loop().create_task(
+            run(self)
+        )
+
+    @property
+    def nodes(self) -> int:
+        """Return the number of nodes searched so far."""
+        return self._nodes()
+
+    def best_so_far(self) -> Recommendation | None:
+        """Return the best recommendation found so far, if any."""
+        return self._best()
+
+    def done(self) -> bool:
+        """Return whether the search has stopped."""
+        return self._task.done()
+
+    def cancel(self) -> None:
+        """Ask the search to stop; :meth:`result` then returns the best so far."""
+        self.cancelled.set()
+
+    async def result(self) -> Recommendation:
+        """Wait for the search to stop and return its best recommendation.
+
+        Cancelling the task awaiting this method cancels the search itself,
+        without a result.
+
+        Raises:
+            NoRecommendationYetError: If the search stopped before finding
+                any recommendation.
+
+        """
+        await self._task
+        recommendation = self.best_so_far()
+        if recommendation is None:
+            raise NoRecommendationYetError
+        return recommendation
+
+
+class AsyncBranchSelector(Protocol[StateT_contra]):
+    """Branch selector that can be awaited from an event loop."""
+
+    async def recommend_async(
+        self,
+        state: StateT_contra,
+        seed: Seed,
+        budget: SearchBudget | None = None,
+    ) -> Recommendation:
+        """Search ``state`` within ``budget`` and return the best recommendation.
+
+        Args:
+            state (State): The current state of the game.
+            seed (Seed): A seed for any randomness involved in the selection.
+            budget (SearchBudget | None): Optional time and node limits.
+
+        Returns:
+            Recommendation: The best recommendation found.
+
+        """
+        ...
+
+
+@dataclass
+class SteppedAsyncSelector[StateT: State]:
+    """Run a steppable selector on the event loop, one node chunk at a time.
+
+    Attributes:
+        selector: The selector whose sessions are stepped.
+        chunk_nodes: The nodes searched between two yields to the event loop,
+            which bounds the latency the search adds to other tasks.
+
+    """
+
+    selector: SteppableBranchSelector[StateT]
+    chunk_nodes: int = 256
+
+    def start(
+        self, state: StateT, seed: Seed, budget: SearchBudget | None = None
+    ) -> AsyncSearch:
+        """Start searching ``state`` on the running event loop.
+
+        Raises:
+            NoBranchToRecommendError: If ``state`` is over or has no action.
+
+        """
+        session = self.selector.start(state, seed)
+        limits = budget or _UNLIMITED
+
+        async def run(search: AsyncSearch) -> None:
+            await self._drive(session, limits, search)
+
+        return AsyncSearch(run, session.best, lambda: session.nodes)
+
+    async def recommend_async(
+        self, state: StateT, seed: Seed, budget: SearchBudget | None = None
+    ) -> Recommendation:
+        """Search ``state`` within ``budget`` and return the best recommendation."""
+        return await self.start(state, seed, budget).result()
+
+    async def _drive(
+        self, session: SearchSession, budget: SearchBudget, search: AsyncSearch
+    ) -> None:
+        while not search.cancelled.is_set():
+            chunk = self.chunk_nodes
+            if budget.max_nodes is not None:
+                chunk = min(chunk, budget.max_nodes - session.nodes)
+                if chunk <= 0:
+                    return
+            if session.step(chunk) or budget.expired():
+                return
+            await asyncio.sleep(0)
+
+
+@dataclass
+class ThreadedAsyncSelector[StateT: State]:
+    """Run a plain selector in a worker thread.
+
+    The search cannot be interrupted: once the deadline passes or the handle
+    is cancelled, the handle stops waiting and reports no recommendation while
+    the thread finishes in the background. Node budgets are not enforced.
+
+    Attributes:
+        selector: The selector run in the worker thread.
+
+    """
+
+    selector: BranchSelector[StateT]
+
+    def start(
+        self, state: StateT, seed: Seed, budget: SearchBudget | None = None
+    ) -> AsyncSearch:
+        """Start searching ``state`` in a worker thread."""
+        limits = budget or _UNLIMITED
+        results: list[Recommendation] = []
+
+        async def run(search: AsyncSearch) -> None:
+            worker = asyncio.ensure_future(
+                asyncio.to_thread(self.selector.recommend, state, seed)
+            )
+            cancelled = asyncio.ensure_future(search.cancelled.wait())
+            try:
+                await asyncio.wait(
+                    {worker, cancelled},
+                    timeout=limits.remaining_seconds(),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+            finally:
+                cancelled.cancel()
+            if worker.done():
+                results.append(worker.result())
+            else:
+                # The thread cannot be stopped; only silence its outcome.
+                worker.add_done_callback(_discard_outcome)
+
+        return AsyncSearch(run, lambda: results[0] if results else None, lambda: 0)
+
+    async def recommend_async(
+        self, state: StateT, seed: Seed, budget: SearchBudget | None = None
+    ) -> Recommendation:
+        """Search ``state`` within ``budget`` and return its recommendation."""
+        return await self.start(state, seed, budget).result()
+
+
+def _discard_outcome(future: "asyncio.Future[Recommendation]") -> None:
+    if not future.cancelled():
+        future.exception()
@@ -0,0 +1,125 @@
+"""Process-pool adapter for batched checkpoint dumps and loads.
+
+``StateCheckpointCodec`` converts one state at a time, so checkpointing a large
+tree is bound to a single core. ``ParallelStateCheckpointCodec`` wraps such a
+codec and implements :class:`valanga.checkpoints.BatchStateCheckpointCodec` by
+splitting batches into chunks converted in worker processes. Each chunk is one
+task, so the codec is pickled once per chunk rather than once per state.
+"""
+
+import math
+import os
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+
+from .checkpoints import StateCheckpointCodec
+
+__all__ = ["InvalidMaxWorkersError", "ParallelStateCheckpointCodec"]
+
+_CHUNKS_PER_WORKER = 4
+
+
+class InvalidMaxWorkersError(ValueError):
+    """Raised when a parallel codec is configured with no worker."""
+
+    def __init__(self, max_workers: int) -> None:
+        """Build the error from the rejected count."""
+        super().__init__(f"max_workers must be at least 1, got {max_workers}")
+
+
+def _dump_chunk[StateT](
+    codec: StateCheckpointCodec[StateT], states: Sequence[StateT]
+) -> list[object]:
+    """Dump one chunk in a worker. Module-level so it can be pickled."""
+    return [codec.dump_state_ref(state) for state in states]
+
+
+def _load_chunk[StateT](
+    codec: StateCheckpointCodec[StateT], payloads: Sequence[object]
+) -> list[StateT]:
+    """Load one chunk in a worker. Module-level so it can be pickled."""
+    return [codec.load_state_ref(payload) for payload in payloads]
+
+
+def _default_max_workers() -> int:
+    return os.cpu_count() or 1
+
+
+@dataclass
+class ParallelStateCheckpointCodec[StateT]:
+    """Batch a one-state-at-a-time codec over a pool of workers.
+
+    The single-state methods delegate to the wrapped codec in the calling
+    process, so the adapter can be used wherever a ``StateCheckpointCodec`` is
+    expected.
+
+    Attributes:
+        codec: The wrapped codec. It must be picklable when the executor is a
+            process pool, as must the states and payloads.
+        max_workers: The number of workers of the default process pool.
+        executor: Optional long-lived executor. When None, a process pool with
+            ``max_workers`` processes is created for each batch.
+        chunksize: The number of items per task. When None, batches are split
+            into about four chunks per worker.
+        min_parallel_batch: Batches smaller than this are converted in the
+            calling process, where the pool overhead would dominate.
+
+    """
+
+    codec: StateCheckpointCodec[StateT]
+    max_workers: int = field(default_factory=_default_max_workers)
+    executor: Executor | None = None
+    chunksize: int | None = None
+    min_parallel_batch: int = 256
+
+    def __post_init__(self) -> None:
+        """Validate the worker count.
+
+        Raises:
+            InvalidMaxWorkersError: If ``max_workers`` is below 1.
+
+        """
+        if self.max_workers < 1:
+            raise InvalidMaxWorkersError(self.max_workers)
+
+    def dump_state_ref(self, state: StateT) -> object:
+        """Return the checkpoint reference payload of ``state``."""
+        return self.codec.dump_state_ref(state)
+
+    def load_state_ref(self, payload: object) -> StateT:
+        """Reconstruct a state from a checkpoint reference payload."""
+        return self.codec.load_state_ref(payload)
+
+    def dump_state_refs(self, states: Sequence[StateT]) -> list[object]:
+        """Return the checkpoint reference payloads of ``states``, in order."""
+        return self._map(_dump_chunk, states)
+
+    def load_state_refs(self, payloads: Sequence[object]) -> list[StateT]:
+        """Reconstruct the states of ``payloads``, in order."""
+        return self._map(_load_chunk, payloads)
+
+    def _chunks[ItemT](self, items: Sequence[ItemT]) -> list[Sequence[ItemT]]:
+        size = self.chunksize or math.ceil(
+            len(items) / (self.max_workers * _CHUNKS_PER_WORKER)
+        )
+        size = max(size, 1)
+        return [items[start : start + size] for start in range(0, len(items), size)]
+
+    def _map[ItemT, ResultT](
+        self,
+        convert: Callable[
+            [StateCheckpointCodec[StateT], Sequence[ItemT]], list[ResultT]
+        ],
+        items: Sequence[ItemT],
+    ) -> list[ResultT]:
+        if len(items) < self.min_parallel_batch:
+            return convert(self.codec, items)
+        chunks = self._chunks(items)
+        if self.executor is not None:
+            results = list(self.executor.map(convert, repeat(self.codec), chunks))
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(convert, repeat(self.codec), chunks))
+        return [result for chunk in results for result in chunk]
@@ -0,0 +1,830 @@
+"""Append-only, memory-mapped store of anchor and delta checkpoint records.
+
+``CheckpointStore`` persists the payloads produced by an
+``IncrementalStateCheckpointCodec``. Every node id maps either to an anchor,
+which reconstructs a state on its own, or to a delta from a parent node. Any
+node can be reconstructed by loading the nearest anchor of its chain and
+replaying the deltas down to it.
+
+A store is a directory holding two files:
+
+- ``payloads.bin``: the serialized payloads, appended back to back
+- ``index.bin``: one fixed-size record per payload, appended after the payload
+  it describes is written, so a crash never leaves dangling index records
+
+Reads go through a memory map of ``payloads.bin`` and the index is kept in
+memory, so reconstructing a node never scans the files.
+
+:meth:`CheckpointStore.compact` rewrites the live nodes into
+``payloads.bin.compact`` and ``index.bin.compact`` and then swaps them in.
+The swap is committed by a ``compaction.commit`` marker: a store opened with
+the marker present finishes the swap, and one opened without it drops the
+leftovers of an interrupted compaction.
+"""
+
+import mmap
+import os
+import pickle
+import struct
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future
+from dataclasses import dataclass
+from enum import IntEnum
+from pathlib import Path
+from types import TracebackType
+from typing import BinaryIO, Protocol, Self
+
+from .anchor_policy import AnchorPolicy
+from .checkpoints import IncrementalStateCheckpointCodec
+from .game import BranchKey
+from .reconstruction_cache import ReconstructionCache
+
+__all__ = [
+    "CheckpointCycleError",
+    "CheckpointRecord",
+    "CheckpointStore",
+    "CompactionStats",
+    "NodeId",
+    "PayloadSerializer",
+    "PickleSerializer",
+    "RecordKind",
+    "UnknownNodeError",
+]
+
+type NodeId = int
+
+PAYLOADS_FILE_NAME = "payloads.bin"
+INDEX_FILE_NAME = "index.bin"
+COMPACTED_SUFFIX = ".compact"
+COMPACTION_MARKER_FILE_NAME = "compaction.commit"
+
+_NO_PARENT = -1
+# node id, parent id, payload offset, payload length, chain depth, kind
+_INDEX_RECORD = struct.Struct("<qqQIIB")
+
+
+class UnknownNodeError(KeyError):
+    """The node id has no record in the checkpoint store."""
+
+
+class CheckpointCycleError(ValueError):
+    """Raised when a node would be recorded as a delta of its own descendant."""
+
+    def __init__(self, node_id: int, parent_id: int) -> None:
+        """Build the error from the rejected node and parent."""
+        super().__init__(
+            f"node {node_id} cannot be a delta of {parent_id}, whose chain "
+            f"goes through node {node_id}"
+        )
+
+
+class RecordKind(IntEnum):
+    """Kind of a checkpoint record."""
+
+    ANCHOR = 0
+    DELTA = 1
+
+
+@dataclass(frozen=True, slots=True)
+class CheckpointRecord:
+    """Location and lineage of one stored payload.
+
+    Attributes:
+        node_id: The node the payload reconstructs.
+        kind: Whether the payload is an anchor or a delta.
+        parent_id: The parent node of a delta, None for anchors.
+        offset: The payload offset in ``payloads.bin``.
+        length: The payload size in bytes.
+        chain_depth: The number of deltas to replay from the nearest anchor.
+
+    """
+
+    node_id: NodeId
+    kind: RecordKind
+    parent_id: NodeId | None
+    offset: int
+    length: int
+    chain_depth: int
+
+    def pack(self) -> bytes:
+        """Return the on-disk index record."""
+        return _INDEX_RECORD.pack(
+            self.node_id,
+            _NO_PARENT if self.parent_id is None else self.parent_id,
+            self.offset,
+            self.length,
+            self.chain_depth,
+            self.kind,
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes, offset: int = 0) -> "CheckpointRecord":
+        """Parse an on-disk index record."""
+        node_id, parent_id, payload_offset, length, chain_depth, kind = (
+            _INDEX_RECORD.unpack_from(data, offset)
+        )
+        return cls(
+            node_id=node_id,
+            kind=RecordKind(kind),
+            parent_id=None if parent_id == _NO_PARENT else parent_id,
+            offset=payload_offset,
+            length=length,
+            chain_depth=chain_depth,
+        )
+
+
+class PayloadSerializer[PayloadT](Protocol):
+    """Turn checkpoint payloads into bytes and back."""
+
+    def dumps(self, payload: PayloadT) -> bytes:
+        """Serialize ``payload``."""
+        ...
+
+    def loads(self, data: bytes) -> PayloadT:
+        """Deserialize a payload."""
+        ...
+
+
+class PickleSerializer[PayloadT]:
+    """Default serializer relying on :mod:`pickle`."""
+
+    def dumps(self, payload: PayloadT) -> bytes:
+        """Serialize ``payload`` with the highest pickle protocol."""
+        return pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, data: bytes) -> PayloadT:
+        """Deserialize a pickled payload."""
+        payload: PayloadT = pickle.loads(data)
+        return payload
+
+
+@dataclass(frozen=True, slots=True)
+class CompactionStats:
+    """Outcome of a checkpoint store compaction.
+
+    Attributes:
+        live_nodes: The number of nodes kept.
+        dropped_nodes: The number of nodes removed.
+        reanchored_nodes: The number of deltas rewritten as anchors.
+        bytes_before: The payload size before compaction.
+        bytes_after: The payload size after compaction.
+
+    """
+
+    live_nodes: int
+    dropped_nodes: int
+    reanchored_nodes: int
+    bytes_before: int
+    bytes_after: int
+
+
+class _CompactedFiles:
+    """Side files receiving the records kept by a compaction."""
+
+    def __init__(self, directory: Path, buffer_size: int) -> None:
+        self.payloads_path = directory / (PAYLOADS_FILE_NAME + COMPACTED_SUFFIX)
+        self.index_path = directory / (INDEX_FILE_NAME + COMPACTED_SUFFIX)
+        # pylint: disable-next=consider-using-with
+        self._payloads: BinaryIO = open(  # noqa: SIM115
+            self.payloads_path, "wb", buffering=buffer_size
+        )
+        # pylint: disable-next=consider-using-with
+        self._index: BinaryIO = open(  # noqa: SIM115
+            self.index_path, "wb", buffering=buffer_size
+        )
+        self.records: dict[NodeId, CheckpointRecord] = {}
+        self.end = 0
+        self.reanchored = 0
+
+    def write(
+        self, node_id: NodeId, kind: RecordKind, parent_id: NodeId | None, data: bytes
+    ) -> None:
+        """Append the record of ``node_id`` and its payload ``data``."""
+        chain_depth = 0
+        if parent_id is not None:
+            chain_depth = self.records[parent_id].chain_depth + 1
+        record = CheckpointRecord(
+            node_id=node_id,
+            kind=kind,
+            parent_id=parent_id,
+            offset=self.end,
+            length=len(data),
+            chain_depth=chain_depth,
+        )
+        self._payloads.write(data)
+        self._index.write(record.pack())
+        self.end += len(data)
+        self.records[node_id] = record
+
+    def commit(self) -> None:
+        """Make the side files durable and close them."""
+        for file in (self._payloads, self._index):
+            file.flush()
+            os.fsync(file.fileno())
+            file.close()
+
+    def discard(self) -> None:
+        """Close and delete the side files."""
+        self._payloads.close()
+        self._index.close()
+        self.payloads_path.unlink(missing_ok=True)
+        self.index_path.unlink(missing_ok=True)
+
+
+def _read_index(
+    path: Path, payload_size: int
+) -> tuple[dict[NodeId, CheckpointRecord], int]:
+    """Read an index file, keeping the last record of each node.
+
+    Records are appended in payload order, so the first torn record or record
+    pointing past ``payload_size`` marks the end of what was durably written.
+
+    Returns:
+        tuple[dict[NodeId, CheckpointRecord], int]: The records and the size of
+        the valid prefix of the index file.
+
+    """
+    records: dict[NodeId, CheckpointRecord] = {}
+    if not path.exists():
+        return records, 0
+    data = path.read_bytes()
+    valid_size = 0
+    while valid_size + _INDEX_RECORD.size <= len(data):
+        record = CheckpointRecord.unpack(data, valid_size)
+        if record.offset + record.length > payload_size:
+            break
+        records[record.node_id] = record
+        valid_size += _INDEX_RECORD.size
+    return records, valid_size
+
+
+# pylint: disable-next=too-many-instance-attributes
+class CheckpointStore[StateT, AnchorRefT, DeltaRefT]:
+    """File-backed anchor+delta store driving an incremental checkpoint codec.
+
+    Appends are buffered and become visible to readers of the same store right
+    away; :meth:`flush` makes them durable. A node recorded twice keeps its
+    latest record, and cached states rebuilt through the older one are dropped;
+    it cannot become a delta of a node whose chain goes through it.
+    The store is safe to share between threads.
+    """
+
+    def __init__(  # noqa: PLR0913  # pylint: disable=too-many-arguments
+        self,
+        directory: str | os.PathLike[str],
+        codec: IncrementalStateCheckpointCodec[StateT, AnchorRefT, DeltaRefT],
+        *,
+        anchor_serializer: PayloadSerializer[AnchorRefT] | None = None,
+        delta_serializer: PayloadSerializer[DeltaRefT] | None = None,
+        anchor_policy: AnchorPolicy[StateT, AnchorRefT, DeltaRefT] | None = None,
+        cache: ReconstructionCache[StateT] | None = None,
+        write_buffer_size: int = 1 << 20,
+    ) -> None:
+        """Open or create the store in ``directory``.
+
+        Args:
+            directory: The directory holding the store files.
+            codec: The codec producing and consuming the payloads.
+            anchor_serializer: Serializer for anchor payloads. Defaults to
+                :class:`PickleSerializer`.
+            delta_serializer: Serializer for delta payloads. Defaults to
+                :class:`PickleSerializer`.
+            anchor_policy: Decides whether :meth:`append_child` records an
+                anchor or a delta. Without a policy, children are always deltas.
+            cache: Optional cache of materialized states. When given,
+                :meth:`load` starts from the deepest cached ancestor and caches
+                the states it replays.
+            write_buffer_size: Size of the write buffers, so that many small
+                records reach the disk in large sequential writes.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.codec = codec
+        self.anchor_serializer: PayloadSerializer[AnchorRefT] = (
+            anchor_serializer or PickleSerializer()
+        )
+        self.delta_serializer: PayloadSerializer[DeltaRefT] = (
+            delta_serializer or PickleSerializer()
+        )
+        self.anchor_policy = anchor_policy
+        self.cache = cache
+        self._write_buffer_size = write_buffer_size
+        self._lock = threading.RLock()
+        # Bumped whenever a node is recorded again, so that loads replaying a
+        # superseded record do not cache its states.
+        self._generation = 0
+        self._compaction_lock = threading.Lock()
+        self._finish_compaction()
+        self._open_files()
+
+    def _finish_compaction(self) -> None:
+        """Complete a committed compaction swap, or drop an uncommitted one."""
+        marker = self.directory / COMPACTION_MARKER_FILE_NAME
+        committed = marker.exists()
+        for name in (PAYLOADS_FILE_NAME, INDEX_FILE_NAME):
+            compacted = self.directory / (name + COMPACTED_SUFFIX)
+            if not compacted.exists():
+                continue
+            if committed:
+                os.replace(compacted, self.directory / name)
+            else:
+                compacted.unlink()
+        marker.unlink(missing_ok=True)
+
+    def _open_files(self) -> None:
+        payloads_path = self.directory / PAYLOADS_FILE_NAME
+        index_path = self.directory / INDEX_FILE_NAME
+        payloads_path.touch()
+        index_path.touch()
+        payload_size = payloads_path.stat().st_size
+        self._records, index_size = _read_index(index_path, payload_size)
+        self._children: dict[NodeId, set[NodeId]] = {}
+        for record in self._records.values():
+            if record.parent_id is not None:
+                self._children.setdefault(record.parent_id, set()).add(record.node_id)
+        # Drop whatever an interrupted write left after the last valid record.
+        end = max(
+            (record.offset + record.length for record in self._records.values()),
+            default=0,
+        )
+        os.truncate(index_path, index_size)
+        os.truncate(payloads_path, end)
+        # pylint: disable-next=consider-using-with
+        self._index_writer: BinaryIO = open(  # noqa: SIM115
+            index_path, "ab", buffering=self._write_buffer_size
+        )
+        # pylint: disable-next=consider-using-with
+        self._payload_writer: BinaryIO = open(  # noqa: SIM115
+            payloads_path, "ab", buffering=self._write_buffer_size
+        )
+        # pylint: disable-next=consider-using-with
+        self._payload_reader: BinaryIO = open(payloads_path, "rb")  # noqa: SIM115
+        self._end = end
+        self._map: mmap.mmap | None = None
+        self._mapped_size = 0
+
+    def __enter__(self) -> Self:
+        """Return the store for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the store."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of recorded nodes."""
+        return len(self._records)
+
+    def __contains__(self, node_id: NodeId) -> bool:
+        """Return whether ``node_id`` has a record."""
+        return node_id in self._records
+
+    def node_ids(self) -> Iterator[NodeId]:
+        """Iterate over the recorded node ids."""
+        return iter(list(self._records))
+
+    @property
+    def size_bytes(self) -> int:
+        """Return the size of the stored payloads."""
+        return self._end
+
+    def record(self, node_id: NodeId) -> CheckpointRecord:
+        """Return the record of ``node_id``.
+
+        Raises:
+            UnknownNodeError: If the node has no record.
+
+        """
+        try:
+            return self._records[node_id]
+        except KeyError:
+            raise UnknownNodeError(node_id) from None
+
+    def _append(
+        self,
+        node_id: NodeId,
+        kind: RecordKind,
+        parent_id: NodeId | None,
+        data: bytes,
+    ) -> CheckpointRecord:
+        with self._lock:
+            chain_depth = 0
+            if parent_id is not None:
+                chain_depth = self.record(parent_id).chain_depth + 1
+            previous = self._records.get(node_id)
+            if previous is not None:
+                if parent_id is not None and self._chain_contains(parent_id, node_id):
+                    raise CheckpointCycleError(node_id, parent_id)
+                self._invalidate_subtree(node_id)
+                if previous.parent_id is not None:
+                    self._children[previous.parent_id].discard(node_id)
+            if parent_id is not None:
+                self._children.setdefault(parent_id, set()).add(node_id)
+            record = CheckpointRecord(
+                node_id=node_id,
+                kind=kind,
+                parent_id=parent_id,
+                offset=self._end,
+                length=len(data),
+                chain_depth=chain_depth,
+            )
+            self._payload_writer.write(data)
+            self._index_writer.write(record.pack())
+            self._end += len(data)
+            self._records[node_id] = record
+            return record
+
+    def _chain_contains(self, node_id: NodeId, ancestor_id: NodeId) -> bool:
+        """Return whether the chain of ``node_id`` goes through ``ancestor_id``."""
+        current: NodeId | None = node_id
+        while current is not None:
+            if current == ancestor_id:
+                return True
+            record = self._records.get(current)
+            current = None if record is None else record.parent_id
+        return False
+
+    def _invalidate_subtree(self, node_id: NodeId) -> None:
+        """Uncache ``node_id`` and the nodes whose chain goes through it."""
+        self._generation += 1
+        cache = self.cache
+        if cache is None:
+            return
+        pending = [node_id]
+        while pending:
+            current = pending.pop()
+            cache.discard(current)
+            pending.extend(self._children.get(current, ()))
+
+    def append_anchor_ref(
+        self, node_id: NodeId, anchor_ref: AnchorRefT
+    ) -> CheckpointRecord:
+        """Record an already dumped anchor payload for ``node_id``."""
+        return self._append(
+            node_id, RecordKind.ANCHOR, None, self.anchor_serializer.dumps(anchor_ref)
+        )
+
+    def append_delta_ref(
+        self, node_id: NodeId, parent_id: NodeId, delta_ref: DeltaRefT
+    ) -> CheckpointRecord:
+        """Record an already dumped delta payload from ``parent_id`` to ``node_id``.
+
+        Raises:
+            UnknownNodeError: If the parent has no record.
+            CheckpointCycleError: If the chain of the parent goes through
+                ``node_id``.
+
+        """
+        return self._append(
+            node_id,
+            RecordKind.DELTA,
+            parent_id,
+            self.delta_serializer.dumps(delta_ref),
+        )
+
+    def append_anchor(self, node_id: NodeId, state: StateT) -> CheckpointRecord:
+        """Dump and record an anchor reconstructing ``state``."""
+        anchor_ref = self.codec.dump_anchor_ref(state)
+        record = self.append_anchor_ref(node_id, anchor_ref)
+        if self.anchor_policy is not None:
+            self.anchor_policy.record_anchor(
+                state=state, anchor_ref=anchor_ref, anchor_size=record.length
+            )
+        return record
+
+    def append_delta(
+        self,
+        node_id: NodeId,
+        parent_id: NodeId,
+        *,
+        parent_state: StateT,
+        child_state: StateT,
+        branch_from_parent: BranchKey | None = None,
+    ) -> CheckpointRecord:
+        """Dump and record the delta from ``parent_id`` to ``node_id``.
+
+        Raises:
+            UnknownNodeError: If the parent has no record.
+            CheckpointCycleError: If the chain of the parent goes through
+                ``node_id``.
+
+        """
+        delta_ref = self.codec.dump_delta_from_parent(
+            parent_state=parent_state,
+            child_state=child_state,
+            branch_from_parent=branch_from_parent,
+        )
+        return self.append_delta_ref(node_id, parent_id, delta_ref)
+
+    def append_child(
+        self,
+        node_id: NodeId,
+        parent_id: NodeId,
+        *,
+        parent_state: StateT,
+        child_state: StateT,
+        branch_from_parent: BranchKey | None = None,
+    ) -> CheckpointRecord:
+        """Record ``node_id`` as a delta or an anchor, as the policy decides.
+
+        Raises:
+            UnknownNodeError: If the parent has no record.
+            CheckpointCycleError: If the chain of the parent goes through
+                ``node_id``.
+
+        """
+        if self.anchor_policy is None:
+            return self.append_delta(
+                node_id,
+                parent_id,
+                parent_state=parent_state,
+                child_state=child_state,
+                branch_from_parent=branch_from_parent,
+            )
+        parent = self.record(parent_id)
+        delta_ref = self.codec.dump_delta_from_parent(
+            parent_state=parent_state,
+            child_state=child_state,
+            branch_from_parent=branch_from_parent,
+        )
+        data = self.delta_serializer.dumps(delta_ref)
+        if self.anchor_policy.should_anchor(
+            parent_chain_depth=parent.chain_depth,
+            parent_state=parent_state,
+            delta_ref=delta_ref,
+            delta_size=len(data),
+        ):
+            return self.append_anchor(node_id, child_state)
+        return self._append(node_id, RecordKind.DELTA, parent_id, data)
+
+    def read_payload(self, record: CheckpointRecord) -> bytes:
+        """Return the serialized payload of ``record``."""
+        end = record.offset + record.length
+        with self._lock:
+            if end > self._mapped_size:
+                self._remap()
+            assert self._map is not None
+            return self._map[record.offset : end]
+
+    def _remap(self) -> None:
+        self._payload_writer.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._mapped_size = self._end
+        if self._end:
+            self._map = mmap.mmap(
+                self._payload_reader.fileno(), self._end, access=mmap.ACCESS_READ
+            )
+
+    def load_anchor_ref(self, record: CheckpointRecord) -> AnchorRefT:
+        """Deserialize the anchor payload of ``record``."""
+        return self.anchor_serializer.loads(self.read_payload(record))
+
+    def load_delta_ref(self, record: CheckpointRecord) -> DeltaRefT:
+        """Deserialize the delta payload of ``record``."""
+        return self.delta_serializer.loads(self.read_payload(record))
+
+    def chain(self, node_id: NodeId) -> list[CheckpointRecord]:
+        """Return the records from the nearest anchor down to ``node_id``.
+
+        Raises:
+            UnknownNodeError: If a node of the chain has no record.
+
+        """
+        with self._lock:
+            records = [self.record(node_id)]
+            while records[-1].parent_id is not None:
+                records.append(self.record(records[-1].parent_id))
+        records.reverse()
+        return records
+
+    def _read_chain(
+        self, node_id: NodeId
+    ) -> tuple[StateT | None, list[tuple[CheckpointRecord, bytes]], int]:
+        """Return the nearest cached state and the payloads to replay from it.
+
+        The records are resolved and their payloads copied under one lock
+        hold, so a compaction swap cannot move the payloads in between.
+        Without a cached ancestor, the first payload is the anchor's. The
+        store generation of the read is returned last.
+        """
+        cache = self.cache
+        pending: list[tuple[CheckpointRecord, bytes]] = []
+        with self._lock:
+            record: CheckpointRecord | None = self.record(node_id)
+            while record is not None:
+                if cache is not None:
+                    cached = cache.get(record.node_id)
+                    if cached is not None:
+                        pending.reverse()
+                        return cached, pending, self._generation
+                pending.append((record, self.read_payload(record)))
+                record = (
+                    None if record.parent_id is None else self.record(record.parent_id)
+                )
+            generation = self._generation
+        pending.reverse()
+        return None, pending, generation
+
+    def load(self, node_id: NodeId) -> StateT:
+        """Reconstruct the state of ``node_id``.
+
+        With a cache, the replay starts from the deepest cached ancestor and
+        every replayed state is cached, so siblings can reuse the ancestors.
+
+        Raises:
+            UnknownNodeError: If a node of the chain has no record.
+
+        """
+        state, pending, generation = self._read_chain(node_id)
+        replayed: list[tuple[NodeId, StateT]] = []
+        if state is None:
+            (anchor, payload), *pending = pending
+            state = self.codec.load_anchor_ref(self.anchor_serializer.loads(payload))
+            replayed.append((anchor.node_id, state))
+        for delta, payload in pending:
+            state = self.codec.load_child_from_delta(
+                parent_state=state, delta_ref=self.delta_serializer.loads(payload)
+            )
+            replayed.append((delta.node_id, state))
+        cache = self.cache
+        if cache is not None:
+            with self._lock:
+                if generation == self._generation:
+                    for replayed_id, replayed_state in replayed:
+                        cache.put(replayed_id, replayed_state)
+        return state
+
+    def flush(self, *, fsync: bool = False) -> None:
+        """Write the buffered records to disk.
+
+        Args:
+            fsync: Whether to also ask the OS to persist the files.
+
+        """
+        with self._lock:
+            self._payload_writer.flush()
+            if fsync:
+                os.fsync(self._payload_writer.fileno())
+            self._index_writer.flush()
+            if fsync:
+                os.fsync(self._index_writer.fileno())
+
+    def close(self) -> None:
+        """Flush and close the store files."""
+        with self._lock:
+            if self._payload_writer.closed:
+                return
+            self._close_files()
+
+    def _close_files(self) -> None:
+        self.flush()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._payload_writer.close()
+        self._payload_reader.close()
+        self._index_writer.close()
+
+    def compact(
+        self, live_node_ids: Iterable[NodeId], *, max_chain_depth: int | None = None
+    ) -> CompactionStats:
+        """Rewrite the store keeping only ``live_node_ids``.
+
+        Live deltas whose parent is dropped, or whose chain would exceed
+        ``max_chain_depth``, are rewritten as anchors. Live ids without a
+        record are ignored.
+
+        The live records are copied while the store keeps serving reads and
+        appends; the lock is only held at the end, to copy the records
+        appended in the meantime and swap the files. Those records are kept
+        whether or not they are live.
+
+        Args:
+            live_node_ids: The nodes to keep.
+            max_chain_depth: Optional bound on the delta chains of the
+                compacted store.
+
+        Returns:
+            CompactionStats: What the compaction kept, dropped and rewrote.
+
+        """
+        with self._compaction_lock:
+            with self._lock:
+                snapshot = dict(self._records)
+                snapshot_end = self._end
+            live = [node_id for node_id in live_node_ids if node_id in snapshot]
+            live_set = set(live)
+            files = _CompactedFiles(self.directory, self._write_buffer_size)
+            try:
+                placed: set[NodeId] = set()
+                for node_id in live:
+                    # Copy the live ancestors first, so deltas find their parent.
+                    pending: list[NodeId] = []
+                    current: NodeId | None = node_id
+                    while (
+                        current is not None
+                        and current in live_set
+                        and current not in placed
+                    ):
+                        pending.append(current)
+                        placed.add(current)
+                        current = snapshot[current].parent_id
+                    for pending_id in reversed(pending):
+                        self._copy_record(files, snapshot[pending_id], max_chain_depth)
+                with self._lock:
+                    tail = sorted(
+                        (
+                            record
+                            for record in self._records.values()
+                            if record.offset >= snapshot_end
+                        ),
+                        key=lambda record: record.offset,
+                    )
+                    for record in tail:
+                        self._copy_record(files, record, max_chain_depth)
+                    files.commit()
+                    return self._swap_compacted(files)
+            except BaseException:
+                files.discard()
+                raise
+
+    def _copy_record(
+        self,
+        files: _CompactedFiles,
+        record: CheckpointRecord,
+        max_chain_depth: int | None,
+    ) -> None:
+        if record.kind is RecordKind.ANCHOR:
+            files.write(
+                record.node_id, RecordKind.ANCHOR, None, self.read_payload(record)
+            )
+            return
+        assert record.parent_id is not None
+        parent = files.records.get(record.parent_id)
+        if parent is not None and (
+            max_chain_depth is None or parent.chain_depth < max_chain_depth
+        ):
+            files.write(
+                record.node_id,
+                RecordKind.DELTA,
+                record.parent_id,
+                self.read_payload(record),
+            )
+            return
+        anchor_ref = self.codec.dump_anchor_ref(self.load(record.node_id))
+        files.write(
+            record.node_id,
+            RecordKind.ANCHOR,
+            None,
+            self.anchor_serializer.dumps(anchor_ref),
+        )
+        files.reanchored += 1
+
+    def _swap_compacted(self, files: _CompactedFiles) -> CompactionStats:
+        dropped = [node_id for node_id in self._records if node_id not in files.records]
+        bytes_before = self._end
+        marker = self.directory / COMPACTION_MARKER_FILE_NAME
+        self._close_files()
+        with marker.open("wb") as marker_file:
+            os.fsync(marker_file.fileno())
+        self._finish_compaction()
+        self._open_files()
+        if self.cache is not None:
+            for node_id in dropped:
+                self.cache.discard(node_id)
+        return CompactionStats(
+            live_nodes=len(files.records),
+            dropped_nodes=len(dropped),
+            reanchored_nodes=files.reanchored,
+            bytes_before=bytes_before,
+            bytes_after=files.end,
+        )
+
+    def compact_in_background(
+        self, live_node_ids: Iterable[NodeId], *, max_chain_depth: int | None = None
+    ) -> "Future[CompactionStats]":
+        """Run :meth:`compact` on a new thread and return its future."""
+        live = list(live_node_ids)
+        future: Future[CompactionStats] = Future()
+
+        def run() -> None:
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(self.compact(live, max_chain_depth=max_chain_depth))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                future.set_exception(error)
+
+        threading.Thread(
+            target=run, name="valanga-checkpoint-compaction", daemon=True
+        ).start()
+        return future
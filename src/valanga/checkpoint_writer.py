@@ -0,0 +1,227 @@
+"""Background writer taking checkpoint work off the search thread.
+
+Dumping anchors and deltas, computing summaries and writing them to disk all
+happen inline when a search calls :class:`valanga.checkpoint_store.CheckpointStore`
+directly. ``BackgroundCheckpointWriter`` instead queues the states and lets a
+worker thread run the codec calls and append the records, so the search only
+pays for an enqueue. The queue is bounded: when the worker falls behind,
+submitting blocks until there is room again, which keeps memory bounded.
+"""
+
+import queue
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Self
+
+from .checkpoint_store import CheckpointStore, NodeId
+from .checkpoints import CheckpointStateSummary, StateCheckpointSummaryCodec
+from .game import BranchKey
+
+__all__ = [
+    "BackgroundCheckpointWriter",
+    "CheckpointWriterClosedError",
+    "CheckpointWriterError",
+    "UnpairedSummaryOptionError",
+]
+
+type SummarySink = Callable[[NodeId, CheckpointStateSummary], None]
+
+
+class CheckpointWriterError(RuntimeError):
+    """Raised on the submitting thread when the background writer failed."""
+
+    def __init__(self) -> None:
+        """Build the error, which chains the worker exception as its cause."""
+        super().__init__("background checkpoint writer failed")
+
+
+class CheckpointWriterClosedError(RuntimeError):
+    """Raised when submitting to a closed writer."""
+
+    def __init__(self) -> None:
+        """Build the error."""
+        super().__init__("background checkpoint writer is closed")
+
+
+class UnpairedSummaryOptionError(ValueError):
+    """Raised when only one of ``summary_codec`` and ``summary_sink`` is given."""
+
+    def __init__(self) -> None:
+        """Build the error."""
+        super().__init__("summary_codec and summary_sink must be given together")
+
+
+@dataclass(frozen=True, slots=True)
+class _AnchorJob[StateT]:
+    node_id: NodeId
+    state: StateT
+
+
+@dataclass(frozen=True, slots=True)
+class _ChildJob[StateT]:
+    node_id: NodeId
+    parent_id: NodeId
+    parent_state: StateT
+    child_state: StateT
+    branch_from_parent: BranchKey | None
+
+
+type _Job[StateT] = _AnchorJob[StateT] | _ChildJob[StateT]
+
+
+# pylint: disable-next=too-many-instance-attributes
+class BackgroundCheckpointWriter[StateT, AnchorRefT, DeltaRefT]:
+    """Record checkpoints into a store from a worker thread.
+
+    Jobs are processed in submission order, so a child may be submitted right
+    after its parent. Submitted states are dumped later, on the worker, so
+    they must not be mutated after submission; submit a copy of a state that
+    the search keeps modifying in place.
+
+    The first error raised on the worker is re-raised, chained to a
+    :class:`CheckpointWriterError`, by the next call to a submit method,
+    :meth:`flush` or :meth:`close`. Jobs submitted after a failure are dropped.
+    """
+
+    def __init__(
+        self,
+        store: CheckpointStore[StateT, AnchorRefT, DeltaRefT],
+        *,
+        summary_codec: StateCheckpointSummaryCodec[StateT] | None = None,
+        summary_sink: SummarySink | None = None,
+        max_pending: int = 1024,
+    ) -> None:
+        """Start the worker thread.
+
+        Args:
+            store: The store receiving the records. It stays owned by the
+                caller and is not closed by :meth:`close`.
+            summary_codec: Optional codec summarizing every recorded state.
+            summary_sink: Receives ``(node_id, summary)`` on the worker for
+                every recorded state, for instance
+                :meth:`valanga.summary_index.CheckpointSummaryIndex.append`.
+                Required with ``summary_codec``, and only with it.
+            max_pending: The number of queued jobs above which submitting
+                blocks.
+
+        Raises:
+            UnpairedSummaryOptionError: If only one of ``summary_codec`` and
+                ``summary_sink`` is given.
+
+        """
+        if (summary_codec is None) != (summary_sink is None):
+            raise UnpairedSummaryOptionError
+        self.store = store
+        self.summary_codec = summary_codec
+        self.summary_sink = summary_sink
+        # None asks the worker to stop.
+        self._queue: queue.Queue[_Job[StateT] | None] = queue.Queue(maxsize=max_pending)
+        self._error: BaseException | None = None
+        self._closed = False
+        self.written = 0
+        self._thread = threading.Thread(
+            target=self._run, name="valanga-checkpoint-writer", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        """Return the writer for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Drain and stop the writer."""
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Return the approximate number of queued jobs."""
+        return self._queue.qsize()
+
+    def submit_anchor(self, node_id: NodeId, state: StateT) -> None:
+        """Queue ``state`` to be recorded as an anchor of ``node_id``."""
+        self._submit(_AnchorJob(node_id, state))
+
+    def submit_child(
+        self,
+        node_id: NodeId,
+        parent_id: NodeId,
+        *,
+        parent_state: StateT,
+        child_state: StateT,
+        branch_from_parent: BranchKey | None = None,
+    ) -> None:
+        """Queue a child to be recorded as the store anchor policy decides.
+
+        See :meth:`valanga.checkpoint_store.CheckpointStore.append_child`.
+        """
+        self._submit(
+            _ChildJob(node_id, parent_id, parent_state, child_state, branch_from_parent)
+        )
+
+    def flush(self, *, fsync: bool = False) -> None:
+        """Wait until every submitted job is recorded, then flush the store.
+
+        Args:
+            fsync: Whether to also ask the OS to persist the store files.
+
+        """
+        self._queue.join()
+        self._raise_if_failed()
+        self.store.flush(fsync=fsync)
+
+    def close(self) -> None:
+        """Record the pending jobs, flush the store and stop the worker."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+        self._raise_if_failed()
+        self.store.flush()
+
+    def _submit(self, job: _Job[StateT]) -> None:
+        if self._closed:
+            raise CheckpointWriterClosedError
+        self._raise_if_failed()
+        self._queue.put(job)
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise CheckpointWriterError from self._error
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if self._error is None:
+                    self._write(job)
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write(self, job: _Job[StateT]) -> None:
+        if isinstance(job, _AnchorJob):
+            self.store.append_anchor(job.node_id, job.state)
+            state = job.state
+        else:
+            self.store.append_child(
+                job.node_id,
+                job.parent_id,
+                parent_state=job.parent_state,
+                child_state=job.child_state,
+                branch_from_parent=job.branch_from_parent,
+            )
+            state = job.child_state
+        if self.summary_codec is not None and self.summary_sink is not None:
+            self.summary_sink(job.node_id, self.summary_codec.dump_state_summary(state))
+        self.written += 1
@@ -6,7 +6,7 @@ reconstruct states directly from reversible tags, while others need structured
 or otherwise domain-specific payloads.
 """
 
-from collections.abc import Hashable
+from collections.abc import Hashable, Sequence
 from dataclasses import dataclass
 from typing import Protocol, TypeVar
 
@@ -18,6 +18,7 @@ AnchorRefT = TypeVar("AnchorRefT")
 DeltaRefT = TypeVar("DeltaRefT")
 
 __all__ = [
+    "BatchStateCheckpointCodec",
     "CheckpointStateSummary",
     "IncrementalStateCheckpointCodec",
     "StateCheckpointCodec",
@@ -61,6 +62,24 @@ class StateCheckpointCodec[StateT](Protocol):
         ...
 
 
+class BatchStateCheckpointCodec[StateT](Protocol):
+    """Optional batched companion of ``StateCheckpointCodec``.
+
+    Checkpointing a large tree one state at a time pays the per-call overhead
+    for every node. Codecs that can vectorize their work, or that fan it out to
+    several cores, implement this protocol; ``valanga.batch_checkpoints``
+    provides a process-pool adapter for codecs that cannot.
+    """
+
+    def dump_state_refs(self, states: Sequence[StateT]) -> list[object]:
+        """Return the checkpoint reference payloads of ``states``, in order."""
+        ...
+
+    def load_state_refs(self, payloads: Sequence[object]) -> list[StateT]:
+        """Reconstruct the states of ``payloads``, in order."""
+        ...
+
+
 class StateCheckpointSummaryCodec[StateT](Protocol):
     """Optional companion protocol for producing cheap checkpoint summaries.
 
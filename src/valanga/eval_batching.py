@@ -0,0 +1,276 @@
+"""Cross-thread batching of single-position evaluations.
+
+Search threads usually need one evaluation at a time, while a vectorized
+evaluator on a CPU or an accelerator is only efficient on large batches.
+``EvaluationBatcher`` accepts :class:`~valanga.evaluations.EvalItem`
+submissions from any number of threads and hands each caller a
+:class:`concurrent.futures.Future` of its :class:`~valanga.evaluations.Value`.
+A worker thread gathers the pending evaluator inputs and calls the evaluator
+on one stacked batch as soon as the batch is full or its oldest item has
+waited for the latency deadline.
+"""
+
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Self
+
+from .evaluations import EvalItem, Value
+from .evaluator_types import EvaluatorInput
+from .game import State
+
+__all__ = [
+    "BatchEvaluator",
+    "BatcherClosedError",
+    "BatcherStats",
+    "EvaluationBatcher",
+    "EvaluationCountMismatchError",
+    "InvalidBatchSizeError",
+    "MissingRepresentationError",
+]
+
+type BatchEvaluator = Callable[[object], Sequence[Value]]
+type StackInputs = Callable[[list[EvaluatorInput]], object]
+
+
+class BatcherClosedError(RuntimeError):
+    """Raised when submitting to a closed batcher."""
+
+    def __init__(self) -> None:
+        """Build the error."""
+        super().__init__("evaluation batcher is closed")
+
+
+class InvalidBatchSizeError(ValueError):
+    """Raised when a batcher is configured with batches of no item."""
+
+    def __init__(self, max_batch_size: int) -> None:
+        """Build the error from the rejected size."""
+        super().__init__(f"max_batch_size must be at least 1, got {max_batch_size}")
+
+
+class MissingRepresentationError(ValueError):
+    """Raised when a submitted item has no state representation."""
+
+    def __init__(self) -> None:
+        """Build the error."""
+        super().__init__("evaluation items need a state_representation")
+
+
+class EvaluationCountMismatchError(RuntimeError):
+    """Raised when the evaluator returns a value count unlike the batch size."""
+
+    def __init__(self, expected: int, actual: int) -> None:
+        """Build the error from the batch size and the number of values."""
+        super().__init__(f"evaluator returned {actual} values for {expected} inputs")
+
+
+@dataclass(slots=True)
+class BatcherStats:
+    """Counters of an :class:`EvaluationBatcher`.
+
+    Attributes:
+        items: The number of evaluated items.
+        batches: The number of evaluator calls.
+        full_flushes: The batches flushed because they reached the batch size.
+        deadline_flushes: The batches flushed because of the latency deadline
+            or on close.
+        batch_sizes: Histogram of the batch sizes, as ``{size: count}``.
+        queue_depths: Histogram of the number of waiting items seen by each
+            submission, itself included, as ``{depth: count}``.
+        cancelled: The items dropped because their future was cancelled
+            before their batch was taken.
+
+    """
+
+    items: int = 0
+    batches: int = 0
+    full_flushes: int = 0
+    deadline_flushes: int = 0
+    batch_sizes: Counter[int] = field(default_factory=Counter[int])
+    queue_depths: Counter[int] = field(default_factory=Counter[int])
+    cancelled: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Return the average number of items per evaluator call."""
+        return self.items / self.batches if self.batches else 0.0
+
+    def copy(self) -> "BatcherStats":
+        """Return an independent copy of the counters."""
+        return BatcherStats(
+            items=self.items,
+            batches=self.batches,
+            full_flushes=self.full_flushes,
+            deadline_flushes=self.deadline_flushes,
+            batch_sizes=Counter(self.batch_sizes),
+            queue_depths=Counter(self.queue_depths),
+            cancelled=self.cancelled,
+        )
+
+
+class EvaluationBatcher[StateT: State]:  # pylint: disable=too-many-instance-attributes
+    """Evaluate items submitted from many threads in stacked batches.
+
+    The evaluator runs on the batcher's worker thread, one batch at a time. An
+    exception raised by the stack function or the evaluator is set on the
+    futures of the affected items only; the batcher keeps serving.
+    """
+
+    def __init__(
+        self,
+        evaluator: BatchEvaluator,
+        *,
+        max_batch_size: int = 256,
+        max_latency: float = 0.002,
+        stack: StackInputs = list,
+    ) -> None:
+        """Start the worker thread.
+
+        Args:
+            evaluator: Vectorized evaluator receiving the stacked inputs of a
+                batch and returning one value per input, in order.
+            max_batch_size: The number of pending items triggering a flush.
+            max_latency: The seconds an item may wait for its batch to fill.
+            stack: Turns the list of evaluator inputs of a batch into the
+                evaluator argument, for instance :func:`numpy.stack`. The
+                list is passed unchanged by default.
+
+        Raises:
+            InvalidBatchSizeError: If ``max_batch_size`` is below 1.
+
+        """
+        if max_batch_size < 1:
+            raise InvalidBatchSizeError(max_batch_size)
+        self.evaluator = evaluator
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.stack = stack
+        self._condition = threading.Condition()
+        self._pending: list[tuple[EvaluatorInput, Future[Value], float]] = []
+        self._closed = False
+        self._stats = BatcherStats()
+        self._thread = threading.Thread(
+            target=self._run, name="valanga-evaluation-batcher", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> Self:
+        """Return the batcher for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Evaluate the pending items and stop the batcher."""
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        """Return the number of items waiting for their batch."""
+        with self._condition:
+            return len(self._pending)
+
+    def stats(self) -> BatcherStats:
+        """Return a snapshot of the batcher counters."""
+        with self._condition:
+            return self._stats.copy()
+
+    def submit(self, item: EvalItem[StateT]) -> Future[Value]:
+        """Queue ``item`` for evaluation.
+
+        The evaluator input is built on the calling thread, so the item state
+        may change once this returns.
+
+        Returns:
+            Future[Value]: Resolves to the value of ``item``.
+
+        Raises:
+            MissingRepresentationError: If ``item`` has no state representation.
+            BatcherClosedError: If the batcher is closed.
+
+        """
+        representation = item.state_representation
+        if representation is None:
+            raise MissingRepresentationError
+        evaluator_input = representation.get_evaluator_input(item.state)
+        future: Future[Value] = Future()
+        with self._condition:
+            if self._closed:
+                raise BatcherClosedError
+            self._pending.append((evaluator_input, future, time.monotonic()))
+            depth = len(self._pending)
+            self._stats.queue_depths[depth] += 1
+            if depth == 1 or depth >= self.max_batch_size:
+                self._condition.notify()
+        return future
+
+    def evaluate(self, item: EvalItem[StateT]) -> Value:
+        """Submit ``item`` and wait for its value."""
+        return self.submit(item).result()
+
+    def close(self) -> None:
+        """Evaluate the pending items and stop the worker thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _next_batch(self) -> list[tuple[EvaluatorInput, Future[Value], float]] | None:
+        with self._condition:
+            while True:
+                full = len(self._pending) >= self.max_batch_size
+                if full:
+                    break
+                if self._pending:
+                    oldest = self._pending[0][2]
+                    remaining = oldest + self.max_latency - time.monotonic()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._condition.wait(remaining)
+                elif self._closed:
+                    return None
+                else:
+                    self._condition.wait()
+            size = min(len(self._pending), self.max_batch_size)
+            taken, self._pending = self._pending[:size], self._pending[size:]
+            # Futures cancelled by their caller are dropped; the others can no
+            # longer be cancelled once running.
+            batch = [
+                entry for entry in taken if entry[1].set_running_or_notify_cancel()
+            ]
+            self._stats.cancelled += size - len(batch)
+            if batch:
+                self._stats.items += len(batch)
+                self._stats.batches += 1
+                self._stats.batch_sizes[len(batch)] += 1
+                if full:
+                    self._stats.full_flushes += 1
+                else:
+                    self._stats.deadline_flushes += 1
+        return batch
+
+    def _run(self) -> None:
+        while (batch := self._next_batch()) is not None:
+            if not batch:
+                continue
+            futures = [future for _, future, _ in batch]
+            try:
+                values = self.evaluator(self.stack([item[0] for item in batch]))
+                if len(values) != len(futures):
+                    raise EvaluationCountMismatchError(len(futures), len(values))  # noqa: TRY301
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                for future in futures:
+                    future.set_exception(error)
+                continue
+            for future, value in zip(futures, values, strict=True):
+                future.set_result(value)
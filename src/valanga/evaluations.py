@@ -50,3 +50,15 @@ class Value:
     certainty: Certainty
     over_event: OverEvent[Role] | None = None
     line: list[BranchKey] | None = None
+
+
+class StateEvaluator[StateT: State](Protocol):
+    """Protocol for a static evaluation function used by search engines.
+
+    Scores are expressed from the point of view of ``Color.WHITE`` in two-player
+    games: positive scores favour white and negative scores favour black.
+    """
+
+    def __call__(self, state: StateT) -> Value:
+        """Return the static evaluation of ``state``."""
+        ...
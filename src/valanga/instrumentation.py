@@ -0,0 +1,621 @@
+"""Opt-in call counts and latency histograms for game domains.
+
+Wrapping a :class:`~valanga.dynamics.Dynamics`, a
+:class:`~valanga.reversible_dynamics.ReversibleDynamics`, a
+:class:`~valanga.representation_factory.RepresentationFactory` or a checkpoint
+codec in the matching wrapper of this module times every call of its methods
+with :func:`time.perf_counter_ns` and records the latency under a
+``"<prefix>.<method>"`` key of an :class:`Instrumentation`. Nothing in the
+domain itself changes, and code that is not wrapped pays nothing.
+
+Wrapped calls do pay: timing and recording one call costs roughly a
+microsecond on CPython, which is noticeable next to a cheap ``step`` of a toy
+game. The wrappers are meant for profiling runs and for calls that cost much
+more than that, such as evaluator batches or checkpoint codecs, rather than
+for leaving around the innermost loop of a search in production.
+
+Latencies go to log-linear histograms in the spirit of HdrHistogram: values
+below 32 ns get a bucket each, and every larger power of two is split into 16
+buckets, which bounds the relative error of a reported percentile by 1/16.
+Each thread records into histograms of its own, so the hot path takes no lock;
+:meth:`Instrumentation.snapshot` merges the histograms of every thread.
+"""
+
+import json
+import math
+import threading
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from time import perf_counter_ns
+from typing import Any
+
+from .checkpoints import (
+    BatchStateCheckpointCodec,
+    CheckpointStateSummary,
+    IncrementalStateCheckpointCodec,
+    StateCheckpointCodec,
+    StateCheckpointSummaryCodec,
+)
+from .dynamics import Dynamics, Transition
+from .game import BranchKey, BranchKeyGeneratorP, State
+from .representation_factory import RepresentationFactory
+from .represention_for_evaluation import ContentRepresentation
+from .reversible_dynamics import ReversibleDynamics
+
+__all__ = [
+    "Instrumentation",
+    "InstrumentationSnapshot",
+    "InstrumentedBatchCheckpointCodec",
+    "InstrumentedDynamics",
+    "InstrumentedIncrementalCheckpointCodec",
+    "InstrumentedReversibleDynamics",
+    "InstrumentedStateCheckpointCodec",
+    "InstrumentedSummaryCheckpointCodec",
+    "LatencyHistogram",
+    "instrument_representation_factory",
+]
+
+SUB_BUCKET_BITS = 5
+_HALF_SUB_BUCKETS = 1 << (SUB_BUCKET_BITS - 1)
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(value: int) -> int:
+    shift = max(value.bit_length() - SUB_BUCKET_BITS, 0)
+    return (shift << (SUB_BUCKET_BITS - 1)) + (value >> shift)
+
+
+def _bucket_bounds(index: int) -> tuple[int, int]:
+    shift = max(index // _HALF_SUB_BUCKETS - 1, 0)
+    low = (index - (shift << (SUB_BUCKET_BITS - 1))) << shift
+    return low, low + (1 << shift) - 1
+
+
+# Enough buckets for any 64-bit latency, so recording never grows the list.
+_NUM_BUCKETS = _bucket_index((1 << 64) - 1) + 1
+_NO_MIN = 1 << 64
+
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond latencies.
+
+    A histogram is not thread-safe; :class:`Instrumentation` gives every
+    thread its own.
+    """
+
+    __slots__ = ("_counts", "_min_ns", "count", "max_ns", "total_ns")
+
+    def __init__(self) -> None:
+        """Create an empty histogram."""
+        self._counts = [0] * _NUM_BUCKETS
+        self._min_ns = _NO_MIN
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, value_ns: int) -> None:
+        """Record one latency; negative values count as zero."""
+        # This is the hot path of every instrumented call, hence the inlined
+        # bucket index and the comparisons, which are cheaper than max/min.
+        # pylint: disable=consider-using-max-builtin,consider-using-min-builtin
+        if value_ns < 0:  # noqa: PLR1730
+            value_ns = 0
+        shift = value_ns.bit_length() - SUB_BUCKET_BITS
+        if shift > 0:
+            self._counts[(shift << (SUB_BUCKET_BITS - 1)) + (value_ns >> shift)] += 1
+        else:
+            self._counts[value_ns] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if value_ns > self.max_ns:  # noqa: PLR1730
+            self.max_ns = value_ns
+        if value_ns < self._min_ns:  # noqa: PLR1730
+            self._min_ns = value_ns
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add the recorded values of ``other`` to this histogram."""
+        # pylint: disable=protected-access
+        counts = self._counts
+        for index, bucket_count in enumerate(list(other._counts)):
+            if bucket_count:
+                counts[index] += bucket_count
+        self._min_ns = min(self._min_ns, other._min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def clear(self) -> None:
+        """Forget every recorded value."""
+        self._counts[:] = [0] * _NUM_BUCKETS
+        self._min_ns = _NO_MIN
+        self.count = self.total_ns = self.max_ns = 0
+
+    @property
+    def min_ns(self) -> int:
+        """Return the smallest recorded latency, 0 when empty."""
+        return 0 if self._min_ns == _NO_MIN else self._min_ns
+
+    @property
+    def mean_ns(self) -> float:
+        """Return the average latency, 0 when empty."""
+        return self.total_ns / self.count if self.count else 0.0
+
+    def value_at_quantile(self, quantile: float) -> int:
+        """Return the latency below which ``quantile`` of the calls fall.
+
+        The value is the upper bound of the bucket holding the quantile,
+        capped by the largest recorded latency, so it never underestimates.
+        """
+        total = sum(self._counts)
+        if not total:
+            return 0
+        rank = max(1, min(total, math.ceil(quantile * total)))
+        seen = 0
+        for index, bucket_count in enumerate(self._counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(_bucket_bounds(index)[1], self.max_ns)
+        return self.max_ns
+
+    def buckets(self) -> Iterator[tuple[int, int, int]]:
+        """Yield ``(lowest_ns, highest_ns, count)`` for every non-empty bucket."""
+        for index, bucket_count in enumerate(self._counts):
+            if bucket_count:
+                low, high = _bucket_bounds(index)
+                yield low, high, bucket_count
+
+
+@dataclass(frozen=True, slots=True)
+class InstrumentationSnapshot:
+    """Histograms of an :class:`Instrumentation`, merged over threads.
+
+    Attributes:
+        histograms: The merged latency histogram of every recorded key.
+        threads: The number of threads that recorded calls.
+
+    """
+
+    histograms: Mapping[str, LatencyHistogram]
+    threads: int
+
+    def calls(self, key: str) -> int:
+        """Return the number of calls recorded under ``key``."""
+        histogram = self.histograms.get(key)
+        return histogram.count if histogram is not None else 0
+
+    def to_dict(
+        self,
+        quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+        *,
+        include_buckets: bool = False,
+    ) -> dict[str, Any]:
+        """Return the snapshot as JSON-compatible data.
+
+        Args:
+            quantiles: The quantiles reported for every key, as ``p50`` for
+                0.5 or ``p99.9`` for 0.999.
+            include_buckets: Whether to add the ``[lowest_ns, highest_ns,
+                count]`` triples of the non-empty buckets.
+
+        Returns:
+            dict[str, Any]: The thread count and the statistics of every key.
+
+        """
+        methods: dict[str, Any] = {}
+        for key, histogram in sorted(self.histograms.items()):
+            entry: dict[str, Any] = {
+                "calls": histogram.count,
+                "total_ns": histogram.total_ns,
+                "mean_ns": histogram.mean_ns,
+                "min_ns": histogram.min_ns,
+                "max_ns": histogram.max_ns,
+            }
+            for quantile in quantiles:
+                entry[f"p{100 * quantile:g}"] = histogram.value_at_quantile(quantile)
+            if include_buckets:
+                entry["buckets"] = [list(bucket) for bucket in histogram.buckets()]
+            methods[key] = entry
+        return {"threads": self.threads, "methods": methods}
+
+    def to_json(
+        self,
+        quantiles: tuple[float, ...] = DEFAULT_QUANTILES,
+        *,
+        include_buckets: bool = False,
+    ) -> str:
+        """Return :meth:`to_dict` serialized to JSON."""
+        return json.dumps(
+            self.to_dict(quantiles, include_buckets=include_buckets), indent=2
+        )
+
+
+class Instrumentation:
+    """Collect call latencies from any number of threads.
+
+    Each thread records into histograms only it writes to, registered once
+    per thread under a lock. :meth:`snapshot` reads them while they may be
+    written to, so a snapshot taken during calls can miss the calls in
+    flight; it is exact once the instrumented calls have returned.
+    """
+
+    def __init__(self) -> None:
+        """Create an instrumentation with nothing recorded."""
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._threads: list[dict[str, LatencyHistogram]] = []
+
+    def _thread_histograms(self) -> dict[str, LatencyHistogram]:
+        try:
+            histograms: dict[str, LatencyHistogram] = self._local.histograms
+        except AttributeError:
+            histograms = {}
+            self._local.histograms = histograms
+            with self._lock:
+                self._threads.append(histograms)
+        return histograms
+
+    def record(self, key: str, elapsed_ns: int) -> None:
+        """Record one call of ``key`` that took ``elapsed_ns`` nanoseconds."""
+        try:
+            histogram: LatencyHistogram = self._local.histograms[key]
+        except (AttributeError, KeyError):
+            histogram = self._thread_histograms().setdefault(key, LatencyHistogram())
+        histogram.record(elapsed_ns)
+
+    def snapshot(self) -> InstrumentationSnapshot:
+        """Return the histograms of every key, merged over threads."""
+        with self._lock:
+            threads = list(self._threads)
+        merged: dict[str, LatencyHistogram] = {}
+        for histograms in threads:
+            for key, histogram in list(histograms.items()):
+                merged.setdefault(key, LatencyHistogram()).merge(histogram)
+        return InstrumentationSnapshot(
+            histograms=merged,
+            threads=sum(1 for histograms in threads if histograms),
+        )
+
+    def reset(self) -> None:
+        """Forget every recorded call.
+
+        Calls recorded by other threads while this runs may be partly kept.
+        """
+        with self._lock:
+            threads = list(self._threads)
+        for histograms in threads:
+            for histogram in list(histograms.values()):
+                histogram.clear()
+
+
+class InstrumentedDynamics[StateT]:
+    """Time every method of a :class:`~valanga.dynamics.Dynamics`.
+
+    ``legal_actions`` is timed up to the return of the action generator, not
+    while the caller iterates it.
+    """
+
+    def __init__(
+        self,
+        dynamics: Dynamics[StateT],
+        instrumentation: Instrumentation,
+        prefix: str = "dynamics",
+    ) -> None:
+        """Wrap ``dynamics``, recording under ``"<prefix>.<method>"`` keys."""
+        self.dynamics = dynamics
+        self.instrumentation = instrumentation
+        self._legal_actions_key = f"{prefix}.legal_actions"
+        self._step_key = f"{prefix}.step"
+        self._action_name_key = f"{prefix}.action_name"
+        self._action_from_name_key = f"{prefix}.action_from_name"
+
+    def legal_actions(self, state: StateT) -> BranchKeyGeneratorP[BranchKey]:
+        """Return the legal actions of the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.legal_actions(state)
+        finally:
+            self.instrumentation.record(
+                self._legal_actions_key, perf_counter_ns() - start
+            )
+
+    def step(self, state: StateT, action: BranchKey) -> Transition[StateT]:
+        """Apply ``action`` through the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.step(state, action)
+        finally:
+            self.instrumentation.record(self._step_key, perf_counter_ns() - start)
+
+    def action_name(self, state: StateT, action: BranchKey) -> str:
+        """Return the name the wrapped dynamics gives ``action``."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.action_name(state, action)
+        finally:
+            self.instrumentation.record(
+                self._action_name_key, perf_counter_ns() - start
+            )
+
+    def action_from_name(self, state: StateT, name: str) -> BranchKey:
+        """Parse ``name`` through the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.action_from_name(state, name)
+        finally:
+            self.instrumentation.record(
+                self._action_from_name_key, perf_counter_ns() - start
+            )
+
+
+class InstrumentedReversibleDynamics[StateT, UndoT]:
+    """Time every method of a :class:`~valanga.reversible_dynamics.ReversibleDynamics`.
+
+    Reading ``state`` is not timed.
+    """
+
+    def __init__(
+        self,
+        dynamics: ReversibleDynamics[StateT, UndoT],
+        instrumentation: Instrumentation,
+        prefix: str = "reversible_dynamics",
+    ) -> None:
+        """Wrap ``dynamics``, recording under ``"<prefix>.<method>"`` keys."""
+        self.dynamics = dynamics
+        self.instrumentation = instrumentation
+        self._legal_actions_key = f"{prefix}.legal_actions"
+        self._push_key = f"{prefix}.push"
+        self._pop_key = f"{prefix}.pop"
+        self._action_name_key = f"{prefix}.action_name"
+        self._action_from_name_key = f"{prefix}.action_from_name"
+
+    @property
+    def state(self) -> StateT:
+        """Return the current state of the wrapped dynamics."""
+        return self.dynamics.state
+
+    def legal_actions(self) -> BranchKeyGeneratorP[BranchKey]:
+        """Return the legal actions of the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.legal_actions()
+        finally:
+            self.instrumentation.record(
+                self._legal_actions_key, perf_counter_ns() - start
+            )
+
+    def push(self, action: BranchKey) -> UndoT:
+        """Apply ``action`` through the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.push(action)
+        finally:
+            self.instrumentation.record(self._push_key, perf_counter_ns() - start)
+
+    def pop(self, undo: UndoT) -> None:
+        """Undo an action through the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            self.dynamics.pop(undo)
+        finally:
+            self.instrumentation.record(self._pop_key, perf_counter_ns() - start)
+
+    def action_name(self, action: BranchKey) -> str:
+        """Return the name the wrapped dynamics gives ``action``."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.action_name(action)
+        finally:
+            self.instrumentation.record(
+                self._action_name_key, perf_counter_ns() - start
+            )
+
+    def action_from_name(self, name: str) -> BranchKey:
+        """Parse ``name`` through the wrapped dynamics."""
+        start = perf_counter_ns()
+        try:
+            return self.dynamics.action_from_name(name)
+        finally:
+            self.instrumentation.record(
+                self._action_from_name_key, perf_counter_ns() - start
+            )
+
+
+def instrument_representation_factory[StateT: State, EvalIn, StateModT](
+    factory: RepresentationFactory[StateT, EvalIn, StateModT],
+    instrumentation: Instrumentation,
+    prefix: str = "representation",
+) -> RepresentationFactory[StateT, EvalIn, StateModT]:
+    """Return a factory timing both creators of ``factory``.
+
+    The result is a plain ``RepresentationFactory``, so it can replace
+    ``factory`` anywhere. Calls are recorded under the
+    ``"<prefix>.create_from_state"`` and
+    ``"<prefix>.create_from_state_and_modifications"`` keys.
+    """
+    create_full = factory.create_from_state
+    create_incremental = factory.create_from_state_and_modifications
+    full_key = f"{prefix}.create_from_state"
+    incremental_key = f"{prefix}.create_from_state_and_modifications"
+
+    def create_from_state(state: StateT) -> ContentRepresentation[StateT, EvalIn]:
+        start = perf_counter_ns()
+        try:
+            return create_full(state)
+        finally:
+            instrumentation.record(full_key, perf_counter_ns() - start)
+
+    def create_from_state_and_modifications(
+        state: StateT,
+        state_modifications: StateModT,
+        previous_state_representation: ContentRepresentation[StateT, EvalIn],
+    ) -> ContentRepresentation[StateT, EvalIn]:
+        start = perf_counter_ns()
+        try:
+            return create_incremental(
+                state, state_modifications, previous_state_representation
+            )
+        finally:
+            instrumentation.record(incremental_key, perf_counter_ns() - start)
+
+    return RepresentationFactory(
+        create_from_state=create_from_state,
+        create_from_state_and_modifications=create_from_state_and_modifications,
+    )
+
+
+class InstrumentedStateCheckpointCodec[StateT]:
+    """Time both methods of a :class:`~valanga.checkpoints.StateCheckpointCodec`."""
+
+    def __init__(
+        self,
+        codec: StateCheckpointCodec[StateT],
+        instrumentation: Instrumentation,
+        prefix: str = "checkpoint_codec",
+    ) -> None:
+        """Wrap ``codec``, recording under ``"<prefix>.<method>"`` keys."""
+        self.codec = codec
+        self.instrumentation = instrumentation
+        self._dump_key = f"{prefix}.dump_state_ref"
+        self._load_key = f"{prefix}.load_state_ref"
+
+    def dump_state_ref(self, state: StateT) -> object:
+        """Serialize ``state`` through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.dump_state_ref(state)
+        finally:
+            self.instrumentation.record(self._dump_key, perf_counter_ns() - start)
+
+    def load_state_ref(self, payload: object) -> StateT:
+        """Restore a state through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.load_state_ref(payload)
+        finally:
+            self.instrumentation.record(self._load_key, perf_counter_ns() - start)
+
+
+class InstrumentedIncrementalCheckpointCodec[StateT, AnchorRefT, DeltaRefT]:
+    """Time every method of an incremental checkpoint codec."""
+
+    def __init__(
+        self,
+        codec: IncrementalStateCheckpointCodec[StateT, AnchorRefT, DeltaRefT],
+        instrumentation: Instrumentation,
+        prefix: str = "checkpoint_codec",
+    ) -> None:
+        """Wrap ``codec``, recording under ``"<prefix>.<method>"`` keys."""
+        self.codec = codec
+        self.instrumentation = instrumentation
+        self._dump_anchor_key = f"{prefix}.dump_anchor_ref"
+        self._load_anchor_key = f"{prefix}.load_anchor_ref"
+        self._dump_delta_key = f"{prefix}.dump_delta_from_parent"
+        self._load_child_key = f"{prefix}.load_child_from_delta"
+
+    def dump_anchor_ref(self, state: StateT) -> AnchorRefT:
+        """Serialize an anchor state through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.dump_anchor_ref(state)
+        finally:
+            self.instrumentation.record(
+                self._dump_anchor_key, perf_counter_ns() - start
+            )
+
+    def load_anchor_ref(self, payload: AnchorRefT) -> StateT:
+        """Restore an anchor state through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.load_anchor_ref(payload)
+        finally:
+            self.instrumentation.record(
+                self._load_anchor_key, perf_counter_ns() - start
+            )
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: StateT,
+        child_state: StateT,
+        branch_from_parent: BranchKey | None = None,
+    ) -> DeltaRefT:
+        """Serialize a child as a delta through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.dump_delta_from_parent(
+                parent_state=parent_state,
+                child_state=child_state,
+                branch_from_parent=branch_from_parent,
+            )
+        finally:
+            self.instrumentation.record(self._dump_delta_key, perf_counter_ns() - start)
+
+    def load_child_from_delta(
+        self, *, parent_state: StateT, delta_ref: DeltaRefT
+    ) -> StateT:
+        """Restore a child from its delta through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.load_child_from_delta(
+                parent_state=parent_state, delta_ref=delta_ref
+            )
+        finally:
+            self.instrumentation.record(self._load_child_key, perf_counter_ns() - start)
+
+
+class InstrumentedBatchCheckpointCodec[StateT]:
+    """Time both methods of a :class:`~valanga.checkpoints.BatchStateCheckpointCodec`.
+
+    Each batch is recorded as one call, whatever its size.
+    """
+
+    def __init__(
+        self,
+        codec: BatchStateCheckpointCodec[StateT],
+        instrumentation: Instrumentation,
+        prefix: str = "checkpoint_codec",
+    ) -> None:
+        """Wrap ``codec``, recording under ``"<prefix>.<method>"`` keys."""
+        self.codec = codec
+        self.instrumentation = instrumentation
+        self._dump_key = f"{prefix}.dump_state_refs"
+        self._load_key = f"{prefix}.load_state_refs"
+
+    def dump_state_refs(self, states: Sequence[StateT]) -> list[object]:
+        """Serialize ``states`` through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.dump_state_refs(states)
+        finally:
+            self.instrumentation.record(self._dump_key, perf_counter_ns() - start)
+
+    def load_state_refs(self, payloads: Sequence[object]) -> list[StateT]:
+        """Restore the states of ``payloads`` through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.load_state_refs(payloads)
+        finally:
+            self.instrumentation.record(self._load_key, perf_counter_ns() - start)
+
+
+class InstrumentedSummaryCheckpointCodec[StateT]:
+    """Time a :class:`~valanga.checkpoints.StateCheckpointSummaryCodec`."""
+
+    def __init__(
+        self,
+        codec: StateCheckpointSummaryCodec[StateT],
+        instrumentation: Instrumentation,
+        prefix: str = "checkpoint_codec",
+    ) -> None:
+        """Wrap ``codec``, recording under ``"<prefix>.<method>"`` keys."""
+        self.codec = codec
+        self.instrumentation = instrumentation
+        self._summary_key = f"{prefix}.dump_state_summary"
+
+    def dump_state_summary(self, state: StateT) -> CheckpointStateSummary:
+        """Summarize ``state`` through the wrapped codec."""
+        start = perf_counter_ns()
+        try:
+            return self.codec.dump_state_summary(state)
+        finally:
+            self.instrumentation.record(self._summary_key, perf_counter_ns() - start)
@@ -0,0 +1,103 @@
+"""State handles answered from checkpoint summaries until the full state is needed.
+
+Resuming a saved tree by restoring every node replays every anchor and delta,
+although most nodes are never visited again. A ``LazyState`` answers ``tag``
+and ``is_game_over`` from the node's :class:`CheckpointStateSummary` and only
+restores the concrete state, through a loader such as
+:meth:`valanga.checkpoint_store.CheckpointStore.load`, when something else is
+asked of it.
+"""
+
+from collections.abc import Callable, Iterable
+from functools import partial
+
+from .checkpoint_store import CheckpointStore, NodeId
+from .checkpoints import CheckpointStateSummary
+from .game import State, StateTag
+
+__all__ = ["LazyState", "lazy_states"]
+
+
+class LazyState[StateT: State]:
+    """``State`` handle materializing the concrete state on first use.
+
+    Attributes the handle does not define are looked up on the materialized
+    state, so domain code can keep using it as the concrete state. The handle
+    is not thread-safe: concurrent first accesses may each restore the state.
+    """
+
+    __slots__ = ("_loader", "_state", "summary")
+
+    def __init__(
+        self, summary: CheckpointStateSummary, loader: Callable[[], StateT]
+    ) -> None:
+        """Wrap ``summary`` and the ``loader`` restoring the full state."""
+        self.summary = summary
+        self._loader = loader
+        self._state: StateT | None = None
+
+    @property
+    def is_materialized(self) -> bool:
+        """Return whether the full state has been restored."""
+        return self._state is not None
+
+    @property
+    def state(self) -> StateT:
+        """Return the full state, restoring it on first access."""
+        if self._state is None:
+            self._state = self._loader()
+        return self._state
+
+    def release(self) -> None:
+        """Drop the restored state; it is restored again when needed."""
+        self._state = None
+
+    @property
+    def tag(self) -> StateTag:
+        """Return the tag, from the summary when it has one."""
+        if self.summary.tag is not None:
+            return self.summary.tag
+        return self.state.tag
+
+    def is_game_over(self) -> bool:
+        """Return whether the state is terminal, from the summary when known."""
+        if self.summary.is_terminal is not None:
+            return self.summary.is_terminal
+        return self.state.is_game_over()
+
+    def pprint(self) -> str:
+        """Return the pretty-printed full state."""
+        return self.state.pprint()
+
+    def __getattr__(self, name: str) -> object:
+        """Look up ``name`` on the full state."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.state, name)
+
+    def __repr__(self) -> str:
+        """Return a representation that does not restore the state."""
+        return (
+            f"LazyState(summary={self.summary!r}, materialized={self.is_materialized})"
+        )
+
+
+def lazy_states[StateT: State, AnchorRefT, DeltaRefT](
+    store: CheckpointStore[StateT, AnchorRefT, DeltaRefT],
+    summaries: Iterable[tuple[NodeId, CheckpointStateSummary]],
+) -> dict[NodeId, LazyState[StateT]]:
+    """Return lazy handles of the nodes of ``summaries``, without restoring any.
+
+    Args:
+        store: The store restoring the nodes that end up being used.
+        summaries: ``(node_id, summary)`` pairs, for instance
+            :meth:`valanga.summary_index.CheckpointSummaryIndex.items`.
+
+    Returns:
+        dict[NodeId, LazyState[StateT]]: One handle per node id.
+
+    """
+    return {
+        node_id: LazyState(summary, partial(store.load, node_id))
+        for node_id, summary in summaries
+    }
@@ -0,0 +1,323 @@
+"""Monte Carlo Tree Search selector with array-backed node statistics.
+
+``MctsSelector`` grows its tree with ``Dynamics.step`` and ``legal_actions``.
+Node statistics live in parallel typed arrays indexed by node id, and the
+children of a node occupy a contiguous range of ids, so the tree never holds
+one Python object per node besides the states it had to materialize.
+
+:meth:`MctsSelector.start` returns a session running the playouts in bounded
+steps; ``recommend`` runs such a session to completion.
+"""
+
+import math
+import random
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Protocol
+
+from .dynamics import Dynamics
+from .evaluations import Certainty, StateEvaluator, Value
+from .game import BranchKey, BranchName, Color, Role, Seed, TurnState
+from .policy import (
+    BranchPolicy,
+    NoBranchToRecommendError,
+    NotifyProgressCallable,
+    Recommendation,
+    SearchSession,
+    run_to_completion,
+)
+
+__all__ = ["InvalidSimulationCountError", "MctsSelector", "PriorFunction"]
+
+_UNEXPANDED = -1
+
+
+class InvalidSimulationCountError(ValueError):
+    """Raised when a selector is configured with fewer than one playout."""
+
+    def __init__(self, num_simulations: int) -> None:
+        """Build the error from the rejected count."""
+        super().__init__(f"num_simulations must be at least 1, got {num_simulations}")
+
+
+class PriorFunction[StateT](Protocol):
+    """Return prior probabilities for the branches of a state."""
+
+    def __call__(self, state: StateT, actions: Sequence[BranchKey]) -> Sequence[float]:
+        """Return one prior per action, in the order of ``actions``."""
+        ...
+
+
+def _sign(turn: Role) -> float:
+    """Return -1 when black is to act and +1 for any other role."""
+    return -1.0 if turn is Color.BLACK else 1.0
+
+
+class _ArrayTree[StateT: TurnState]:
+    """Search tree stored as parallel arrays indexed by node id."""
+
+    def __init__(self, root: StateT) -> None:
+        self.visits = array("q", [0])
+        self.value_sums = array("d", [0.0])
+        self.priors = array("d", [1.0])
+        self.first_children = array("q", [_UNEXPANDED])
+        self.num_children = array("l", [0])
+        self.actions: list[BranchKey | None] = [None]
+        self.states: list[StateT | None] = [root]
+
+    def __len__(self) -> int:
+        """Return the number of nodes of the tree."""
+        return len(self.visits)
+
+    def children(self, node: int) -> range:
+        """Return the ids of the children of ``node``."""
+        first = self.first_children[node]
+        return range(first, first + self.num_children[node])
+
+    def expand(
+        self, node: int, actions: Sequence[BranchKey], priors: Sequence[float]
+    ) -> None:
+        """Append one unexpanded child of ``node`` per action."""
+        count = len(actions)
+        self.first_children[node] = len(self.visits)
+        self.num_children[node] = count
+        self.visits.extend(array("q", [0]) * count)
+        self.value_sums.extend(array("d", [0.0]) * count)
+        self.priors.extend(priors)
+        self.first_children.extend(array("q", [_UNEXPANDED]) * count)
+        self.num_children.extend(array("l", [0]) * count)
+        self.actions.extend(actions)
+        self.states.extend([None] * count)
+
+    def mean(self, node: int) -> float:
+        """Return the mean value of ``node``, or 0 if it was never visited."""
+        visits = self.visits[node]
+        return self.value_sums[node] / visits if visits else 0.0
+
+
+@dataclass
+class MctsSelector[StateT: TurnState]:
+    """PUCT Monte Carlo Tree Search built on stateless dynamics.
+
+    Leaves are scored with ``evaluator`` instead of random rollouts. Scores are
+    read from the point of view of ``Color.WHITE`` and are expected to lie
+    roughly in ``[-1, 1]`` so that they balance the exploration term. States
+    whose role is not ``Color.BLACK`` maximize the score, which also covers
+    single-player games.
+
+    Attributes:
+        dynamics: The stateless dynamics used to expand the tree.
+        evaluator: Static evaluation of leaf and terminal states.
+        num_simulations: The number of playouts per recommendation.
+        exploration: The PUCT exploration constant.
+        prior: Optional branch priors. Defaults to uniform priors.
+
+    """
+
+    dynamics: Dynamics[StateT]
+    evaluator: StateEvaluator[StateT]
+    num_simulations: int = 800
+    exploration: float = 1.25
+    prior: PriorFunction[StateT] | None = None
+
+    def __post_init__(self) -> None:
+        """Validate the playout count.
+
+        Raises:
+            InvalidSimulationCountError: If ``num_simulations`` is below 1.
+
+        """
+        if self.num_simulations < 1:
+            raise InvalidSimulationCountError(self.num_simulations)
+
+    def recommend(
+        self,
+        state: StateT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> Recommendation:
+        """Run the playouts from ``state`` and recommend the most visited branch.
+
+        Args:
+            state (StateT): The root state.
+            seed (Seed): Seed used to order the root branches, which breaks
+                ties between equally visited branches.
+            notify_progress (NotifyProgressCallable | None): Optional callback
+                receiving the completed percentage of playouts.
+
+        Returns:
+            Recommendation: The most visited branch, a ``BranchPolicy`` built
+            from the root visit counts and the mean value of every root branch.
+
+        Raises:
+            NoBranchToRecommendError: If ``state`` is over or has no action.
+
+        """
+        return run_to_completion(self.start(state, seed, notify_progress))
+
+    def start(
+        self,
+        state: StateT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> SearchSession:
+        """Return a search of ``state`` that runs when stepped.
+
+        Every playout counts as one node of the step budgets, and a
+        recommendation is available after the first playout.
+
+        Raises:
+            NoBranchToRecommendError: If ``state`` is over or has no action.
+
+        """
+        if state.is_game_over():
+            raise NoBranchToRecommendError
+        root_actions = list(self.dynamics.legal_actions(state).get_all())
+        if not root_actions:
+            raise NoBranchToRecommendError
+        random.Random(seed).shuffle(root_actions)
+        tree = _ArrayTree(state)
+        tree.expand(0, root_actions, self._priors(state, root_actions))
+        return _MctsSession(
+            tree,
+            simulate=self._simulate,
+            recommendation=lambda: self._recommendation(tree, state),
+            num_simulations=self.num_simulations,
+            notify_progress=notify_progress,
+        )
+
+    def _priors(self, state: StateT, actions: Sequence[BranchKey]) -> Sequence[float]:
+        if self.prior is None:
+            return [1.0 / len(actions)] * len(actions)
+        return self.prior(state, actions)
+
+    def _select_child(self, tree: _ArrayTree[StateT], node: int) -> int:
+        visits = tree.visits
+        value_sums = tree.value_sums
+        priors = tree.priors
+        scale = self.exploration * math.sqrt(visits[node])
+        best_child = tree.first_children[node]
+        best_score = -math.inf
+        for child in tree.children(node):
+            child_visits = visits[child]
+            q = value_sums[child] / child_visits if child_visits else 0.0
+            score = q + scale * priors[child] / (1 + child_visits)
+            if score > best_score:
+                best_child, best_score = child, score
+        return best_child
+
+    def _simulate(self, tree: _ArrayTree[StateT]) -> None:
+        node = 0
+        path = [0]
+        state = tree.states[0]
+        assert state is not None
+        root = state
+        while tree.num_children[node]:
+            parent_state = state
+            node = self._select_child(tree, node)
+            state = tree.states[node]
+            if state is None:
+                action = tree.actions[node]
+                state = self.dynamics.step(parent_state, action).next_state
+                tree.states[node] = state
+            path.append(node)
+
+        white_score = self.evaluator(state).score
+        if not state.is_game_over():
+            actions = self.dynamics.legal_actions(state).get_all()
+            if actions:
+                tree.expand(node, actions, self._priors(state, actions))
+
+        # Each node accumulates the score of the role that acted into it.
+        for position in range(len(path) - 1, 0, -1):
+            child = path[position]
+            acting_state = tree.states[path[position - 1]]
+            assert acting_state is not None
+            tree.visits[child] += 1
+            tree.value_sums[child] += _sign(acting_state.turn) * white_score
+        tree.visits[0] += 1
+        tree.value_sums[0] += _sign(root.turn) * white_score
+
+    def _recommendation(self, tree: _ArrayTree[StateT], root: StateT) -> Recommendation:
+        sign = _sign(root.turn)
+        total = max(tree.visits[0], 1)
+        probs: dict[BranchKey, float] = {}
+        branch_evals: dict[BranchName, Value] = {}
+        best_child = tree.first_children[0]
+        for child in tree.children(0):
+            action = tree.actions[child]
+            probs[action] = tree.visits[child] / total
+            branch_evals[self.dynamics.action_name(root, action)] = Value(
+                score=sign * tree.mean(child), certainty=Certainty.ESTIMATE
+            )
+            if tree.visits[child] > tree.visits[best_child]:
+                best_child = child
+
+        best_action = tree.actions[best_child]
+        return Recommendation(
+            recommended_name=self.dynamics.action_name(root, best_action),
+            evaluation=Value(
+                score=sign * tree.mean(best_child),
+                certainty=Certainty.ESTIMATE,
+                line=self._principal_line(tree, best_child),
+            ),
+            policy=BranchPolicy(probs=probs),
+            branch_evals=branch_evals,
+        )
+
+    @staticmethod
+    def _principal_line(tree: _ArrayTree[StateT], node: int) -> list[BranchKey]:
+        line = [tree.actions[node]]
+        while tree.num_children[node]:
+            node = max(tree.children(node), key=tree.visits.__getitem__)
+            if not tree.visits[node]:
+                break
+            line.append(tree.actions[node])
+        return line
+
+
+class _MctsSession[StateT: TurnState]:
+    """Resumable sequence of playouts from one root state."""
+
+    def __init__(
+        self,
+        tree: _ArrayTree[StateT],
+        *,
+        simulate: Callable[[_ArrayTree[StateT]], None],
+        recommendation: Callable[[], Recommendation],
+        num_simulations: int,
+        notify_progress: NotifyProgressCallable | None,
+    ) -> None:
+        self.tree = tree
+        self._simulate = simulate
+        self._recommendation = recommendation
+        self.num_simulations = num_simulations
+        self.notify_progress = notify_progress
+        self.simulations = 0
+        self._reported = -1
+
+    @property
+    def nodes(self) -> int:
+        """Return the number of simulations run so far."""
+        return self.simulations
+
+    def best(self) -> Recommendation | None:
+        """Return the recommendation of the current tree, if anything was run."""
+        if not self.simulations:
+            return None
+        return self._recommendation()
+
+    def step(self, max_nodes: float = math.inf) -> bool:
+        """Run up to ``max_nodes`` more simulations and return whether it is over."""
+        total = self.num_simulations
+        stop = int(min(total, self.simulations + max_nodes))
+        while self.simulations < stop:
+            self._simulate(self.tree)
+            self.simulations += 1
+            if self.notify_progress is not None:
+                percent = 100 * self.simulations // total
+                if percent != self._reported:
+                    self._reported = percent
+                    self.notify_progress(percent)
+        return self.simulations >= total
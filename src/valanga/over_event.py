@@ -1,8 +1,9 @@
 """Terminal outcome types and helpers."""
 
 from collections.abc import Hashable
-from dataclasses import dataclass
+from dataclasses import FrozenInstanceError, dataclass
 from enum import Enum, auto
+from typing import Any
 
 from .game import Role
 
@@ -110,3 +111,96 @@ class OverEvent[RoleT: Role]:
     def test(self) -> None:
         """Re-run the invariant checks."""
         self.__post_init__()
+
+    def interned(self) -> "OverEvent[RoleT]":
+        """Return the shared immutable event equal to this one.
+
+        See :func:`intern_over_event`.
+        """
+        return intern_over_event(self.outcome, self.termination, self.winner)
+
+
+class _InternedOverEvent[RoleT: Role](OverEvent[RoleT]):
+    """Immutable, pre-validated and hashable ``OverEvent`` flyweight.
+
+    Instances are only created by :func:`intern_over_event`, so equal interned
+    events are the same object and equality short-circuits on identity.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def create(
+        cls, outcome: Outcome, termination: Enum | None, winner: RoleT | None
+    ) -> "_InternedOverEvent[RoleT]":
+        """Build and check a new event, bypassing the frozen ``__setattr__``."""
+        event = object.__new__(cls)
+        object.__setattr__(event, "outcome", outcome)
+        object.__setattr__(event, "termination", termination)
+        object.__setattr__(event, "winner", winner)
+        event.test()
+        return event
+
+    def __setattr__(self, name: str, value: object) -> None:
+        """Reject mutation of a shared event."""
+        raise FrozenInstanceError(name)
+
+    def __delattr__(self, name: str) -> None:
+        """Reject mutation of a shared event."""
+        raise FrozenInstanceError(name)
+
+    def __eq__(self, other: object) -> bool:
+        """Compare by identity first, then by fields against plain events."""
+        if self is other:
+            return True
+        if not isinstance(other, OverEvent):
+            return NotImplemented
+        return (self.outcome, self.termination, self.winner) == (
+            other.outcome,
+            other.termination,
+            other.winner,
+        )
+
+    def __hash__(self) -> int:
+        """Hash the fields, which never change after interning."""
+        return hash((self.outcome, self.termination, self.winner))
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Unpickle to the interned instance of the receiving process."""
+        return (intern_over_event, (self.outcome, self.termination, self.winner))
+
+
+_interned_over_events: dict[
+    tuple[Outcome, Enum | None, type, Hashable], _InternedOverEvent[Any]
+] = {}
+
+
+def intern_over_event[RoleT: Role](
+    outcome: Outcome,
+    termination: Enum | None = None,
+    winner: RoleT | None = None,
+) -> OverEvent[RoleT]:
+    """Return the shared immutable event for these fields.
+
+    Games only produce a handful of distinct terminal events, so terminal-heavy
+    searches can reuse one validated instance per combination instead of
+    building and validating a new ``OverEvent`` every time. The returned event
+    is hashable and cannot be mutated.
+
+    Args:
+        outcome: The result semantics.
+        termination: Why the game or episode stopped.
+        winner: Optional role metadata for role-based wins.
+
+    Returns:
+        OverEvent[RoleT]: The interned event.
+
+    """
+    key = (outcome, termination, type(winner), winner)
+    event = _interned_over_events.get(key)
+    if event is None:
+        created: _InternedOverEvent[RoleT] = _InternedOverEvent[RoleT].create(
+            outcome, termination, winner
+        )
+        event = _interned_over_events.setdefault(key, created)
+    return event
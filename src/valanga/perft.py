@@ -0,0 +1,396 @@
+"""Perft throughput benchmarks for ``Dynamics`` and ``ReversibleDynamics``.
+
+Perft counts the leaves of the game tree down to a fixed depth. Running it
+exercises nothing but action generation and move application, so its speed is
+a direct measure of a dynamics implementation. A game must generate no legal
+action once it is over for the counts to be meaningful.
+
+Every benchmark reports, for one walk mode (``step`` for stateless dynamics,
+``push-pop`` for reversible ones):
+
+- the best nodes per second over a few repeats
+- the peak bytes traced by :mod:`tracemalloc` while applying one action,
+  averaged over the first actions of the walk, as a proxy of the allocations
+  per node
+- the extra time per node of iterating ``legal_actions(...).copy_with_reset()``
+  instead of the generator itself
+
+Results serialize to JSON, to compare implementations or releases. The
+reference games of :mod:`valanga.reference_games` can be benchmarked from the
+command line::
+
+    python -m valanga.perft --depth 6 --output perft.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable, Sequence
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from .dynamics import Dynamics
+from .game import State
+from .reference_games import REFERENCE_GAMES
+from .reversible_dynamics import ReversibleDynamics
+
+__all__ = [
+    "PerftResult",
+    "benchmark_reversible",
+    "benchmark_step",
+    "main",
+    "perft",
+    "perft_reversible",
+    "results_to_json",
+    "run_reference_suite",
+]
+
+STEP_MODE = "step"
+PUSH_POP_MODE = "push-pop"
+DEFAULT_ALLOCATION_SAMPLE = 2000
+
+
+@dataclass(frozen=True, slots=True)
+class PerftResult:  # pylint: disable=too-many-instance-attributes
+    """Measurements of one perft benchmark.
+
+    Attributes:
+        game: The name of the benchmarked game.
+        mode: ``"step"`` or ``"push-pop"``.
+        depth: The perft depth.
+        leaves: The number of leaves at ``depth``.
+        nodes: The number of visited nodes, root and leaves included.
+        seconds: The best walk time over the repeats.
+        nodes_per_second: ``nodes / seconds``.
+        peak_bytes_per_node: The average peak traced memory of applying one
+            action.
+        copy_with_reset_ns_per_node: The extra nanoseconds per node of walking
+            through ``copy_with_reset`` copies of the action generators. It is
+            a difference of timings, so noise can make it slightly negative.
+
+    """
+
+    game: str
+    mode: str
+    depth: int
+    leaves: int
+    nodes: int
+    seconds: float
+    nodes_per_second: float
+    peak_bytes_per_node: float
+    copy_with_reset_ns_per_node: float
+
+
+@dataclass(slots=True)
+class _AllocationTally:
+    total_bytes: int = 0
+    actions: int = 0
+    limit: int = DEFAULT_ALLOCATION_SAMPLE
+
+    def full(self) -> bool:
+        """Return whether enough actions have been traced."""
+        return self.actions >= self.limit
+
+    def add_peak_since(self, current: int) -> None:
+        """Count one action whose traced memory started at ``current`` bytes."""
+        self.total_bytes += tracemalloc.get_traced_memory()[1] - current
+        self.actions += 1
+
+    @property
+    def average(self) -> float:
+        """Return the average peak bytes of the counted actions."""
+        return self.total_bytes / self.actions if self.actions else 0.0
+
+
+def _walk_step[StateT: State](
+    dynamics: Dynamics[StateT], state: StateT, depth: int, copy_actions: bool
+) -> tuple[int, int]:
+    if depth == 0:
+        return 1, 1
+    actions = dynamics.legal_actions(state)
+    if copy_actions:
+        actions = actions.copy_with_reset()
+    leaves = 0
+    nodes = 1
+    for action in actions:
+        child = dynamics.step(state, action).next_state
+        child_leaves, child_nodes = _walk_step(dynamics, child, depth - 1, copy_actions)
+        leaves += child_leaves
+        nodes += child_nodes
+    return leaves, nodes
+
+
+def _walk_push_pop[StateT, UndoT](
+    dynamics: ReversibleDynamics[StateT, UndoT], depth: int, copy_actions: bool
+) -> tuple[int, int]:
+    if depth == 0:
+        return 1, 1
+    actions = dynamics.legal_actions()
+    if copy_actions:
+        actions = actions.copy_with_reset()
+    leaves = 0
+    nodes = 1
+    for action in actions:
+        undo = dynamics.push(action)
+        child_leaves, child_nodes = _walk_push_pop(dynamics, depth - 1, copy_actions)
+        dynamics.pop(undo)
+        leaves += child_leaves
+        nodes += child_nodes
+    return leaves, nodes
+
+
+def _tally_step[StateT: State](
+    dynamics: Dynamics[StateT], state: StateT, depth: int, tally: _AllocationTally
+) -> None:
+    if depth == 0:
+        return
+    for action in dynamics.legal_actions(state):
+        if tally.full():
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        child = dynamics.step(state, action).next_state
+        tally.add_peak_since(current)
+        _tally_step(dynamics, child, depth - 1, tally)
+
+
+def _tally_push_pop[StateT, UndoT](
+    dynamics: ReversibleDynamics[StateT, UndoT], depth: int, tally: _AllocationTally
+) -> None:
+    if depth == 0:
+        return
+    for action in dynamics.legal_actions():
+        if tally.full():
+            return
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        undo = dynamics.push(action)
+        tally.add_peak_since(current)
+        _tally_push_pop(dynamics, depth - 1, tally)
+        dynamics.pop(undo)
+
+
+def perft[StateT: State](dynamics: Dynamics[StateT], state: StateT, depth: int) -> int:
+    """Return the number of leaves ``depth`` actions below ``state``."""
+    return _walk_step(dynamics, state, depth, copy_actions=False)[0]
+
+
+def perft_reversible[StateT, UndoT](
+    dynamics: ReversibleDynamics[StateT, UndoT], depth: int
+) -> int:
+    """Return the number of leaves ``depth`` actions below the current state.
+
+    The dynamics is back to its starting state when this returns.
+    """
+    return _walk_push_pop(dynamics, depth, copy_actions=False)[0]
+
+
+def _best_time(
+    walk: Callable[[], tuple[int, int]], repeat: int
+) -> tuple[float, int, int]:
+    best = float("inf")
+    leaves = nodes = 0
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        leaves, nodes = walk()
+        best = min(best, time.perf_counter() - start)
+    return best, leaves, nodes
+
+
+def _measure_peak_bytes(
+    tally_walk: Callable[[_AllocationTally], None], sample: int
+) -> float:
+    tally = _AllocationTally(limit=sample)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    try:
+        tally_walk(tally)
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return tally.average
+
+
+# pylint: disable-next=too-many-arguments
+def _result(  # noqa: PLR0913
+    walk: Callable[[bool], tuple[int, int]],
+    tally_walk: Callable[[_AllocationTally], None],
+    *,
+    game: str,
+    mode: str,
+    depth: int,
+    repeat: int,
+    allocation_sample: int,
+) -> PerftResult:
+    seconds, leaves, nodes = _best_time(lambda: walk(False), repeat)
+    copy_seconds, _, _ = _best_time(lambda: walk(True), repeat)
+    return PerftResult(
+        game=game,
+        mode=mode,
+        depth=depth,
+        leaves=leaves,
+        nodes=nodes,
+        seconds=seconds,
+        nodes_per_second=nodes / seconds if seconds > 0 else 0.0,
+        peak_bytes_per_node=_measure_peak_bytes(tally_walk, allocation_sample),
+        copy_with_reset_ns_per_node=1e9 * (copy_seconds - seconds) / nodes,
+    )
+
+
+# pylint: disable-next=too-many-arguments
+def benchmark_step[StateT: State](  # noqa: PLR0913
+    dynamics: Dynamics[StateT],
+    state: StateT,
+    depth: int,
+    *,
+    game: str = "",
+    repeat: int = 3,
+    allocation_sample: int = DEFAULT_ALLOCATION_SAMPLE,
+) -> PerftResult:
+    """Benchmark perft through ``legal_actions`` and ``step``.
+
+    Args:
+        dynamics: The benchmarked rules.
+        state: The root of the walk.
+        depth: The perft depth.
+        game: The game name reported in the result.
+        repeat: The number of timed walks; the best one is kept.
+        allocation_sample: The number of actions whose allocations are traced.
+
+    Returns:
+        PerftResult: The measurements.
+
+    """
+    return _result(
+        lambda copy_actions: _walk_step(dynamics, state, depth, copy_actions),
+        lambda tally: _tally_step(dynamics, state, depth, tally),
+        game=game,
+        mode=STEP_MODE,
+        depth=depth,
+        repeat=repeat,
+        allocation_sample=allocation_sample,
+    )
+
+
+def benchmark_reversible[StateT, UndoT](
+    dynamics: ReversibleDynamics[StateT, UndoT],
+    depth: int,
+    *,
+    game: str = "",
+    repeat: int = 3,
+    allocation_sample: int = DEFAULT_ALLOCATION_SAMPLE,
+) -> PerftResult:
+    """Benchmark perft through ``push`` and ``pop`` from the current state.
+
+    See :func:`benchmark_step` for the arguments.
+    """
+    return _result(
+        lambda copy_actions: _walk_push_pop(dynamics, depth, copy_actions),
+        lambda tally: _tally_push_pop(dynamics, depth, tally),
+        game=game,
+        mode=PUSH_POP_MODE,
+        depth=depth,
+        repeat=repeat,
+        allocation_sample=allocation_sample,
+    )
+
+
+def run_reference_suite(
+    games: Sequence[str] | None = None, depth: int = 5, repeat: int = 3
+) -> list[PerftResult]:
+    """Benchmark both flavours of the reference games.
+
+    Args:
+        games: Names from :data:`valanga.reference_games.REFERENCE_GAMES`;
+            every reference game when None.
+        depth: The perft depth.
+        repeat: The number of timed walks per measurement.
+
+    Returns:
+        list[PerftResult]: A step and a push-pop result per game.
+
+    """
+    results: list[PerftResult] = []
+    for name in games or sorted(REFERENCE_GAMES):
+        reference = REFERENCE_GAMES[name]()
+        results.append(
+            benchmark_step(
+                reference.dynamics,
+                reference.initial_state,
+                depth,
+                game=name,
+                repeat=repeat,
+            )
+        )
+        results.append(
+            benchmark_reversible(
+                reference.reversible(reference.initial_state),
+                depth,
+                game=name,
+                repeat=repeat,
+            )
+        )
+    return results
+
+
+def _valanga_version() -> str:
+    try:
+        return metadata.version("valanga")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def results_to_json(results: Sequence[PerftResult]) -> dict[str, Any]:
+    """Return ``results`` with the environment they were measured in."""
+    return {
+        "valanga": _valanga_version(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": [asdict(result) for result in results],
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the reference suite from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m valanga.perft",
+        description="Perft throughput benchmarks of the reference games.",
+    )
+    parser.add_argument(
+        "--game",
+        action="append",
+        choices=sorted(REFERENCE_GAMES),
+        help="game to benchmark, repeatable; every reference game by default",
+    )
+    parser.add_argument("--depth", type=int, default=5, help="perft depth")
+    parser.add_argument("--repeat", type=int, default=3, help="timed walks per mode")
+    parser.add_argument(
+        "--output", type=Path, help="JSON file to write; JSON goes to stdout if unset"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_reference_suite(args.game, args.depth, args.repeat)
+    report = json.dumps(results_to_json(results), indent=2)
+    if args.output is None:
+        sys.stdout.write(report + "\n")
+        return 0
+    args.output.write_text(report + "\n", encoding="utf-8")
+    for result in results:
+        sys.stdout.write(
+            f"{result.game:>16} {result.mode:>8} depth {result.depth}: "
+            f"{result.leaves} leaves, {result.nodes_per_second:,.0f} nodes/s, "
+            f"{result.peak_bytes_per_node:.0f} B/node peak, "
+            f"copy_with_reset {result.copy_with_reset_ns_per_node:+.0f} ns/node\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
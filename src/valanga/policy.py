@@ -1,5 +1,6 @@
 """Policy-related classes and protocols for branch selection in game trees."""
 
+import math
 from collections.abc import Callable, Mapping
 from dataclasses import dataclass
 from typing import Protocol, TypeVar
@@ -10,6 +11,10 @@ from valanga.game import BranchKey, BranchName, Seed, State
 NotifyProgressCallable = Callable[[int], None] | None
 
 
+class NoBranchToRecommendError(ValueError):
+    """The state is terminal or has no legal branch to recommend."""
+
+
 @dataclass(frozen=True, slots=True)
 class BranchPolicy:
     """Represents a probability distribution over branches."""
@@ -51,3 +56,66 @@ class BranchSelector(Protocol[StateT_contra]):
 
         """
         ...
+
+
+class SearchSession(Protocol):
+    """A search that runs in bounded steps and can be queried between them."""
+
+    @property
+    def nodes(self) -> int:
+        """Return the number of nodes searched so far."""
+        ...
+
+    def step(self, max_nodes: float = math.inf) -> bool:
+        """Search about ``max_nodes`` more nodes and return whether the search is over.
+
+        Args:
+            max_nodes: The node budget of this step; the whole search when
+                infinite.
+
+        Returns:
+            bool: True once the search is complete.
+
+        """
+        ...
+
+    def best(self) -> Recommendation | None:
+        """Return the best recommendation found so far, if any."""
+        ...
+
+
+def run_to_completion(session: SearchSession) -> Recommendation:
+    """Step ``session`` until it is over and return its best recommendation.
+
+    Raises:
+        NoBranchToRecommendError: If the search ended without a recommendation.
+
+    """
+    session.step()
+    recommendation = session.best()
+    if recommendation is None:
+        raise NoBranchToRecommendError
+    return recommendation
+
+
+class SteppableBranchSelector(Protocol[StateT_contra]):
+    """Branch selector whose search can be run step by step."""
+
+    def start(
+        self,
+        state: StateT_contra,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> SearchSession:
+        """Return a search of ``state`` that only runs when stepped.
+
+        Args:
+            state (State): The current state of the game.
+            seed (Seed): A seed for any randomness involved in the selection.
+            notify_progress (NotifyProgressCallable | None): Optional callback for progress updates.
+
+        Returns:
+            SearchSession: The paused search.
+
+        """
+        ...
@@ -0,0 +1,121 @@
+"""LRU cache of states materialized from checkpoint chains.
+
+Restoring many nodes of one subtree replays the same ancestor deltas over and
+over. ``ReconstructionCache`` keeps recently materialized states under a memory
+budget so that :class:`valanga.checkpoint_store.CheckpointStore` can start a
+restore from the deepest cached ancestor instead of the anchor.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+
+__all__ = ["ReconstructionCache", "ReconstructionCacheStats"]
+
+
+@dataclass(frozen=True, slots=True)
+class ReconstructionCacheStats:
+    """Snapshot of the reconstruction cache counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    total_cost: int
+
+
+def _unit_cost(state: object) -> int:
+    """Count every state as one unit of the budget."""
+    del state
+    return 1
+
+
+class ReconstructionCache[StateT]:  # pylint: disable=too-many-instance-attributes
+    """Least-recently-used cache of states keyed by node id.
+
+    Cached states are shared between every restore that hits them, so they
+    must not be mutated by callers.
+    """
+
+    def __init__(
+        self, max_cost: int, cost: Callable[[StateT], int] | None = None
+    ) -> None:
+        """Create an empty cache.
+
+        Args:
+            max_cost: The memory budget, in the units returned by ``cost``.
+            cost: Estimate of the memory used by a state. Defaults to 1 per
+                state, making ``max_cost`` a maximum number of states.
+
+        """
+        self.max_cost = max_cost
+        self._cost: Callable[[StateT], int] = cost or _unit_cost
+        self._entries: OrderedDict[Hashable, tuple[StateT, int]] = OrderedDict()
+        self._total_cost = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached states."""
+        return len(self._entries)
+
+    def __contains__(self, node_id: Hashable) -> bool:
+        """Return whether ``node_id`` is cached, without touching its recency."""
+        return node_id in self._entries
+
+    def get(self, node_id: Hashable) -> StateT | None:
+        """Return the cached state of ``node_id`` and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(node_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(node_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, node_id: Hashable, state: StateT) -> None:
+        """Cache ``state`` for ``node_id``, evicting the least recently used states.
+
+        A state costing more than the whole budget is not cached.
+        """
+        cost = self._cost(state)
+        with self._lock:
+            previous = self._entries.pop(node_id, None)
+            if previous is not None:
+                self._total_cost -= previous[1]
+            if cost > self.max_cost:
+                return
+            self._entries[node_id] = (state, cost)
+            self._total_cost += cost
+            while self._total_cost > self.max_cost:
+                _, (_, evicted_cost) = self._entries.popitem(last=False)
+                self._total_cost -= evicted_cost
+                self.evictions += 1
+
+    def discard(self, node_id: Hashable) -> None:
+        """Drop ``node_id`` from the cache if present."""
+        with self._lock:
+            entry = self._entries.pop(node_id, None)
+            if entry is not None:
+                self._total_cost -= entry[1]
+
+    def clear(self) -> None:
+        """Drop every cached state."""
+        with self._lock:
+            self._entries.clear()
+            self._total_cost = 0
+
+    @property
+    def stats(self) -> ReconstructionCacheStats:
+        """Return a snapshot of the cache counters."""
+        return ReconstructionCacheStats(
+            hits=self.hits,
+            misses=self.misses,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            total_cost=self._total_cost,
+        )
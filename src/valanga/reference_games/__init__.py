@@ -0,0 +1,111 @@
+"""Small reference games implementing the valanga protocols.
+
+They give benchmarks, tests and examples something fast to run out of the
+box. Every game has immutable ``TurnState`` states with integer tags, a
+stateless :class:`~valanga.dynamics.Dynamics` flavour, a push/pop
+:class:`~valanga.reversible_dynamics.ReversibleDynamics` flavour whose live
+state is a mutable board with the same read API, and a
+checkpoint codec implementing
+:class:`~valanga.checkpoints.IncrementalStateCheckpointCodec`, and is
+registered by name in :data:`REFERENCE_GAMES`.
+"""
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from ..checkpoints import IncrementalStateCheckpointCodec
+from ..dynamics import Dynamics
+from ..game import State
+from ..reversible_dynamics import ReversibleDynamics
+from .branch_keys import SequenceBranchKeys
+from .connect_four import (
+    ConnectFourBoard,
+    ConnectFourCheckpointCodec,
+    ConnectFourDynamics,
+    ConnectFourState,
+    ReversibleConnectFour,
+)
+from .fifteen_puzzle import (
+    FifteenPuzzleBoard,
+    FifteenPuzzleCheckpointCodec,
+    FifteenPuzzleDynamics,
+    FifteenPuzzleState,
+    ReversibleFifteenPuzzle,
+    scrambled_fifteen_puzzle,
+)
+from .tic_tac_toe import (
+    ReversibleTicTacToe,
+    TicTacToeBoard,
+    TicTacToeCheckpointCodec,
+    TicTacToeDynamics,
+    TicTacToeState,
+)
+
+__all__ = [
+    "REFERENCE_GAMES",
+    "ConnectFourBoard",
+    "ConnectFourCheckpointCodec",
+    "ConnectFourDynamics",
+    "ConnectFourState",
+    "FifteenPuzzleBoard",
+    "FifteenPuzzleCheckpointCodec",
+    "FifteenPuzzleDynamics",
+    "FifteenPuzzleState",
+    "ReferenceGame",
+    "ReversibleConnectFour",
+    "ReversibleFifteenPuzzle",
+    "ReversibleTicTacToe",
+    "SequenceBranchKeys",
+    "TicTacToeBoard",
+    "TicTacToeCheckpointCodec",
+    "TicTacToeDynamics",
+    "TicTacToeState",
+    "scrambled_fifteen_puzzle",
+]
+
+
+@dataclass(frozen=True, slots=True)
+class ReferenceGame[StateT: State]:
+    """Everything a reference game provides, with its usual start.
+
+    Attributes:
+        name: The registry name of the game.
+        dynamics: The stateless rules.
+        initial_state: The usual starting position.
+        reversible: Builds push/pop rules starting from a given state. Their
+            live state is a mutable board, not a ``StateT``.
+        checkpoint_codec: The anchor and delta checkpoint codec.
+
+    """
+
+    name: str
+    dynamics: Dynamics[StateT]
+    initial_state: StateT
+    reversible: Callable[[StateT], ReversibleDynamics[Any, Any]]
+    checkpoint_codec: IncrementalStateCheckpointCodec[StateT, Any, Any]
+
+
+REFERENCE_GAMES: dict[str, Callable[[], ReferenceGame[Any]]] = {
+    "connect-four": lambda: ReferenceGame(
+        "connect-four",
+        ConnectFourDynamics(),
+        ConnectFourState(),
+        ReversibleConnectFour,
+        ConnectFourCheckpointCodec(),
+    ),
+    "fifteen-puzzle": lambda: ReferenceGame(
+        "fifteen-puzzle",
+        FifteenPuzzleDynamics(),
+        scrambled_fifteen_puzzle(seed=0),
+        ReversibleFifteenPuzzle,
+        FifteenPuzzleCheckpointCodec(),
+    ),
+    "tic-tac-toe": lambda: ReferenceGame(
+        "tic-tac-toe",
+        TicTacToeDynamics(),
+        TicTacToeState(),
+        ReversibleTicTacToe,
+        TicTacToeCheckpointCodec(),
+    ),
+}
@@ -0,0 +1,46 @@
+"""Eager branch key generator shared by the reference games."""
+
+from collections.abc import Hashable, Iterator, Sequence
+from typing import Self
+
+__all__ = ["SequenceBranchKeys"]
+
+
+class SequenceBranchKeys[KeyT: Hashable]:
+    """``BranchKeyGeneratorP`` over a sequence of keys computed up front."""
+
+    sort_branch_keys: bool = False
+
+    def __init__(self, keys: Sequence[KeyT]) -> None:
+        """Generate ``keys`` in order."""
+        self._keys = keys
+        self._iterator = iter(keys)
+
+    @property
+    def all_generated_keys(self) -> Sequence[KeyT] | None:
+        """Return all the keys."""
+        return self._keys
+
+    def __iter__(self) -> Iterator[KeyT]:
+        """Iterate over all the keys."""
+        return iter(self._keys)
+
+    def __next__(self) -> KeyT:
+        """Return the next key not generated yet."""
+        return next(self._iterator)
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self._keys)
+
+    def more_than_one(self) -> bool:
+        """Return whether there are several keys."""
+        return len(self._keys) > 1
+
+    def get_all(self) -> Sequence[KeyT]:
+        """Return all the keys."""
+        return self._keys
+
+    def copy_with_reset(self) -> Self:
+        """Return a generator over the same keys, starting from the first."""
+        return type(self)(self._keys)
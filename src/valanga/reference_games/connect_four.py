@@ -0,0 +1,286 @@
+"""Connect Four on bitboards, in stateless and push/pop flavours.
+
+The board has 7 columns of 6 rows. Bit ``7 * column + row`` of a role's
+board marks its disc in that cell, row 0 being the bottom; the seventh bit of
+each column stays empty so that shifted boards never spill into the next
+column. Actions are column indices, named ``1`` to ``7``. ``Color.WHITE``
+plays first and is shown as ``X``.
+
+Tags are the integers ``white | black << 49``; the turn follows from the
+number of discs. The ``modifications`` of a transition and the undo token of
+a push are the bit index of the dropped disc; the checkpoint delta of a child
+is its column.
+"""
+
+from dataclasses import dataclass
+
+from ..dynamics import Transition
+from ..game import BranchKey, Color, Role
+from ..over_event import Outcome, OverEvent, intern_over_event
+from .branch_keys import SequenceBranchKeys
+from .tag_codec import IntTagCheckpointCodec
+from .two_color_board import TwoColorBoard
+
+__all__ = [
+    "COLUMNS",
+    "ROWS",
+    "ConnectFourBoard",
+    "ConnectFourCheckpointCodec",
+    "ConnectFourDynamics",
+    "ConnectFourState",
+    "ReversibleConnectFour",
+]
+
+type Column = int
+
+COLUMNS = 7
+ROWS = 6
+_HEIGHT = ROWS + 1
+_BOARD_BITS = COLUMNS * _HEIGHT
+_BOTTOM = tuple(1 << (_HEIGHT * column) for column in range(COLUMNS))
+_COLUMN_MASKS = tuple(
+    ((1 << ROWS) - 1) << (_HEIGHT * column) for column in range(COLUMNS)
+)
+_TOP = tuple(1 << (_HEIGHT * column + ROWS - 1) for column in range(COLUMNS))
+FULL_BOARD = sum(_COLUMN_MASKS)
+# Vertical, horizontal and both diagonals.
+_DIRECTIONS = (1, _HEIGHT, _HEIGHT - 1, _HEIGHT + 1)
+_NO_COLUMNS: tuple[Column, ...] = ()
+
+
+def _has_four(board: int) -> bool:
+    for shift in _DIRECTIONS:
+        pairs = board & board >> shift
+        if pairs & pairs >> 2 * shift:
+            return True
+    return False
+
+
+def _over_event(white: int, black: int) -> OverEvent[Role] | None:
+    if _has_four(white):
+        return intern_over_event(Outcome.WIN, winner=Color.WHITE)
+    if _has_four(black):
+        return intern_over_event(Outcome.WIN, winner=Color.BLACK)
+    if white | black == FULL_BOARD:
+        return intern_over_event(Outcome.DRAW)
+    return None
+
+
+def _legal_columns(white: int, black: int) -> tuple[Column, ...]:
+    if _has_four(white) or _has_four(black):
+        return _NO_COLUMNS
+    occupied = white | black
+    return tuple(column for column in range(COLUMNS) if not occupied & _TOP[column])
+
+
+def _drop_bit(occupied: int, column: Column) -> int:
+    return (occupied + _BOTTOM[column]) & _COLUMN_MASKS[column]
+
+
+def _turn(white: int, black: int) -> Color:
+    return Color.WHITE if (white | black).bit_count() % 2 == 0 else Color.BLACK
+
+
+@dataclass(frozen=True, slots=True)
+class ConnectFourState:
+    """Immutable Connect Four position.
+
+    Attributes:
+        white: The cells holding a ``Color.WHITE`` disc.
+        black: The cells holding a ``Color.BLACK`` disc.
+
+    """
+
+    white: int = 0
+    black: int = 0
+
+    @property
+    def turn(self) -> Color:
+        """Return the role to play, white when the disc count is even."""
+        return _turn(self.white, self.black)
+
+    @property
+    def tag(self) -> int:
+        """Return the integer packing both boards."""
+        return self.white | self.black << _BOARD_BITS
+
+    @classmethod
+    def from_tag(cls, tag: int) -> "ConnectFourState":
+        """Return the state of ``tag``."""
+        return cls(tag & ((1 << _BOARD_BITS) - 1), tag >> _BOARD_BITS)
+
+    def over_event(self) -> OverEvent[Role] | None:
+        """Return the result of the game, None while it goes on."""
+        return _over_event(self.white, self.black)
+
+    def is_game_over(self) -> bool:
+        """Return whether four discs are aligned or the board is full."""
+        return self.over_event() is not None
+
+    def play(self, column: Column) -> "ConnectFourState":
+        """Return the state after the role to play drops a disc in ``column``."""
+        bit = _drop_bit(self.white | self.black, column)
+        if self.turn is Color.WHITE:
+            return ConnectFourState(self.white | bit, self.black)
+        return ConnectFourState(self.white, self.black | bit)
+
+    def pprint(self) -> str:
+        """Return the board, top row first."""
+        return "\n".join(
+            "".join(
+                "X"
+                if self.white >> (_HEIGHT * column + row) & 1
+                else "O"
+                if self.black >> (_HEIGHT * column + row) & 1
+                else "."
+                for column in range(COLUMNS)
+            )
+            for row in reversed(range(ROWS))
+        )
+
+
+class ConnectFourBoard(TwoColorBoard):
+    """Mutable Connect Four position, the live state of ``ReversibleConnectFour``.
+
+    Reading it allocates nothing, but pushes and pops change it in place;
+    :meth:`snapshot` returns an immutable copy worth keeping. The turn is kept
+    in step with the disc count.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, white: int = 0, black: int = 0) -> None:
+        """Set up the position."""
+        super().__init__(white, black, _turn(white, black))
+
+    @property
+    def tag(self) -> int:
+        """Return the integer packing both boards."""
+        return self.white | self.black << _BOARD_BITS
+
+    def over_event(self) -> OverEvent[Role] | None:
+        """Return the result of the game, None while it goes on."""
+        return _over_event(self.white, self.black)
+
+    def is_game_over(self) -> bool:
+        """Return whether four discs are aligned or the board is full."""
+        return self.over_event() is not None
+
+    def snapshot(self) -> ConnectFourState:
+        """Return the current position as an immutable state."""
+        return ConnectFourState(self.white, self.black)
+
+    def pprint(self) -> str:
+        """Return the board, top row first."""
+        return self.snapshot().pprint()
+
+
+def _column_name(column: Column) -> str:
+    return str(column + 1)
+
+
+def _column_from_name(name: str) -> Column:
+    return int(name) - 1
+
+
+class ConnectFourDynamics:
+    """Stateless Connect Four rules."""
+
+    def legal_actions(self, state: ConnectFourState) -> SequenceBranchKeys[Column]:
+        """Return the columns with room left, or none once the game is over."""
+        return SequenceBranchKeys(_legal_columns(state.white, state.black))
+
+    def step(
+        self, state: ConnectFourState, action: BranchKey
+    ) -> Transition[ConnectFourState]:
+        """Drop a disc of the role to play in column ``action``."""
+        assert isinstance(action, int)
+        next_state = state.play(action)
+        dropped = (next_state.white | next_state.black) ^ (state.white | state.black)
+        over_event = next_state.over_event()
+        return Transition(
+            next_state=next_state,
+            modifications=dropped.bit_length() - 1,
+            is_over=over_event is not None,
+            over_event=over_event,
+        )
+
+    def action_name(self, state: ConnectFourState, action: BranchKey) -> str:
+        """Return the name of column ``action``."""
+        del state
+        assert isinstance(action, int)
+        return _column_name(action)
+
+    def action_from_name(self, state: ConnectFourState, name: str) -> BranchKey:
+        """Parse a column name."""
+        del state
+        return _column_from_name(name)
+
+
+class ReversibleConnectFour:
+    """Push/pop Connect Four rules mutating one position in place."""
+
+    def __init__(
+        self, state: ConnectFourState | ConnectFourBoard | None = None
+    ) -> None:
+        """Start from ``state``, the empty board by default."""
+        state = state or ConnectFourState()
+        self._board = ConnectFourBoard(state.white, state.black)
+
+    @property
+    def state(self) -> ConnectFourBoard:
+        """Return the live position, which pushes and pops update in place."""
+        return self._board
+
+    def legal_actions(self) -> SequenceBranchKeys[Column]:
+        """Return the columns with room left, or none once the game is over."""
+        return SequenceBranchKeys(_legal_columns(self._board.white, self._board.black))
+
+    def push(self, action: BranchKey) -> int:
+        """Drop a disc in column ``action``; its bit index is the undo token."""
+        assert isinstance(action, int)
+        board = self._board
+        bit = _drop_bit(board.white | board.black, action)
+        board.mark(bit)
+        return bit.bit_length() - 1
+
+    def pop(self, undo: int) -> None:
+        """Remove the disc at bit ``undo`` and give the turn back."""
+        self._board.unmark(undo)
+
+    def action_name(self, action: BranchKey) -> str:
+        """Return the name of column ``action``."""
+        assert isinstance(action, int)
+        return _column_name(action)
+
+    def action_from_name(self, name: str) -> BranchKey:
+        """Parse a column name."""
+        return _column_from_name(name)
+
+
+class ConnectFourCheckpointCodec(IntTagCheckpointCodec[ConnectFourState]):
+    """Checkpoint Connect Four states as tags, and children as columns."""
+
+    def state_from_tag(self, tag: int) -> ConnectFourState:
+        """Return the state of ``tag``."""
+        return ConnectFourState.from_tag(tag)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: ConnectFourState,
+        child_state: ConnectFourState,
+        branch_from_parent: BranchKey | None = None,
+    ) -> Column:
+        """Return the column played between ``parent_state`` and ``child_state``."""
+        del branch_from_parent
+        dropped = (child_state.white | child_state.black) ^ (
+            parent_state.white | parent_state.black
+        )
+        return (dropped.bit_length() - 1) // _HEIGHT
+
+    def load_child_from_delta(
+        self, *, parent_state: ConnectFourState, delta_ref: Column
+    ) -> ConnectFourState:
+        """Drop a disc in column ``delta_ref`` of ``parent_state``."""
+        return parent_state.play(delta_ref)
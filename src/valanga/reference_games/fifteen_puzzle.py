@@ -0,0 +1,280 @@
+"""The 15-puzzle, a single-player sliding puzzle played by ``SoloRole.SOLO``.
+
+Positions 0 to 15 are numbered row by row. The tiles are packed into one
+integer, four bits per position, tile 0 standing for the blank. The puzzle is
+solved when tiles 1 to 15 are in order with the blank last, which ends the
+episode with a win.
+
+An action is the position the blank moves to, named by the direction the
+blank moves in: ``U``, ``D``, ``L`` or ``R``, ``U`` moving it one row up,
+towards positions 0 to 3. Tags are the packed tiles. The ``modifications`` of
+a transition and the undo token of a push are the position the blank left;
+the checkpoint delta of a child is the position it moved to.
+"""
+
+import random
+from dataclasses import dataclass
+
+from ..dynamics import Transition
+from ..game import BranchKey, Role, Seed, SoloRole
+from ..over_event import Outcome, OverEvent, intern_over_event
+from .branch_keys import SequenceBranchKeys
+from .tag_codec import IntTagCheckpointCodec
+
+__all__ = [
+    "FifteenPuzzleBoard",
+    "FifteenPuzzleCheckpointCodec",
+    "FifteenPuzzleDynamics",
+    "FifteenPuzzleState",
+    "ReversibleFifteenPuzzle",
+    "scrambled_fifteen_puzzle",
+]
+
+type Position = int
+
+SIZE = 4
+SOLVED_TILES = sum((position + 1) << (4 * position) for position in range(15))
+_DIRECTIONS = {"U": -SIZE, "D": SIZE, "L": -1, "R": 1}
+_NEIGHBOURS: tuple[tuple[Position, ...], ...] = tuple(
+    tuple(
+        position + offset
+        for name, offset in _DIRECTIONS.items()
+        if (name != "U" or position >= SIZE)
+        and (name != "D" or position < SIZE * (SIZE - 1))
+        and (name != "L" or position % SIZE)
+        and (name != "R" or position % SIZE != SIZE - 1)
+    )
+    for position in range(SIZE * SIZE)
+)
+_NO_POSITIONS: tuple[Position, ...] = ()
+_SOLVED: OverEvent[Role] = intern_over_event(Outcome.WIN, winner=SoloRole.SOLO)
+
+
+def _slide(tiles: int, blank: Position, target: Position) -> int:
+    """Move the tile at ``target`` into ``blank``."""
+    tile = tiles >> (4 * target) & 0xF
+    return tiles ^ tile << (4 * target) | tile << (4 * blank)
+
+
+@dataclass(frozen=True, slots=True)
+class FifteenPuzzleState:
+    """Immutable 15-puzzle position.
+
+    Attributes:
+        tiles: The tile of every position, four bits each, 0 for the blank.
+        blank: The position of the blank.
+
+    """
+
+    tiles: int = SOLVED_TILES
+    blank: Position = 15
+
+    @property
+    def turn(self) -> SoloRole:
+        """Return the only role."""
+        return SoloRole.SOLO
+
+    @property
+    def tag(self) -> int:
+        """Return the packed tiles."""
+        return self.tiles
+
+    @classmethod
+    def from_tag(cls, tag: int) -> "FifteenPuzzleState":
+        """Return the state of ``tag``."""
+        blank = next(p for p in range(SIZE * SIZE) if not tag >> (4 * p) & 0xF)
+        return cls(tag, blank)
+
+    def tile_at(self, position: Position) -> int:
+        """Return the tile at ``position``, 0 for the blank."""
+        return self.tiles >> (4 * position) & 0xF
+
+    def is_game_over(self) -> bool:
+        """Return whether the puzzle is solved."""
+        return self.tiles == SOLVED_TILES
+
+    def move_blank(self, target: Position) -> "FifteenPuzzleState":
+        """Return the state after the blank moves to ``target``."""
+        return FifteenPuzzleState(_slide(self.tiles, self.blank, target), target)
+
+    def pprint(self) -> str:
+        """Return the grid, first row first."""
+        return "\n".join(
+            " ".join(
+                f"{self.tile_at(position):2d}" if self.tile_at(position) else " ."
+                for position in range(row, row + SIZE)
+            )
+            for row in range(0, SIZE * SIZE, SIZE)
+        )
+
+
+class FifteenPuzzleBoard:
+    """Mutable 15-puzzle position, the live state of ``ReversibleFifteenPuzzle``.
+
+    Reading it allocates nothing, but pushes and pops change it in place;
+    :meth:`snapshot` returns an immutable copy worth keeping.
+
+    Attributes:
+        tiles: The tile of every position, four bits each, 0 for the blank.
+        blank: The position of the blank.
+
+    """
+
+    __slots__ = ("blank", "tiles")
+
+    def __init__(self, tiles: int = SOLVED_TILES, blank: Position = 15) -> None:
+        """Set up the position."""
+        self.tiles = tiles
+        self.blank = blank
+
+    @property
+    def turn(self) -> SoloRole:
+        """Return the only role."""
+        return SoloRole.SOLO
+
+    @property
+    def tag(self) -> int:
+        """Return the packed tiles."""
+        return self.tiles
+
+    def is_game_over(self) -> bool:
+        """Return whether the puzzle is solved."""
+        return self.tiles == SOLVED_TILES
+
+    def snapshot(self) -> FifteenPuzzleState:
+        """Return the current position as an immutable state."""
+        return FifteenPuzzleState(self.tiles, self.blank)
+
+    def pprint(self) -> str:
+        """Return the grid, first row first."""
+        return self.snapshot().pprint()
+
+
+def _legal_targets(tiles: int, blank: Position) -> tuple[Position, ...]:
+    return _NO_POSITIONS if tiles == SOLVED_TILES else _NEIGHBOURS[blank]
+
+
+def _direction_name(blank: Position, target: Position) -> str:
+    return next(
+        name for name, offset in _DIRECTIONS.items() if offset == target - blank
+    )
+
+
+def scrambled_fifteen_puzzle(seed: Seed, num_moves: int = 60) -> FifteenPuzzleState:
+    """Return an unsolved position reached by random moves from the solution.
+
+    Moves never undo the previous one, and more moves are played if the walk
+    happens to end on the solution.
+    """
+    generator = random.Random(seed)
+    state = FifteenPuzzleState()
+    previous = state.blank
+    moves = 0
+    while moves < num_moves or state.is_game_over():
+        targets = [target for target in _NEIGHBOURS[state.blank] if target != previous]
+        previous = state.blank
+        state = state.move_blank(generator.choice(targets))
+        moves += 1
+    return state
+
+
+class FifteenPuzzleDynamics:
+    """Stateless 15-puzzle rules."""
+
+    def legal_actions(self, state: FifteenPuzzleState) -> SequenceBranchKeys[Position]:
+        """Return the positions next to the blank, or none once solved."""
+        return SequenceBranchKeys(_legal_targets(state.tiles, state.blank))
+
+    def step(
+        self, state: FifteenPuzzleState, action: BranchKey
+    ) -> Transition[FifteenPuzzleState]:
+        """Move the blank to position ``action``."""
+        assert isinstance(action, int)
+        next_state = state.move_blank(action)
+        over_event: OverEvent[Role] | None = (
+            _SOLVED if next_state.is_game_over() else None
+        )
+        return Transition(
+            next_state=next_state,
+            modifications=state.blank,
+            is_over=over_event is not None,
+            over_event=over_event,
+        )
+
+    def action_name(self, state: FifteenPuzzleState, action: BranchKey) -> str:
+        """Return the direction the blank moves in."""
+        assert isinstance(action, int)
+        return _direction_name(state.blank, action)
+
+    def action_from_name(self, state: FifteenPuzzleState, name: str) -> BranchKey:
+        """Return the position the blank moves to in direction ``name``."""
+        return state.blank + _DIRECTIONS[name]
+
+
+class ReversibleFifteenPuzzle:
+    """Push/pop 15-puzzle rules mutating one position in place."""
+
+    def __init__(
+        self, state: FifteenPuzzleState | FifteenPuzzleBoard | None = None
+    ) -> None:
+        """Start from ``state``, the solved puzzle by default."""
+        state = state or FifteenPuzzleState()
+        self._board = FifteenPuzzleBoard(state.tiles, state.blank)
+
+    @property
+    def state(self) -> FifteenPuzzleBoard:
+        """Return the live position, which pushes and pops update in place."""
+        return self._board
+
+    def legal_actions(self) -> SequenceBranchKeys[Position]:
+        """Return the positions next to the blank, or none once solved."""
+        return SequenceBranchKeys(_legal_targets(self._board.tiles, self._board.blank))
+
+    def push(self, action: BranchKey) -> Position:
+        """Move the blank to ``action``; its former position is the undo token."""
+        assert isinstance(action, int)
+        board = self._board
+        previous = board.blank
+        board.tiles = _slide(board.tiles, previous, action)
+        board.blank = action
+        return previous
+
+    def pop(self, undo: Position) -> None:
+        """Move the blank back to ``undo``."""
+        board = self._board
+        board.tiles = _slide(board.tiles, board.blank, undo)
+        board.blank = undo
+
+    def action_name(self, action: BranchKey) -> str:
+        """Return the direction the blank moves in."""
+        assert isinstance(action, int)
+        return _direction_name(self._board.blank, action)
+
+    def action_from_name(self, name: str) -> BranchKey:
+        """Return the position the blank moves to in direction ``name``."""
+        return self._board.blank + _DIRECTIONS[name]
+
+
+class FifteenPuzzleCheckpointCodec(IntTagCheckpointCodec[FifteenPuzzleState]):
+    """Checkpoint 15-puzzle states as tags, and children as blank moves."""
+
+    def state_from_tag(self, tag: int) -> FifteenPuzzleState:
+        """Return the state of ``tag``."""
+        return FifteenPuzzleState.from_tag(tag)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: FifteenPuzzleState,
+        child_state: FifteenPuzzleState,
+        branch_from_parent: BranchKey | None = None,
+    ) -> Position:
+        """Return the position the blank moved to."""
+        del parent_state, branch_from_parent
+        return child_state.blank
+
+    def load_child_from_delta(
+        self, *, parent_state: FifteenPuzzleState, delta_ref: Position
+    ) -> FifteenPuzzleState:
+        """Move the blank of ``parent_state`` to ``delta_ref``."""
+        return parent_state.move_blank(delta_ref)
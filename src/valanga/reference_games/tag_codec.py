@@ -0,0 +1,59 @@
+"""Checkpoint codec base shared by the reference games.
+
+Every reference game tags its states with an integer the state can be rebuilt
+from, so states, anchors and summaries are all checkpointed as tags; only the
+child deltas differ from one game to the next.
+"""
+
+from typing import Protocol
+
+from ..checkpoints import CheckpointStateSummary
+
+__all__ = ["IntTagCheckpointCodec", "IntTaggedState"]
+
+
+class IntTaggedState(Protocol):
+    """State identified by an integer tag."""
+
+    @property
+    def tag(self) -> int:
+        """Return the integer the state can be rebuilt from."""
+        ...
+
+    def is_game_over(self) -> bool:
+        """Return whether the game is over."""
+        ...
+
+
+class IntTagCheckpointCodec[StateT: IntTaggedState]:
+    """Checkpoint states, anchors and summaries as integer tags.
+
+    Subclasses rebuild states in :meth:`state_from_tag` and add the
+    ``dump_delta_from_parent`` and ``load_child_from_delta`` methods of their
+    child deltas.
+    """
+
+    def state_from_tag(self, tag: int) -> StateT:
+        """Return the state of ``tag``."""
+        raise NotImplementedError
+
+    def dump_state_ref(self, state: StateT) -> int:
+        """Return the tag of ``state``."""
+        return state.tag
+
+    def load_state_ref(self, payload: object) -> StateT:
+        """Return the state of a tag."""
+        assert isinstance(payload, int)
+        return self.state_from_tag(payload)
+
+    def dump_state_summary(self, state: StateT) -> CheckpointStateSummary:
+        """Return the tag and whether the game is over."""
+        return CheckpointStateSummary(tag=state.tag, is_terminal=state.is_game_over())
+
+    def dump_anchor_ref(self, state: StateT) -> int:
+        """Return the tag of ``state``."""
+        return state.tag
+
+    def load_anchor_ref(self, payload: int) -> StateT:
+        """Return the state of a tag."""
+        return self.state_from_tag(payload)
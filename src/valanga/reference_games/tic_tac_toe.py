@@ -0,0 +1,270 @@
+"""Tic-tac-toe on bitboards, in stateless and push/pop flavours.
+
+Cells are numbered 0 to 8 row by row and named ``a1`` to ``c3``, the letter
+giving the column and the digit the row. Each role owns a 9-bit board, bit
+``i`` marking cell ``i``. ``Color.WHITE`` plays first and is shown as ``X``.
+
+Tags are the integers ``white | black << 9 | turn << 18``. The
+``modifications`` of a transition, the undo token of a push and the checkpoint
+delta of a child are all the index of the marked cell.
+"""
+
+from dataclasses import dataclass
+
+from ..dynamics import Transition
+from ..game import BranchKey, Color, Role
+from ..over_event import Outcome, OverEvent, intern_over_event
+from .branch_keys import SequenceBranchKeys
+from .tag_codec import IntTagCheckpointCodec
+from .two_color_board import TwoColorBoard
+
+__all__ = [
+    "ReversibleTicTacToe",
+    "TicTacToeBoard",
+    "TicTacToeCheckpointCodec",
+    "TicTacToeDynamics",
+    "TicTacToeState",
+    "cell_from_name",
+    "cell_name",
+]
+
+type Cell = int
+
+FULL_BOARD = 0x1FF
+LINES: tuple[int, ...] = tuple(
+    sum(1 << cell for cell in line)
+    for line in (
+        (0, 1, 2),
+        (3, 4, 5),
+        (6, 7, 8),
+        (0, 3, 6),
+        (1, 4, 7),
+        (2, 5, 8),
+        (0, 4, 8),
+        (2, 4, 6),
+    )
+)
+_EMPTY_CELLS: tuple[tuple[Cell, ...], ...] = tuple(
+    tuple(cell for cell in range(9) if empty >> cell & 1)
+    for empty in range(FULL_BOARD + 1)
+)
+_NO_CELLS: tuple[Cell, ...] = ()
+
+
+def _has_line(board: int) -> bool:
+    return any(board & line == line for line in LINES)
+
+
+def _over_event(white: int, black: int) -> OverEvent[Role] | None:
+    if _has_line(white):
+        return intern_over_event(Outcome.WIN, winner=Color.WHITE)
+    if _has_line(black):
+        return intern_over_event(Outcome.WIN, winner=Color.BLACK)
+    if white | black == FULL_BOARD:
+        return intern_over_event(Outcome.DRAW)
+    return None
+
+
+def _legal_cells(white: int, black: int) -> tuple[Cell, ...]:
+    if _has_line(white) or _has_line(black):
+        return _NO_CELLS
+    return _EMPTY_CELLS[~(white | black) & FULL_BOARD]
+
+
+def cell_name(cell: Cell) -> str:
+    """Return the name of ``cell``, such as ``b2`` for the centre."""
+    return f"{'abc'[cell % 3]}{cell // 3 + 1}"
+
+
+def cell_from_name(name: str) -> Cell:
+    """Parse a cell name such as ``b2``."""
+    return "abc".index(name[0]) + 3 * (int(name[1:]) - 1)
+
+
+@dataclass(frozen=True, slots=True)
+class TicTacToeState:
+    """Immutable tic-tac-toe position.
+
+    Attributes:
+        white: The cells marked by ``Color.WHITE``.
+        black: The cells marked by ``Color.BLACK``.
+        turn: The role to play.
+
+    """
+
+    white: int = 0
+    black: int = 0
+    turn: Color = Color.WHITE
+
+    @property
+    def tag(self) -> int:
+        """Return the integer packing both boards and the turn."""
+        return self.white | self.black << 9 | int(self.turn) << 18
+
+    @classmethod
+    def from_tag(cls, tag: int) -> "TicTacToeState":
+        """Return the state of ``tag``."""
+        return cls(tag & FULL_BOARD, tag >> 9 & FULL_BOARD, Color(tag >> 18))
+
+    def over_event(self) -> OverEvent[Role] | None:
+        """Return the result of the game, None while it goes on."""
+        return _over_event(self.white, self.black)
+
+    def is_game_over(self) -> bool:
+        """Return whether a line is complete or the board is full."""
+        return self.over_event() is not None
+
+    def play(self, cell: Cell) -> "TicTacToeState":
+        """Return the state after the role to play marks ``cell``."""
+        if self.turn is Color.WHITE:
+            return TicTacToeState(self.white | 1 << cell, self.black, Color.BLACK)
+        return TicTacToeState(self.white, self.black | 1 << cell, Color.WHITE)
+
+    def pprint(self) -> str:
+        """Return the board, top row first."""
+        return "\n".join(
+            "".join(
+                "X"
+                if self.white >> cell & 1
+                else "O"
+                if self.black >> cell & 1
+                else "."
+                for cell in range(row, row + 3)
+            )
+            for row in (6, 3, 0)
+        )
+
+
+class TicTacToeBoard(TwoColorBoard):
+    """Mutable tic-tac-toe position, the live state of ``ReversibleTicTacToe``.
+
+    Reading it allocates nothing, but pushes and pops change it in place;
+    :meth:`snapshot` returns an immutable copy worth keeping.
+    """
+
+    __slots__ = ()
+
+    def __init__(
+        self, white: int = 0, black: int = 0, turn: Color = Color.WHITE
+    ) -> None:
+        """Set up the position."""
+        super().__init__(white, black, turn)
+
+    @property
+    def tag(self) -> int:
+        """Return the integer packing both boards and the turn."""
+        return self.white | self.black << 9 | int(self.turn) << 18
+
+    def over_event(self) -> OverEvent[Role] | None:
+        """Return the result of the game, None while it goes on."""
+        return _over_event(self.white, self.black)
+
+    def is_game_over(self) -> bool:
+        """Return whether a line is complete or the board is full."""
+        return self.over_event() is not None
+
+    def snapshot(self) -> TicTacToeState:
+        """Return the current position as an immutable state."""
+        return TicTacToeState(self.white, self.black, self.turn)
+
+    def pprint(self) -> str:
+        """Return the board, top row first."""
+        return self.snapshot().pprint()
+
+
+class TicTacToeDynamics:
+    """Stateless tic-tac-toe rules."""
+
+    def legal_actions(self, state: TicTacToeState) -> SequenceBranchKeys[Cell]:
+        """Return the empty cells, or none once the game is over."""
+        return SequenceBranchKeys(_legal_cells(state.white, state.black))
+
+    def step(
+        self, state: TicTacToeState, action: BranchKey
+    ) -> Transition[TicTacToeState]:
+        """Mark cell ``action`` for the role to play."""
+        assert isinstance(action, int)
+        next_state = state.play(action)
+        over_event = next_state.over_event()
+        return Transition(
+            next_state=next_state,
+            modifications=action,
+            is_over=over_event is not None,
+            over_event=over_event,
+        )
+
+    def action_name(self, state: TicTacToeState, action: BranchKey) -> str:
+        """Return the name of cell ``action``."""
+        del state
+        assert isinstance(action, int)
+        return cell_name(action)
+
+    def action_from_name(self, state: TicTacToeState, name: str) -> BranchKey:
+        """Parse a cell name."""
+        del state
+        return cell_from_name(name)
+
+
+class ReversibleTicTacToe:
+    """Push/pop tic-tac-toe rules mutating one position in place."""
+
+    def __init__(self, state: TicTacToeState | TicTacToeBoard | None = None) -> None:
+        """Start from ``state``, the empty board by default."""
+        state = state or TicTacToeState()
+        self._board = TicTacToeBoard(state.white, state.black, state.turn)
+
+    @property
+    def state(self) -> TicTacToeBoard:
+        """Return the live position, which pushes and pops update in place."""
+        return self._board
+
+    def legal_actions(self) -> SequenceBranchKeys[Cell]:
+        """Return the empty cells, or none once the game is over."""
+        return SequenceBranchKeys(_legal_cells(self._board.white, self._board.black))
+
+    def push(self, action: BranchKey) -> Cell:
+        """Mark cell ``action``; the cell is the undo information."""
+        assert isinstance(action, int)
+        self._board.mark(1 << action)
+        return action
+
+    def pop(self, undo: Cell) -> None:
+        """Clear cell ``undo`` and give the turn back."""
+        self._board.unmark(undo)
+
+    def action_name(self, action: BranchKey) -> str:
+        """Return the name of cell ``action``."""
+        assert isinstance(action, int)
+        return cell_name(action)
+
+    def action_from_name(self, name: str) -> BranchKey:
+        """Parse a cell name."""
+        return cell_from_name(name)
+
+
+class TicTacToeCheckpointCodec(IntTagCheckpointCodec[TicTacToeState]):
+    """Checkpoint tic-tac-toe states as tags, and children as marked cells."""
+
+    def state_from_tag(self, tag: int) -> TicTacToeState:
+        """Return the state of ``tag``."""
+        return TicTacToeState.from_tag(tag)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: TicTacToeState,
+        child_state: TicTacToeState,
+        branch_from_parent: BranchKey | None = None,
+    ) -> Cell:
+        """Return the cell marked between ``parent_state`` and ``child_state``."""
+        del branch_from_parent
+        marked = (child_state.white | child_state.black) & ~(
+            parent_state.white | parent_state.black
+        )
+        return marked.bit_length() - 1
+
+    def load_child_from_delta(
+        self, *, parent_state: TicTacToeState, delta_ref: Cell
+    ) -> TicTacToeState:
+        """Mark cell ``delta_ref`` on ``parent_state``."""
+        return parent_state.play(delta_ref)
@@ -0,0 +1,46 @@
+"""Mutable bitboard shared by the two-player reference games.
+
+Tic-tac-toe and Connect Four give each color a board of its own where a move
+sets one bit, so their push/pop flavours update positions the same way.
+"""
+
+from ..game import Color
+
+__all__ = ["TwoColorBoard"]
+
+
+class TwoColorBoard:
+    """Mutable position where each color sets bits of its own board.
+
+    Attributes:
+        white: The bits set by ``Color.WHITE``.
+        black: The bits set by ``Color.BLACK``.
+        turn: The role to play.
+
+    """
+
+    __slots__ = ("black", "turn", "white")
+
+    def __init__(self, white: int, black: int, turn: Color) -> None:
+        """Set up the position."""
+        self.white = white
+        self.black = black
+        self.turn = turn
+
+    def mark(self, bit: int) -> None:
+        """Set ``bit`` on the board of the role to play and pass the turn."""
+        if self.turn is Color.WHITE:
+            self.white |= bit
+            self.turn = Color.BLACK
+        else:
+            self.black |= bit
+            self.turn = Color.WHITE
+
+    def unmark(self, index: int) -> None:
+        """Clear bit ``index`` of the role that played last and give the turn back."""
+        if self.turn is Color.WHITE:
+            self.black &= ~(1 << index)
+            self.turn = Color.BLACK
+        else:
+            self.white &= ~(1 << index)
+            self.turn = Color.WHITE
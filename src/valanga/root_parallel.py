@@ -0,0 +1,188 @@
+"""Root-parallel search running one ``BranchSelector`` per worker process.
+
+Each worker searches the same root state with its own seed derived from the
+seed given to ``recommend``. Their recommendations are merged in worker order,
+so the result only depends on the seed and the number of workers.
+"""
+
+import hashlib
+import os
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from .evaluations import Certainty, Value
+from .game import BranchKey, BranchName, Seed, State
+from .policy import BranchPolicy, BranchSelector, NotifyProgressCallable, Recommendation
+
+__all__ = [
+    "InvalidWorkerCountError",
+    "RootParallelSelector",
+    "derive_seed",
+    "merge_recommendations",
+]
+
+
+class InvalidWorkerCountError(ValueError):
+    """Raised when a root-parallel search is configured with no worker."""
+
+    def __init__(self, num_workers: int) -> None:
+        """Build the error from the rejected count."""
+        super().__init__(f"num_workers must be at least 1, got {num_workers}")
+
+
+def derive_seed(seed: Seed, worker_index: int) -> Seed:
+    """Return the seed of worker ``worker_index`` for a search seeded with ``seed``.
+
+    The derivation is a hash, so neighbouring workers get unrelated streams and
+    the result does not depend on the platform or the Python hash seed.
+    """
+    digest = hashlib.blake2b(f"{seed}:{worker_index}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def _recommend_in_worker[StateT: State](
+    selector: BranchSelector[StateT], state: StateT, seed: Seed
+) -> Recommendation:
+    """Run one worker search. Module-level so it can be pickled."""
+    return selector.recommend(state, seed)
+
+
+def _merge_values(values: Sequence[Value]) -> Value:
+    """Average scores and keep the certainty only when every worker agrees."""
+    first = values[0]
+    certainty = (
+        first.certainty
+        if all(value.certainty is first.certainty for value in values)
+        else Certainty.ESTIMATE
+    )
+    return Value(
+        score=sum(value.score for value in values) / len(values),
+        certainty=certainty,
+        over_event=None if certainty is Certainty.ESTIMATE else first.over_event,
+        line=first.line,
+    )
+
+
+def merge_recommendations(recommendations: Sequence[Recommendation]) -> Recommendation:
+    """Merge the recommendations of independent searches of the same state.
+
+    The recommended branch is the one most workers recommended, ties going to
+    the earliest worker. Policies are averaged over the workers that produced
+    one, and values are averaged per branch; lines are taken from the earliest
+    worker.
+
+    Args:
+        recommendations: One recommendation per worker, in worker order.
+
+    Returns:
+        Recommendation: The merged recommendation.
+
+    """
+    votes = Counter(rec.recommended_name for rec in recommendations)
+    recommended_name = max(votes, key=votes.__getitem__)
+
+    evaluations = [
+        rec.evaluation
+        for rec in recommendations
+        if rec.recommended_name == recommended_name and rec.evaluation is not None
+    ]
+
+    policies = [rec.policy for rec in recommendations if rec.policy is not None]
+    policy: BranchPolicy | None = None
+    if policies:
+        probs: dict[BranchKey, float] = {}
+        for worker_policy in policies:
+            for key, prob in worker_policy.probs.items():
+                probs[key] = probs.get(key, 0.0) + prob / len(policies)
+        policy = BranchPolicy(probs=probs)
+
+    branch_values: dict[BranchName, list[Value]] = {}
+    for rec in recommendations:
+        for name, value in (rec.branch_evals or {}).items():
+            branch_values.setdefault(name, []).append(value)
+
+    return Recommendation(
+        recommended_name=recommended_name,
+        evaluation=_merge_values(evaluations) if evaluations else None,
+        policy=policy,
+        branch_evals=(
+            {name: _merge_values(values) for name, values in branch_values.items()}
+            if branch_values
+            else None
+        ),
+    )
+
+
+def _default_num_workers() -> int:
+    return os.cpu_count() or 1
+
+
+@dataclass
+class RootParallelSelector[StateT: State]:
+    """Fan a ``recommend`` call out to several independent searches.
+
+    Attributes:
+        selector: The selector run by every worker. It must be picklable when
+            the executor is a process pool, as must the searched states.
+        num_workers: The number of independent searches.
+        executor: Optional long-lived executor. When None, a process pool with
+            ``num_workers`` processes is created for each call.
+
+    """
+
+    selector: BranchSelector[StateT]
+    num_workers: int = field(default_factory=_default_num_workers)
+    executor: Executor | None = None
+
+    def __post_init__(self) -> None:
+        """Validate the worker count.
+
+        Raises:
+            InvalidWorkerCountError: If ``num_workers`` is below 1.
+
+        """
+        if self.num_workers < 1:
+            raise InvalidWorkerCountError(self.num_workers)
+
+    def recommend(
+        self,
+        state: StateT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None = None,
+    ) -> Recommendation:
+        """Search ``state`` in every worker and merge the recommendations.
+
+        Args:
+            state (StateT): The root state.
+            seed (Seed): The seed from which every worker seed is derived.
+            notify_progress (NotifyProgressCallable | None): Optional callback
+                receiving the percentage of finished workers.
+
+        Returns:
+            Recommendation: The merged recommendation.
+
+        """
+        if self.executor is not None:
+            return self._recommend_with(self.executor, state, seed, notify_progress)
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            return self._recommend_with(executor, state, seed, notify_progress)
+
+    def _recommend_with(
+        self,
+        executor: Executor,
+        state: StateT,
+        seed: Seed,
+        notify_progress: NotifyProgressCallable | None,
+    ) -> Recommendation:
+        futures = [
+            executor.submit(
+                _recommend_in_worker, self.selector, state, derive_seed(seed, index)
+            )
+            for index in range(self.num_workers)
+        ]
+        if notify_progress is not None:
+            for done, _ in enumerate(as_completed(futures), start=1):
+                notify_progress(100 * done // self.num_workers)
+        return merge_recommendations([future.result() for future in futures])
@@ -0,0 +1,362 @@
+"""Self-play pipeline wiring ``Dynamics`` to a ``BranchSelector``.
+
+``SelfPlayRunner`` plays many games concurrently on an executor, a process
+pool by default, and streams each finished :class:`GameRecord` to a sink. At
+most ``max_in_flight`` games are submitted at once, so memory stays bounded
+however many games are requested.
+
+Game ``i`` of a run seeded with ``seed`` is seeded with
+``derive_seed(seed, i)``, so every game can be replayed on its own.
+``ShardedGameWriter`` relies on this to make runs resumable: it writes games
+in fixed-size shards, each shard file appearing atomically once all of its
+games are finished, and a restarted run skips the games of the shards already
+on disk.
+"""
+
+import os
+import pickle
+import time
+from collections.abc import Callable, Collection, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Protocol
+
+from .dynamics import Dynamics
+from .game import BranchName, Role, Seed, State
+from .over_event import OverEvent
+from .policy import BranchPolicy, BranchSelector
+from .root_parallel import derive_seed
+
+__all__ = [
+    "GameRecord",
+    "GameSink",
+    "SelfPlayRunner",
+    "SelfPlayStats",
+    "ShardedGameWriter",
+    "iter_shard_games",
+    "play_game",
+]
+
+SHARD_FILE_PATTERN = "games-{:06d}.pkl"
+SHARD_FILE_GLOB = "games-*.pkl"
+_TEMP_SUFFIX = ".tmp"
+
+
+@dataclass(frozen=True, slots=True)
+class GameRecord:
+    """One finished self-play game.
+
+    Attributes:
+        game_index: The index of the game in its run.
+        seed: The seed the game was played with.
+        actions: The names of the played actions, in order.
+        policies: The policy of the recommendation behind each action, when
+            the selector produced one.
+        over_event: The final event, or None when the game was stopped by
+            the move limit.
+
+    """
+
+    game_index: int
+    seed: Seed
+    actions: list[BranchName]
+    policies: list[BranchPolicy | None]
+    over_event: OverEvent[Role] | None
+
+    def __len__(self) -> int:
+        """Return the number of moves of the game."""
+        return len(self.actions)
+
+
+def play_game[StateT: State](  # noqa: PLR0913  # pylint: disable=too-many-arguments
+    dynamics: Dynamics[StateT],
+    selector: BranchSelector[StateT],
+    initial_state: StateT,
+    *,
+    game_index: int,
+    seed: Seed,
+    max_moves: int | None = None,
+) -> GameRecord:
+    """Play one game from ``initial_state``, letting ``selector`` choose every move.
+
+    Module-level so it can be pickled. Move ``n`` is searched with seed
+    ``derive_seed(seed, n)``.
+
+    Args:
+        dynamics: The rules of the game.
+        selector: The selector choosing the moves of every player.
+        initial_state: The state the game starts from.
+        game_index: The index of the game in its run.
+        seed: The seed of the game.
+        max_moves: Optional number of moves after which the game is stopped.
+
+    Returns:
+        GameRecord: The played game.
+
+    """
+    state = initial_state
+    actions: list[BranchName] = []
+    policies: list[BranchPolicy | None] = []
+    over_event: OverEvent[Role] | None = None
+    while not state.is_game_over() and (max_moves is None or len(actions) < max_moves):
+        recommendation = selector.recommend(state, derive_seed(seed, len(actions)))
+        name = recommendation.recommended_name
+        transition = dynamics.step(state, dynamics.action_from_name(state, name))
+        actions.append(name)
+        policies.append(recommendation.policy)
+        state = transition.next_state
+        if transition.is_over:
+            over_event = transition.over_event
+            break
+    return GameRecord(game_index, seed, actions, policies, over_event)
+
+
+@dataclass(slots=True)
+class SelfPlayStats:
+    """Throughput counters of a self-play run.
+
+    Attributes:
+        games: The number of finished games.
+        moves: The number of moves of the finished games.
+        started: The :func:`time.monotonic` time the run started.
+        elapsed: The seconds between the start and the last finished game.
+
+    """
+
+    games: int = 0
+    moves: int = 0
+    started: float = field(default_factory=time.monotonic)
+    elapsed: float = 0.0
+
+    def record(self, game: GameRecord) -> None:
+        """Count ``game`` as finished now."""
+        self.games += 1
+        self.moves += len(game)
+        self.elapsed = time.monotonic() - self.started
+
+    @property
+    def games_per_second(self) -> float:
+        """Return the finished games per second."""
+        return self.games / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def moves_per_second(self) -> float:
+        """Return the moves of finished games per second."""
+        return self.moves / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class GameSink(Protocol):
+    """Receives the finished games of a run."""
+
+    def write(self, game: GameRecord) -> None:
+        """Store ``game``."""
+        ...
+
+
+def _default_num_workers() -> int:
+    return os.cpu_count() or 1
+
+
+@dataclass
+class SelfPlayRunner[StateT: State]:
+    """Play many self-play games concurrently.
+
+    Attributes:
+        dynamics: The rules of the game. It must be picklable when the
+            executor is a process pool, as must the selector and the state.
+        selector: The selector choosing the moves of every player.
+        initial_state: The state every game starts from.
+        max_moves: Optional number of moves after which a game is stopped.
+        num_workers: The number of worker processes of the default pool.
+        executor: Optional long-lived executor. When None, a process pool with
+            ``num_workers`` processes is created for each run.
+        max_in_flight: The maximum number of submitted but unfinished games.
+            Defaults to twice the number of workers.
+
+    """
+
+    dynamics: Dynamics[StateT]
+    selector: BranchSelector[StateT]
+    initial_state: StateT
+    max_moves: int | None = None
+    num_workers: int = field(default_factory=_default_num_workers)
+    executor: Executor | None = None
+    max_in_flight: int | None = None
+
+    def iter_games(
+        self,
+        num_games: int,
+        seed: Seed,
+        *,
+        skip: Collection[int] = (),
+        stats: SelfPlayStats | None = None,
+    ) -> Iterator[GameRecord]:
+        """Yield the games of a run as they finish, in completion order.
+
+        Args:
+            num_games: The number of games of the run.
+            seed: The seed from which every game seed is derived.
+            skip: Indices of games not to play, for instance
+                :meth:`ShardedGameWriter.completed_games` of an earlier run.
+            stats: Optional counters updated with every yielded game.
+
+        Yields:
+            GameRecord: The finished games.
+
+        """
+        if self.executor is not None:
+            yield from self._iter_games_with(
+                self.executor, num_games, seed, skip, stats
+            )
+            return
+        with ProcessPoolExecutor(max_workers=self.num_workers) as executor:
+            yield from self._iter_games_with(executor, num_games, seed, skip, stats)
+
+    def run(
+        self,
+        num_games: int,
+        seed: Seed,
+        sink: GameSink,
+        *,
+        skip: Collection[int] = (),
+        notify_stats: Callable[[SelfPlayStats], None] | None = None,
+    ) -> SelfPlayStats:
+        """Play a run and write every finished game to ``sink``.
+
+        Args:
+            num_games: The number of games of the run.
+            seed: The seed from which every game seed is derived.
+            sink: Receives the finished games, in completion order.
+            skip: Indices of games not to play.
+            notify_stats: Optional callback receiving the counters after
+                every finished game.
+
+        Returns:
+            SelfPlayStats: The counters of the games played by this call.
+
+        """
+        stats = SelfPlayStats()
+        for game in self.iter_games(num_games, seed, skip=skip, stats=stats):
+            sink.write(game)
+            if notify_stats is not None:
+                notify_stats(stats)
+        return stats
+
+    def _iter_games_with(
+        self,
+        executor: Executor,
+        num_games: int,
+        seed: Seed,
+        skip: Collection[int],
+        stats: SelfPlayStats | None,
+    ) -> Iterator[GameRecord]:
+        max_in_flight = self.max_in_flight or 2 * self.num_workers
+        indices = (index for index in range(num_games) if index not in skip)
+        in_flight: set[Future[GameRecord]] = set()
+        try:
+            for index in indices:
+                while len(in_flight) >= max_in_flight:
+                    yield from self._collect(in_flight, stats)
+                in_flight.add(self._submit(executor, index, seed))
+            while in_flight:
+                yield from self._collect(in_flight, stats)
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+    def _submit(self, executor: Executor, index: int, seed: Seed) -> Future[GameRecord]:
+        return executor.submit(
+            play_game,
+            self.dynamics,
+            self.selector,
+            self.initial_state,
+            game_index=index,
+            seed=derive_seed(seed, index),
+            max_moves=self.max_moves,
+        )
+
+    @staticmethod
+    def _collect(
+        in_flight: set[Future[GameRecord]], stats: SelfPlayStats | None
+    ) -> Iterator[GameRecord]:
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            in_flight.remove(future)
+            game = future.result()
+            if stats is not None:
+                stats.record(game)
+            yield game
+
+
+class ShardedGameWriter:
+    """Write the games of a run to pickled shard files of a directory.
+
+    Shard ``k`` holds games ``k * games_per_shard`` to
+    ``(k + 1) * games_per_shard - 1`` sorted by index. It is kept in memory
+    until all of its games are written, then written to a temporary file and
+    renamed into place, so a shard file on disk is always complete. Games of
+    unfinished shards are lost when the run stops and are played again by
+    the resumed run.
+    """
+
+    def __init__(
+        self, directory: str | Path, num_games: int, games_per_shard: int = 1024
+    ) -> None:
+        """Prepare writing a run of ``num_games`` games to ``directory``."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.num_games = num_games
+        self.games_per_shard = games_per_shard
+        self._buffers: dict[int, list[GameRecord]] = {}
+        for leftover in self.directory.glob(f"*{_TEMP_SUFFIX}"):
+            leftover.unlink()
+
+    def shard_path(self, shard: int) -> Path:
+        """Return the file of shard ``shard``."""
+        return self.directory / SHARD_FILE_PATTERN.format(shard)
+
+    def _shard_size(self, shard: int) -> int:
+        start = shard * self.games_per_shard
+        return min(self.games_per_shard, self.num_games - start)
+
+    def completed_games(self) -> set[int]:
+        """Return the indices of the games of the shards already on disk."""
+        num_shards = -(-self.num_games // self.games_per_shard)
+        completed: set[int] = set()
+        for shard in range(num_shards):
+            if self.shard_path(shard).exists():
+                start = shard * self.games_per_shard
+                completed.update(range(start, start + self._shard_size(shard)))
+        return completed
+
+    def write(self, game: GameRecord) -> None:
+        """Buffer ``game`` and write its shard once the shard is complete."""
+        shard = game.game_index // self.games_per_shard
+        buffer = self._buffers.setdefault(shard, [])
+        buffer.append(game)
+        if len(buffer) < self._shard_size(shard):
+            return
+        del self._buffers[shard]
+        buffer.sort(key=lambda record: record.game_index)
+        path = self.shard_path(shard)
+        temp_path = path.with_name(path.name + _TEMP_SUFFIX)
+        with temp_path.open("wb") as temp_file:
+            pickle.dump(buffer, temp_file, protocol=pickle.HIGHEST_PROTOCOL)
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        os.replace(temp_path, path)
+
+
+def iter_shard_games(directory: str | Path) -> Iterator[GameRecord]:
+    """Yield the games of the shard files of ``directory``, shard by shard."""
+    for path in sorted(Path(directory).glob(SHARD_FILE_GLOB)):
+        with path.open("rb") as shard_file:
+            games: list[GameRecord] = pickle.load(shard_file)
+        yield from games
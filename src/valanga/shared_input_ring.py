@@ -0,0 +1,311 @@
+"""Shared-memory ring of evaluator inputs for multi-process evaluation.
+
+Evaluator inputs sent to an evaluator process through pipes or queues are
+pickled, copied and unpickled. ``SharedInputRing`` instead keeps a ring of
+fixed-shape NumPy slots in a :mod:`multiprocessing.shared_memory` segment:
+search workers write their inputs straight into a slot, and the evaluator
+process reads whole runs of consecutive slots as one array view, without any
+copy.
+
+The segment holds three control counters, one state byte per slot and the
+slot data. Slots are reserved in ticket order, committed in any order, and
+handed to the consumer as runs of consecutive committed slots. The consumer
+releases runs in the order it acquired them.
+
+The ring synchronizes through a :func:`multiprocessing.Condition`, so it must
+reach worker processes when they are started, for instance as a
+``multiprocessing.Process`` argument or through a pool initializer.
+
+This module requires NumPy, which is an optional dependency of valanga.
+"""
+
+import multiprocessing
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from multiprocessing.context import BaseContext
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+from numpy.typing import ArrayLike, DTypeLike, NDArray
+
+from .game import State
+from .represention_for_evaluation import ContentRepresentation
+
+__all__ = [
+    "InputBatch",
+    "OutOfOrderReleaseError",
+    "SharedInputRing",
+    "SlotReservation",
+]
+
+_HEAD, _READ_HEAD, _TAIL = range(3)
+_CONTROL_SIZE = 3 * np.dtype(np.int64).itemsize
+_ALIGNMENT = 64
+
+_FREE, _WRITING, _READY, _READING = range(4)
+
+type Ticket = int
+
+
+class OutOfOrderReleaseError(RuntimeError):
+    """Batches must be released in the order they were acquired."""
+
+
+@dataclass(frozen=True, slots=True)
+class SlotReservation:
+    """A reserved slot, to fill in place and then commit.
+
+    Attributes:
+        ticket: The position of the slot in the stream of inputs.
+        array: Writable view of the slot in shared memory.
+
+    """
+
+    ticket: Ticket
+    array: NDArray[Any]
+
+
+@dataclass(frozen=True, slots=True)
+class InputBatch:
+    """A run of consecutive committed slots handed to the consumer.
+
+    Attributes:
+        first_ticket: The ticket of the first input of the batch.
+        array: Read-only view of the inputs, stacked along the first axis. It
+            must not be used after the batch is released.
+
+    """
+
+    first_ticket: Ticket
+    array: NDArray[Any]
+
+    def __len__(self) -> int:
+        """Return the number of inputs in the batch."""
+        return len(self.array)
+
+    @property
+    def tickets(self) -> range:
+        """Return the tickets of the inputs, in batch order."""
+        return range(self.first_ticket, self.first_ticket + len(self.array))
+
+
+def _data_offset(num_slots: int) -> int:
+    end = _CONTROL_SIZE + num_slots
+    return -(-end // _ALIGNMENT) * _ALIGNMENT
+
+
+class SharedInputRing:  # pylint: disable=too-many-instance-attributes
+    """Fixed-size ring of evaluator input slots in shared memory.
+
+    Any number of producers may reserve and commit slots. A single consumer
+    acquires and releases batches.
+    """
+
+    def __init__(
+        self,
+        slot_shape: tuple[int, ...],
+        dtype: DTypeLike = np.float32,
+        num_slots: int = 1024,
+        *,
+        name: str | None = None,
+        mp_context: BaseContext | None = None,
+    ) -> None:
+        """Create the shared-memory segment of the ring.
+
+        Args:
+            slot_shape: The shape of one evaluator input.
+            dtype: The dtype of the evaluator inputs.
+            num_slots: The number of slots, bounding the inputs in flight.
+            name: Optional name of the segment; a unique one is generated
+                when None.
+            mp_context: The multiprocessing context the worker processes are
+                started with; the default context when None.
+
+        """
+        self.slot_shape = tuple(slot_shape)
+        self.dtype = np.dtype(dtype)
+        self.num_slots = num_slots
+        slot_size = int(np.prod(self.slot_shape, dtype=np.int64)) * self.dtype.itemsize
+        self._memory = shared_memory.SharedMemory(
+            name=name,
+            create=True,
+            size=_data_offset(num_slots) + num_slots * slot_size,
+        )
+        self._owner = True
+        self._condition = (mp_context or multiprocessing.get_context()).Condition()
+        self._bind()
+        self._control[:] = 0
+        self._states[:] = _FREE
+
+    def _bind(self) -> None:
+        buffer = self._memory.buf
+        self._control: NDArray[np.int64] = np.ndarray(
+            (3,), dtype=np.int64, buffer=buffer
+        )
+        self._states: NDArray[np.uint8] = np.ndarray(
+            (self.num_slots,), dtype=np.uint8, buffer=buffer, offset=_CONTROL_SIZE
+        )
+        self._data: NDArray[Any] = np.ndarray(
+            (self.num_slots, *self.slot_shape),
+            dtype=self.dtype,
+            buffer=buffer,
+            offset=_data_offset(self.num_slots),
+        )
+
+    def __getstate__(self) -> dict[str, object]:
+        """Describe the ring so that another process can attach to it."""
+        return {
+            "name": self._memory.name,
+            "slot_shape": self.slot_shape,
+            "dtype": self.dtype,
+            "num_slots": self.num_slots,
+            "condition": self._condition,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        """Attach to the segment of the pickled ring."""
+        self.slot_shape = state["slot_shape"]
+        self.dtype = state["dtype"]
+        self.num_slots = state["num_slots"]
+        self._condition = state["condition"]
+        # The creating process owns the segment and unlinks it.
+        self._memory = shared_memory.SharedMemory(name=state["name"], track=False)
+        self._owner = False
+        self._bind()
+
+    def __enter__(self) -> Self:
+        """Return the ring for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the ring, unlinking the segment in the creating process."""
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    @property
+    def name(self) -> str:
+        """Return the name of the shared-memory segment."""
+        return self._memory.name
+
+    def reserve(self, timeout: float | None = None) -> SlotReservation | None:
+        """Reserve the next slot, waiting while the ring is full.
+
+        Returns:
+            SlotReservation | None: The reservation, or None on timeout.
+
+        """
+        control = self._control
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: control[_HEAD] - control[_TAIL] < self.num_slots, timeout
+            ):
+                return None
+            ticket = int(control[_HEAD])
+            control[_HEAD] = ticket + 1
+            self._states[ticket % self.num_slots] = _WRITING
+        return SlotReservation(ticket, self._data[ticket % self.num_slots])
+
+    def commit(self, ticket: Ticket) -> None:
+        """Hand the filled slot of ``ticket`` over to the consumer."""
+        with self._condition:
+            self._states[ticket % self.num_slots] = _READY
+            self._condition.notify_all()
+
+    def write(
+        self, evaluator_input: ArrayLike, timeout: float | None = None
+    ) -> Ticket | None:
+        """Copy ``evaluator_input`` into a new slot and commit it.
+
+        Returns:
+            Ticket | None: The ticket of the input, or None on timeout.
+
+        """
+        reservation = self.reserve(timeout)
+        if reservation is None:
+            return None
+        np.copyto(reservation.array, evaluator_input, casting="same_kind")
+        self.commit(reservation.ticket)
+        return reservation.ticket
+
+    def write_representation[StateT: State](
+        self,
+        representation: ContentRepresentation[StateT, Any],
+        state: StateT,
+        timeout: float | None = None,
+    ) -> Ticket | None:
+        """Write the evaluator input of ``representation`` for ``state``."""
+        return self.write(representation.get_evaluator_input(state), timeout)
+
+    def acquire_batch(
+        self, max_size: int | None = None, timeout: float | None = None
+    ) -> InputBatch | None:
+        """Return the next run of committed slots, waiting for at least one.
+
+        A batch never wraps around the end of the ring, so its inputs are one
+        contiguous array view.
+
+        Args:
+            max_size: The maximum batch size; the ring size when None.
+            timeout: How long to wait for a committed slot, forever when None.
+
+        Returns:
+            InputBatch | None: The batch, or None on timeout.
+
+        """
+        control = self._control
+        states = self._states
+        with self._condition:
+            if not self._condition.wait_for(
+                lambda: states[control[_READ_HEAD] % self.num_slots] == _READY,
+                timeout,
+            ):
+                return None
+            first = int(control[_READ_HEAD])
+            start = first % self.num_slots
+            stop = min(self.num_slots, start + (max_size or self.num_slots))
+            end = start + 1
+            while end < stop and states[end] == _READY:
+                end += 1
+            states[start:end] = _READING
+            control[_READ_HEAD] = first + end - start
+        view = self._data[start:end]
+        view.flags.writeable = False
+        return InputBatch(first, view)
+
+    def release(self, batch: InputBatch) -> None:
+        """Give the slots of ``batch`` back to the producers.
+
+        Raises:
+            OutOfOrderReleaseError: If an earlier batch is still held.
+
+        """
+        control = self._control
+        with self._condition:
+            if control[_TAIL] != batch.first_ticket:
+                raise OutOfOrderReleaseError
+            start = batch.first_ticket % self.num_slots
+            self._states[start : start + len(batch)] = _FREE
+            control[_TAIL] = batch.first_ticket + len(batch)
+            self._condition.notify_all()
+
+    def pending(self) -> int:
+        """Return the number of reserved slots not yet released."""
+        with self._condition:
+            return int(self._control[_HEAD] - self._control[_TAIL])
+
+    def close(self) -> None:
+        """Detach this process from the segment."""
+        # Views must go before the buffer they point into can be released.
+        del self._control, self._states, self._data
+        self._memory.close()
+
+    def unlink(self) -> None:
+        """Destroy the segment; call once, from the creating process."""
+        self._memory.unlink()
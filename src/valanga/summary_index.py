@@ -0,0 +1,244 @@
+"""Columnar index of checkpoint state summaries.
+
+``CheckpointStateSummary`` records are small facts persisted beside checkpoint
+references. ``CheckpointSummaryIndex`` stores them column by column in NumPy
+arrays so that questions such as "which nodes are terminal" or "which nodes
+have this tag" are answered with vectorized scans, without materializing any
+state. Saved indexes are reopened through memory maps.
+
+This module requires NumPy, which is an optional dependency of valanga.
+"""
+
+import os
+import pickle
+from collections.abc import Hashable, Iterator, Sequence
+from pathlib import Path
+from typing import Literal, Self
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .checkpoint_store import NodeId, UnknownNodeError
+from .checkpoints import CheckpointStateSummary
+from .game import StateTag
+
+__all__ = ["CheckpointSummaryIndex", "SummaryLengthMismatchError"]
+
+NODE_IDS_FILE_NAME = "summary_node_ids.npy"
+TAG_CODES_FILE_NAME = "summary_tag_codes.npy"
+TERMINAL_FILE_NAME = "summary_terminal.npy"
+TAGS_FILE_NAME = "summary_tags.pkl"
+
+_NO_TAG = -1
+_UNKNOWN = -1
+
+
+class SummaryLengthMismatchError(ValueError):
+    """Bulk appends need exactly one summary per node id."""
+
+
+def _terminal_code(is_terminal: bool | None) -> int:
+    return _UNKNOWN if is_terminal is None else int(is_terminal)
+
+
+class CheckpointSummaryIndex:
+    """Append-only columnar index of ``CheckpointStateSummary`` records.
+
+    Tags are interned into a vocabulary and stored as ``int64`` codes (-1 for
+    a missing tag), and terminal flags are stored as ``int8`` values (-1 when
+    unknown). When a node is indexed again, its latest summary supersedes the
+    earlier ones: :meth:`summary_of` and the queries only see the latest row of
+    each node, while the columns and :meth:`items` keep every row.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        """Allocate an empty index with room for ``capacity`` rows."""
+        capacity = max(capacity, 1)
+        self._node_ids: NDArray[np.int64] = np.empty(capacity, dtype=np.int64)
+        self._tag_codes: NDArray[np.int64] = np.empty(capacity, dtype=np.int64)
+        self._terminal: NDArray[np.int8] = np.empty(capacity, dtype=np.int8)
+        self._tags: list[StateTag] = []
+        self._tag_lookup: dict[Hashable, int] = {}
+        self._size = 0
+        self._latest: NDArray[np.bool_] | None = None
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return self._size
+
+    @property
+    def node_ids(self) -> NDArray[np.int64]:
+        """Return the node id column."""
+        return self._node_ids[: self._size]
+
+    @property
+    def tag_codes(self) -> NDArray[np.int64]:
+        """Return the tag code column, -1 marking missing tags."""
+        return self._tag_codes[: self._size]
+
+    @property
+    def terminal(self) -> NDArray[np.int8]:
+        """Return the terminal column: 1, 0, or -1 when unknown."""
+        return self._terminal[: self._size]
+
+    def _reserve(self, capacity: int) -> None:
+        if capacity <= len(self._node_ids):
+            return
+        capacity = max(capacity, 2 * len(self._node_ids))
+        size = self._size
+        for name in ("_node_ids", "_tag_codes", "_terminal"):
+            column: NDArray[np.generic] = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:size] = column[:size]
+            setattr(self, name, grown)
+
+    def _tag_code(self, tag: StateTag | None) -> int:
+        if tag is None:
+            return _NO_TAG
+        code = self._tag_lookup.get(tag)
+        if code is None:
+            code = len(self._tags)
+            self._tags.append(tag)
+            self._tag_lookup[tag] = code
+        return code
+
+    def append(self, node_id: NodeId, summary: CheckpointStateSummary) -> None:
+        """Index the summary of ``node_id``."""
+        self.extend([node_id], [summary])
+
+    def extend(
+        self,
+        node_ids: Sequence[NodeId],
+        summaries: Sequence[CheckpointStateSummary],
+    ) -> None:
+        """Index many summaries at once.
+
+        Raises:
+            SummaryLengthMismatchError: If the two sequences have different
+                lengths.
+
+        """
+        if len(node_ids) != len(summaries):
+            raise SummaryLengthMismatchError
+        start = self._size
+        stop = start + len(node_ids)
+        self._reserve(stop)
+        self._node_ids[start:stop] = node_ids
+        self._tag_codes[start:stop] = [
+            self._tag_code(summary.tag) for summary in summaries
+        ]
+        self._terminal[start:stop] = [
+            _terminal_code(summary.is_terminal) for summary in summaries
+        ]
+        self._size = stop
+        self._latest = None
+
+    def _latest_rows(self) -> NDArray[np.bool_]:
+        """Return the mask of the rows holding the latest summary of their node."""
+        if self._latest is None:
+            node_ids = self.node_ids
+            _, from_end = np.unique(node_ids[::-1], return_index=True)
+            latest = np.zeros(len(node_ids), dtype=np.bool_)
+            latest[len(node_ids) - 1 - from_end] = True
+            self._latest = latest
+        return self._latest
+
+    def node_ids_with_tag(self, tag: StateTag) -> NDArray[np.int64]:
+        """Return the ids of the nodes whose summary has ``tag``."""
+        code = self._tag_lookup.get(tag)
+        if code is None:
+            return np.empty(0, dtype=np.int64)
+        matching: NDArray[np.int64] = self.node_ids[
+            (self.tag_codes == code) & self._latest_rows()
+        ]
+        return matching
+
+    def node_ids_where_terminal(
+        self, is_terminal: bool | None = True
+    ) -> NDArray[np.int64]:
+        """Return the ids of the nodes with the given terminal flag.
+
+        Args:
+            is_terminal: True for terminal nodes, False for non-terminal nodes
+                and None for nodes whose terminal status is unknown.
+
+        """
+        matching: NDArray[np.int64] = self.node_ids[
+            (self.terminal == _terminal_code(is_terminal)) & self._latest_rows()
+        ]
+        return matching
+
+    def summary_of(self, node_id: NodeId) -> CheckpointStateSummary:
+        """Return the latest indexed summary of ``node_id``.
+
+        Raises:
+            UnknownNodeError: If the node is not indexed.
+
+        """
+        rows = np.flatnonzero(self.node_ids == node_id)
+        if rows.size == 0:
+            raise UnknownNodeError(node_id)
+        return self._summary_at(int(rows[-1]))
+
+    def _summary_at(self, row: int) -> CheckpointStateSummary:
+        code = int(self._tag_codes[row])
+        terminal = int(self._terminal[row])
+        return CheckpointStateSummary(
+            tag=None if code == _NO_TAG else self._tags[code],
+            is_terminal=None if terminal == _UNKNOWN else bool(terminal),
+        )
+
+    def items(self) -> Iterator[tuple[NodeId, CheckpointStateSummary]]:
+        """Iterate over the ``(node_id, summary)`` rows in insertion order."""
+        for row, node_id in enumerate(self.node_ids.tolist()):
+            yield node_id, self._summary_at(row)
+
+    def save(self, directory: str | os.PathLike[str]) -> None:
+        """Write the index to ``directory`` as ``.npy`` columns and a tag vocabulary.
+
+        Every file is written to a temporary file first and then moved over
+        the previous one, so an interrupted save never leaves a torn file.
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        columns: dict[str, NDArray[np.generic]] = {
+            NODE_IDS_FILE_NAME: self.node_ids,
+            TAG_CODES_FILE_NAME: self.tag_codes,
+            TERMINAL_FILE_NAME: self.terminal,
+        }
+        replacements: list[tuple[Path, Path]] = []
+        for name, column in columns.items():
+            temp_path = path / (name + ".tmp")
+            with temp_path.open("wb") as column_file:
+                np.save(column_file, column)
+            replacements.append((temp_path, path / name))
+        temp_path = path / (TAGS_FILE_NAME + ".tmp")
+        with temp_path.open("wb") as tags_file:
+            pickle.dump(self._tags, tags_file, protocol=pickle.HIGHEST_PROTOCOL)
+        replacements.append((temp_path, path / TAGS_FILE_NAME))
+        for temp_path, final_path in replacements:
+            os.replace(temp_path, final_path)
+
+    @classmethod
+    def load(cls, directory: str | os.PathLike[str], *, mmap: bool = True) -> Self:
+        """Open an index written by :meth:`save`.
+
+        Args:
+            directory: The directory the index was saved to.
+            mmap: Whether to memory-map the columns instead of reading them.
+                Appending to a memory-mapped index first copies the columns
+                into memory.
+
+        """
+        path = Path(directory)
+        mmap_mode: Literal["r"] | None = "r" if mmap else None
+        index = cls.__new__(cls)
+        index._node_ids = np.load(path / NODE_IDS_FILE_NAME, mmap_mode=mmap_mode)
+        index._tag_codes = np.load(path / TAG_CODES_FILE_NAME, mmap_mode=mmap_mode)
+        index._terminal = np.load(path / TERMINAL_FILE_NAME, mmap_mode=mmap_mode)
+        with (path / TAGS_FILE_NAME).open("rb") as tags_file:
+            index._tags = pickle.load(tags_file)
+        index._tag_lookup = {tag: code for code, tag in enumerate(index._tags)}
+        index._size = len(index._node_ids)
+        index._latest = None
+        return index
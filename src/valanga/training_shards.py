@@ -0,0 +1,392 @@
+"""Memory-mapped shards of training samples.
+
+A training sample is an evaluator input, the score and certainty of its
+:class:`~valanga.evaluations.Value`, and the dense vector of its
+:class:`~valanga.policy.BranchPolicy`. ``TrainingShardWriter`` streams samples
+into fixed-size shards, each made of one ``.npy`` file per column written in
+place through :func:`numpy.lib.format.open_memmap`, and keeps an
+``index.json`` listing the shards and their sample counts.
+``TrainingShardReader`` opens a dataset through memory maps only, so opening
+it costs the same whatever its size, and gives random access to samples and
+batches.
+
+This module requires NumPy, which is an optional dependency of valanga.
+"""
+
+import json
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.typing import ArrayLike, DTypeLike, NDArray
+
+from .evaluations import Certainty, Value
+from .game import BranchKey, State
+from .policy import BranchPolicy
+from .represention_for_evaluation import ContentRepresentation
+
+__all__ = [
+    "IncompatibleShardLayoutError",
+    "NonIntegerBranchKeyError",
+    "PolicyPositionOutOfRangeError",
+    "TrainingBatch",
+    "TrainingShardReader",
+    "TrainingShardWriter",
+]
+
+INDEX_FILE_NAME = "index.json"
+SHARD_PREFIX_PATTERN = "shard-{:06d}"
+COLUMNS = ("inputs", "scores", "certainties", "policies")
+_FORMAT_VERSION = 1
+
+type ActionIndex = Callable[[BranchKey], int]
+
+
+class IncompatibleShardLayoutError(ValueError):
+    """Raised when appending samples of another layout to a dataset."""
+
+    def __init__(self, directory: Path) -> None:
+        """Build the error from the dataset directory."""
+        super().__init__(f"{directory} holds samples of another layout")
+
+
+class NonIntegerBranchKeyError(TypeError):
+    """Raised when the default action index meets a non-integer branch key."""
+
+    def __init__(self, key: BranchKey) -> None:
+        """Build the error from the offending key."""
+        super().__init__(f"branch key {key!r} is not an integer; pass action_index")
+
+
+class PolicyPositionOutOfRangeError(IndexError):
+    """Raised when a branch key maps outside of the dense policy vector."""
+
+    def __init__(self, key: BranchKey, position: int, policy_size: int) -> None:
+        """Build the error from the key, its position and the vector length."""
+        super().__init__(
+            f"branch key {key!r} maps to position {position}, "
+            f"outside of a policy of size {policy_size}"
+        )
+
+
+def _integer_key_position(key: BranchKey) -> int:
+    if not isinstance(key, int):
+        raise NonIntegerBranchKeyError(key)
+    return key
+
+
+@dataclass(frozen=True, slots=True)
+class TrainingBatch:
+    """Columns of a set of training samples.
+
+    Attributes:
+        inputs: The evaluator inputs, stacked along the first axis.
+        scores: The value scores.
+        certainties: The ``Certainty`` values of the scores, as ``uint8``.
+        policies: The dense policy vectors, stacked along the first axis.
+
+    """
+
+    inputs: NDArray[Any]
+    scores: NDArray[np.float32]
+    certainties: NDArray[np.uint8]
+    policies: NDArray[np.float32]
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return len(self.scores)
+
+    def certainty(self, row: int) -> Certainty:
+        """Return the certainty of sample ``row``."""
+        return Certainty(int(self.certainties[row]))
+
+
+def _layout(
+    input_shape: tuple[int, ...], input_dtype: np.dtype[Any], policy_size: int
+) -> dict[str, Any]:
+    return {
+        "version": _FORMAT_VERSION,
+        "input_shape": list(input_shape),
+        "input_dtype": input_dtype.str,
+        "policy_size": policy_size,
+    }
+
+
+def _read_index(directory: Path) -> dict[str, Any]:
+    with (directory / INDEX_FILE_NAME).open(encoding="utf-8") as index_file:
+        index: dict[str, Any] = json.load(index_file)
+    return index
+
+
+def _column_path(directory: Path, prefix: str, column: str) -> Path:
+    return directory / f"{prefix}.{column}.npy"
+
+
+class TrainingShardWriter:  # pylint: disable=too-many-instance-attributes
+    """Append training samples to a directory of memory-mapped shards.
+
+    Every shard is allocated at its full size when opened and filled in place;
+    a shard closed before it is full is truncated to its samples. The index is
+    rewritten, atomically, whenever a shard is completed and on :meth:`close`,
+    so samples written since the last index update are lost if the process
+    dies. Writing to a directory that already holds a dataset appends new
+    shards to it.
+    """
+
+    def __init__(  # noqa: PLR0913  # pylint: disable=too-many-arguments
+        self,
+        directory: str | os.PathLike[str],
+        input_shape: tuple[int, ...],
+        policy_size: int,
+        *,
+        input_dtype: DTypeLike = np.float32,
+        samples_per_shard: int = 65536,
+        action_index: ActionIndex = _integer_key_position,
+    ) -> None:
+        """Open the dataset in ``directory``, creating it if needed.
+
+        Args:
+            directory: The dataset directory.
+            input_shape: The shape of one evaluator input.
+            policy_size: The length of the dense policy vectors.
+            input_dtype: The dtype the evaluator inputs are stored as.
+            samples_per_shard: The number of samples of a full shard.
+            action_index: Maps a branch key of a policy to its position in
+                the dense vector. Integer keys are used as positions by
+                default.
+
+        Raises:
+            IncompatibleShardLayoutError: If ``directory`` holds samples of
+                another shape, dtype or policy size.
+
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.input_shape = tuple(input_shape)
+        self.input_dtype = np.dtype(input_dtype)
+        self.policy_size = policy_size
+        self.samples_per_shard = samples_per_shard
+        self.action_index = action_index
+        self._layout = _layout(self.input_shape, self.input_dtype, policy_size)
+        self._shards: list[dict[str, Any]] = []
+        if (self.directory / INDEX_FILE_NAME).exists():
+            index = _read_index(self.directory)
+            if {key: index.get(key) for key in self._layout} != self._layout:
+                raise IncompatibleShardLayoutError(self.directory)
+            self._shards = index["shards"]
+        self._columns: dict[str, np.memmap[Any, Any]] | None = None
+        self._filled = 0
+
+    def __enter__(self) -> Self:
+        """Return the writer for use in a ``with`` block."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the writer, recording the samples written so far."""
+        self.close()
+
+    def __len__(self) -> int:
+        """Return the number of samples of the dataset, including unsaved ones."""
+        return sum(int(shard["num_samples"]) for shard in self._shards) + self._filled
+
+    def write(
+        self,
+        evaluator_input: ArrayLike,
+        value: Value,
+        policy: BranchPolicy | None = None,
+    ) -> None:
+        """Append one sample.
+
+        Args:
+            evaluator_input: The evaluator input, of shape ``input_shape``.
+            value: The value the sample is trained towards.
+            policy: Optional policy target; stored as all zeros when None.
+
+        Raises:
+            PolicyPositionOutOfRangeError: If a branch key of ``policy`` maps
+                outside of ``range(policy_size)``.
+
+        """
+        # Resolve every policy position first, so a failing action_index
+        # leaves no partial row behind.
+        positions: list[int] = []
+        if policy is not None:
+            for key in policy.probs:
+                position = self.action_index(key)
+                if not 0 <= position < self.policy_size:
+                    raise PolicyPositionOutOfRangeError(key, position, self.policy_size)
+                positions.append(position)
+        if self._columns is None:
+            self._columns = self._open_shard()
+        row = self._filled
+        columns = self._columns
+        np.copyto(columns["inputs"][row], evaluator_input, casting="same_kind")
+        columns["scores"][row] = value.score
+        columns["certainties"][row] = value.certainty.value
+        if policy is not None:
+            columns["policies"][row, positions] = list(policy.probs.values())
+        self._filled += 1
+        if self._filled == self.samples_per_shard:
+            self._finish_shard()
+
+    def write_representation[StateT: State](
+        self,
+        representation: ContentRepresentation[StateT, Any],
+        state: StateT,
+        value: Value,
+        policy: BranchPolicy | None = None,
+    ) -> None:
+        """Append the sample of ``state`` with the input of ``representation``."""
+        self.write(representation.get_evaluator_input(state), value, policy)
+
+    def close(self) -> None:
+        """Record the current shard, even if partial, and update the index."""
+        if self._columns is not None:
+            self._finish_shard()
+
+    def _open_shard(self) -> dict[str, np.memmap[Any, Any]]:
+        prefix = SHARD_PREFIX_PATTERN.format(len(self._shards))
+        size = self.samples_per_shard
+        specs: dict[str, tuple[tuple[int, ...], DTypeLike]] = {
+            "inputs": ((size, *self.input_shape), self.input_dtype),
+            "scores": ((size,), np.float32),
+            "certainties": ((size,), np.uint8),
+            "policies": ((size, self.policy_size), np.float32),
+        }
+        columns: dict[str, np.memmap[Any, Any]] = {}
+        for column, (shape, dtype) in specs.items():
+            columns[column] = open_memmap(
+                _column_path(self.directory, prefix, column),
+                mode="w+",
+                dtype=dtype,
+                shape=shape,
+            )
+        # Fresh files are zero-filled, which is the "no policy" encoding.
+        return columns
+
+    def _finish_shard(self) -> None:
+        assert self._columns is not None
+        prefix = SHARD_PREFIX_PATTERN.format(len(self._shards))
+        columns = self._columns
+        self._columns = None
+        for column in columns.values():
+            column.flush()
+        if self._filled < self.samples_per_shard:
+            self._truncate_shard(prefix, columns)
+        self._shards.append({"prefix": prefix, "num_samples": self._filled})
+        self._filled = 0
+        index_path = self.directory / INDEX_FILE_NAME
+        temp_path = index_path.with_name(INDEX_FILE_NAME + ".tmp")
+        with temp_path.open("w", encoding="utf-8") as index_file:
+            json.dump({**self._layout, "shards": self._shards}, index_file, indent=1)
+        os.replace(temp_path, index_path)
+
+    def _truncate_shard(
+        self, prefix: str, columns: dict[str, np.memmap[Any, Any]]
+    ) -> None:
+        temp_paths: dict[Path, Path] = {}
+        for column, data in columns.items():
+            path = _column_path(self.directory, prefix, column)
+            temp_paths[path] = path.with_name(path.name + ".tmp")
+            with temp_paths[path].open("wb") as column_file:
+                np.save(column_file, data[: self._filled])
+        # Drop the memory maps before replacing the files they map.
+        columns.clear()
+        for path, temp_path in temp_paths.items():
+            os.replace(temp_path, path)
+
+
+class TrainingShardReader:
+    """Random access to the samples of a dataset written by ``TrainingShardWriter``.
+
+    Column files are opened as read-only memory maps; samples are only read
+    from disk when accessed.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]) -> None:
+        """Open the dataset in ``directory``."""
+        self.directory = Path(directory)
+        index = _read_index(self.directory)
+        self.input_shape = tuple(index["input_shape"])
+        self.input_dtype = np.dtype(index["input_dtype"])
+        self.policy_size: int = index["policy_size"]
+        self._shards: list[dict[str, NDArray[Any]]] = []
+        counts = [0]
+        for shard in index["shards"]:
+            num_samples = shard["num_samples"]
+            self._shards.append(
+                {
+                    column: np.load(
+                        _column_path(self.directory, shard["prefix"], column),
+                        mmap_mode="r",
+                    )[:num_samples]
+                    for column in COLUMNS
+                }
+            )
+            counts.append(num_samples)
+        self._offsets: NDArray[np.int64] = np.cumsum(counts, dtype=np.int64)
+
+    def __len__(self) -> int:
+        """Return the number of samples."""
+        return int(self._offsets[-1])
+
+    @property
+    def num_shards(self) -> int:
+        """Return the number of shards."""
+        return len(self._shards)
+
+    def shard(self, shard: int) -> TrainingBatch:
+        """Return the memory-mapped columns of shard ``shard``."""
+        columns = self._shards[shard]
+        return TrainingBatch(
+            inputs=columns["inputs"],
+            scores=columns["scores"],
+            certainties=columns["certainties"],
+            policies=columns["policies"],
+        )
+
+    def __getitem__(self, index: int) -> TrainingBatch:
+        """Return sample ``index`` as a batch of one sample."""
+        return self.gather([index])
+
+    def gather(
+        self, indices: Sequence[int] | NDArray[np.integer[Any]]
+    ) -> TrainingBatch:
+        """Copy the samples at ``indices`` into one batch, in the given order.
+
+        Raises:
+            IndexError: If an index is out of range.
+
+        """
+        positions = np.asarray(indices, dtype=np.int64)
+        positions = np.where(positions < 0, positions + len(self), positions)
+        if positions.size and (positions.min() < 0 or positions.max() >= len(self)):
+            raise IndexError(int(positions.max()))
+        shard_of = np.searchsorted(self._offsets, positions, side="right") - 1
+        count = len(positions)
+        inputs = np.empty((count, *self.input_shape), self.input_dtype)
+        scores = np.empty(count, np.float32)
+        certainties = np.empty(count, np.uint8)
+        policies = np.empty((count, self.policy_size), np.float32)
+        shards: list[int] = np.unique(shard_of).tolist()
+        for shard in shards:
+            selected = shard_of == shard
+            rows = positions[selected] - self._offsets[shard]
+            columns = self._shards[shard]
+            inputs[selected] = columns["inputs"][rows]
+            scores[selected] = columns["scores"][rows]
+            certainties[selected] = columns["certainties"][rows]
+            policies[selected] = columns["policies"][rows]
+        return TrainingBatch(
+            inputs=inputs, scores=scores, certainties=certainties, policies=policies
+        )
@@ -0,0 +1,264 @@
+"""Bounded transposition table caching evaluations by state tag.
+
+Search layers routinely reach the same state through different branch orders.
+The table below keeps a fixed number of entries so that engines built on the
+``State``/``Value`` protocols can share evaluations without unbounded memory
+growth.
+"""
+
+from dataclasses import dataclass
+from enum import Enum, auto
+
+from .evaluations import Certainty, Value
+from .game import StateTag
+
+__all__ = [
+    "ReplacementPolicy",
+    "TranspositionEntry",
+    "TranspositionTable",
+    "TranspositionTableSizeError",
+    "TranspositionTableStats",
+]
+
+
+class TranspositionTableSizeError(ValueError):
+    """The memory budget cannot hold a single bucket."""
+
+    def __init__(self, max_entries: int, bucket_size: int) -> None:
+        """Describe the rejected budget."""
+        super().__init__(
+            f"max_entries ({max_entries}) must hold at least one bucket of "
+            f"{bucket_size} slots"
+        )
+
+
+class ReplacementPolicy(Enum):
+    """How a full bucket chooses which entry to give up.
+
+    ``DEPTH_PREFERRED`` keeps the entries searched the deepest (certain values
+    are treated as deeper than any estimate) and rejects shallower stores.
+    ``ALWAYS_REPLACE`` always accepts the new entry and evicts the oldest one.
+    """
+
+    DEPTH_PREFERRED = auto()
+    ALWAYS_REPLACE = auto()
+
+
+@dataclass(frozen=True, slots=True)
+class TranspositionEntry:
+    """A cached evaluation for a state tag.
+
+    Attributes:
+        tag: The tag of the cached state.
+        value: The cached evaluation, including its certainty.
+        depth: The search depth the value was computed with.
+
+    """
+
+    tag: StateTag
+    value: Value
+    depth: int = 0
+
+    @property
+    def certainty(self) -> Certainty:
+        """Return the certainty of the cached value."""
+        return self.value.certainty
+
+
+@dataclass(frozen=True, slots=True)
+class TranspositionTableStats:
+    """Snapshot of the transposition table counters."""
+
+    hits: int
+    misses: int
+    stores: int
+    evictions: int
+    rejections: int
+    occupancy: int
+    capacity: int
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of probes that were hits."""
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+
+def _priority(certainty: Certainty, depth: int) -> tuple[bool, int]:
+    """Return the depth-preferred ordering key of an entry."""
+    return (certainty is not Certainty.ESTIMATE, depth)
+
+
+class TranspositionTable:  # pylint: disable=too-many-instance-attributes
+    """Fixed-capacity cache of ``Value`` objects keyed by ``StateTag``.
+
+    The table holds at most ``max_entries`` entries split into buckets of
+    ``bucket_size`` slots. A tag always maps to the same bucket, so probing and
+    storing only scan ``bucket_size`` slots.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        bucket_size: int = 4,
+        policy: ReplacementPolicy = ReplacementPolicy.DEPTH_PREFERRED,
+    ) -> None:
+        """Allocate the table.
+
+        Args:
+            max_entries: The memory budget, expressed as a number of entries.
+            bucket_size: The number of slots scanned for each tag.
+            policy: How to choose the entry to evict from a full bucket.
+
+        Raises:
+            TranspositionTableSizeError: If the budget cannot hold a single bucket.
+
+        """
+        if bucket_size < 1 or max_entries < bucket_size:
+            raise TranspositionTableSizeError(max_entries, bucket_size)
+        self.policy = policy
+        self.bucket_size = bucket_size
+        self._num_buckets = max_entries // bucket_size
+        self._slots: list[TranspositionEntry | None] = [None] * (
+            self._num_buckets * bucket_size
+        )
+        self._cursors = [0] * self._num_buckets
+        self._occupancy = 0
+        self.reset_stats()
+
+    @property
+    def capacity(self) -> int:
+        """Return the maximum number of entries the table can hold."""
+        return len(self._slots)
+
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+        return self._occupancy
+
+    def __contains__(self, tag: StateTag) -> bool:
+        """Return whether ``tag`` is stored, without touching the counters."""
+        return self._find(tag) is not None
+
+    def _bucket_start(self, tag: StateTag) -> int:
+        return (hash(tag) % self._num_buckets) * self.bucket_size
+
+    def _find(self, tag: StateTag) -> int | None:
+        start = self._bucket_start(tag)
+        for index in range(start, start + self.bucket_size):
+            entry = self._slots[index]
+            if entry is not None and entry.tag == tag:
+                return index
+        return None
+
+    def probe(self, tag: StateTag, min_depth: int = 0) -> TranspositionEntry | None:
+        """Return the entry for ``tag`` if it was searched deep enough.
+
+        Entries with a certain value are returned regardless of ``min_depth``.
+
+        Args:
+            tag: The tag of the state to look up.
+            min_depth: The minimum search depth the caller can reuse.
+
+        Returns:
+            TranspositionEntry | None: The cached entry, or None on a miss.
+
+        """
+        index = self._find(tag)
+        if index is not None:
+            entry = self._slots[index]
+            assert entry is not None
+            if entry.depth >= min_depth or entry.certainty is not Certainty.ESTIMATE:
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(  # pylint: disable=too-many-locals
+        self, tag: StateTag, value: Value, depth: int = 0
+    ) -> bool:
+        """Store ``value`` for ``tag``.
+
+        Args:
+            tag: The tag of the evaluated state.
+            value: The evaluation to cache.
+            depth: The search depth the value was computed with.
+
+        Returns:
+            bool: True if the entry was stored, False if the policy rejected it.
+
+        """
+        entry = TranspositionEntry(tag=tag, value=value, depth=depth)
+        start = self._bucket_start(tag)
+        stop = start + self.bucket_size
+        depth_preferred = self.policy is ReplacementPolicy.DEPTH_PREFERRED
+        new_priority = _priority(value.certainty, depth)
+
+        free_index: int | None = None
+        victim_index = start
+        victim_priority: tuple[bool, int] | None = None
+        for index in range(start, stop):
+            current = self._slots[index]
+            if current is None:
+                if free_index is None:
+                    free_index = index
+                continue
+            if current.tag == tag:
+                if depth_preferred and new_priority < _priority(
+                    current.certainty, current.depth
+                ):
+                    self.rejections += 1
+                    return False
+                self._slots[index] = entry
+                self.stores += 1
+                return True
+            priority = _priority(current.certainty, current.depth)
+            if victim_priority is None or priority < victim_priority:
+                victim_index, victim_priority = index, priority
+
+        if free_index is not None:
+            self._slots[free_index] = entry
+            self._occupancy += 1
+            self.stores += 1
+            return True
+
+        if depth_preferred:
+            assert victim_priority is not None
+            if new_priority < victim_priority:
+                self.rejections += 1
+                return False
+        else:
+            bucket = start // self.bucket_size
+            victim_index = start + self._cursors[bucket]
+            self._cursors[bucket] = (self._cursors[bucket] + 1) % self.bucket_size
+
+        self._slots[victim_index] = entry
+        self.evictions += 1
+        self.stores += 1
+        return True
+
+    def clear(self) -> None:
+        """Drop every entry while keeping the allocated slots and counters."""
+        self._slots[:] = [None] * len(self._slots)
+        self._cursors[:] = [0] * self._num_buckets
+        self._occupancy = 0
+
+    def reset_stats(self) -> None:
+        """Reset the hit, miss, store, eviction and rejection counters."""
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    @property
+    def stats(self) -> TranspositionTableStats:
+        """Return a snapshot of the table counters."""
+        return TranspositionTableStats(
+            hits=self.hits,
+            misses=self.misses,
+            stores=self.stores,
+            evictions=self.evictions,
+            rejections=self.rejections,
+            occupancy=self._occupancy,
+            capacity=self.capacity,
+        )
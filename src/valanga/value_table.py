@@ -0,0 +1,247 @@
+"""Struct-of-arrays storage for many evaluations.
+
+A ``Value`` object per node is convenient but costly for large trees.
+``ValueTable`` keeps the score, certainty and terminal metadata of each row in
+parallel NumPy arrays, and only builds ``Value`` objects when a row is read.
+
+This module requires NumPy, which is an optional dependency of valanga.
+"""
+
+from collections.abc import Hashable, Iterable, Iterator
+from enum import Enum
+from typing import Any
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
+
+from .evaluations import Certainty, Value
+from .game import BranchKey, Role
+from .over_event import Outcome, OverEvent
+
+__all__ = ["ValueTable", "ValueView"]
+
+_NO_OVER_EVENT = -1
+_CERTAINTIES: tuple[Certainty | None, ...] = (None, *Certainty)
+_CERTAINTY_CODES = {certainty: code for code, certainty in enumerate(_CERTAINTIES)}
+
+type _OverEventKey = tuple[Outcome, Enum | None, Hashable]
+
+
+def _over_event_key(over_event: OverEvent[Role]) -> _OverEventKey:
+    return (over_event.outcome, over_event.termination, over_event.winner)
+
+
+class ValueView:
+    """Lazy read/write view of one row of a ``ValueTable``."""
+
+    __slots__ = ("index", "table")
+
+    def __init__(self, table: "ValueTable", index: int) -> None:
+        """Bind the view to ``table`` row ``index``."""
+        self.table = table
+        self.index = index
+
+    @property
+    def score(self) -> float:
+        """Return the score of the row."""
+        return float(self.table.scores[self.index])
+
+    @score.setter
+    def score(self, score: float) -> None:
+        self.table.scores[self.index] = score
+
+    @property
+    def certainty(self) -> Certainty:
+        """Return the certainty of the row."""
+        return self.table.certainty_at(self.index)
+
+    @property
+    def over_event(self) -> OverEvent[Role] | None:
+        """Return the terminal metadata of the row, if any."""
+        return self.table.over_event_at(self.index)
+
+    def get(self) -> Value:
+        """Materialize the row as a ``Value``."""
+        return self.table[self.index]
+
+    def set(self, value: Value) -> None:
+        """Overwrite the row with ``value``."""
+        self.table[self.index] = value
+
+
+class ValueTable:
+    """Array-backed table of evaluations indexed by row number.
+
+    Scores are stored in a float array, certainties as ``uint8`` codes and
+    terminal events as ``int32`` indices into a list of distinct events, so a
+    row costs 13 bytes with ``float64`` scores. Principal lines are rare and
+    variable-sized, so they are kept in a side dictionary keyed by row.
+
+    The ``scores``, ``certainty_codes`` and ``over_event_indices`` properties
+    expose the filled part of the arrays for vectorized processing.
+    """
+
+    def __init__(
+        self, capacity: int = 1024, score_dtype: DTypeLike = np.float64
+    ) -> None:
+        """Allocate an empty table.
+
+        Args:
+            capacity: The number of rows to preallocate. The table grows as
+                needed.
+            score_dtype: The floating-point dtype of the scores, typically
+                ``float32`` or ``float64``.
+
+        """
+        capacity = max(capacity, 1)
+        self._scores: NDArray[np.floating[Any]] = np.zeros(capacity, dtype=score_dtype)
+        self._certainties: NDArray[np.uint8] = np.zeros(capacity, dtype=np.uint8)
+        self._over_event_indices: NDArray[np.int32] = np.full(
+            capacity, _NO_OVER_EVENT, dtype=np.int32
+        )
+        self._over_events: list[OverEvent[Role]] = []
+        self._over_event_codes: dict[_OverEventKey, int] = {}
+        self._lines: dict[int, list[BranchKey]] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        """Return the number of allocated rows."""
+        return len(self._scores)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the memory used by the allocated arrays."""
+        return (
+            self._scores.nbytes
+            + self._certainties.nbytes
+            + self._over_event_indices.nbytes
+        )
+
+    @property
+    def scores(self) -> NDArray[np.floating[Any]]:
+        """Return a writable view of the scores of the filled rows."""
+        return self._scores[: self._size]
+
+    @property
+    def certainty_codes(self) -> NDArray[np.uint8]:
+        """Return a view of the certainty codes of the filled rows.
+
+        Code 0 marks an unset row and codes ``1..`` follow the declaration
+        order of :class:`Certainty`.
+        """
+        return self._certainties[: self._size]
+
+    @property
+    def over_event_indices(self) -> NDArray[np.int32]:
+        """Return a view of the terminal event indices of the filled rows.
+
+        Index -1 marks rows without terminal metadata; other indices refer to
+        :attr:`over_events`.
+        """
+        return self._over_event_indices[: self._size]
+
+    @property
+    def over_events(self) -> list[OverEvent[Role]]:
+        """Return the distinct terminal events referenced by the table."""
+        return list(self._over_events)
+
+    @staticmethod
+    def certainty_code(certainty: Certainty) -> int:
+        """Return the code stored for ``certainty``."""
+        return _CERTAINTY_CODES[certainty]
+
+    def reserve(self, capacity: int) -> None:
+        """Grow the arrays so that they hold at least ``capacity`` rows."""
+        if capacity <= self.capacity:
+            return
+        extra = capacity - self.capacity
+        self._scores = np.concatenate(
+            [self._scores, np.zeros(extra, dtype=self._scores.dtype)]
+        )
+        self._certainties = np.concatenate(
+            [self._certainties, np.zeros(extra, dtype=np.uint8)]
+        )
+        self._over_event_indices = np.concatenate(
+            [
+                self._over_event_indices,
+                np.full(extra, _NO_OVER_EVENT, dtype=np.int32),
+            ]
+        )
+
+    def _over_event_code(self, over_event: OverEvent[Role] | None) -> int:
+        if over_event is None:
+            return _NO_OVER_EVENT
+        key = _over_event_key(over_event)
+        code = self._over_event_codes.get(key)
+        if code is None:
+            code = len(self._over_events)
+            self._over_events.append(over_event.interned())
+            self._over_event_codes[key] = code
+        return code
+
+    def _check_index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError(index)
+        return index
+
+    def append(self, value: Value) -> int:
+        """Append ``value`` as a new row and return its index."""
+        if self._size == self.capacity:
+            self.reserve(2 * self.capacity)
+        index = self._size
+        self._size += 1
+        self[index] = value
+        return index
+
+    def extend(self, values: Iterable[Value]) -> None:
+        """Append every value of ``values``."""
+        for value in values:
+            self.append(value)
+
+    def __setitem__(self, index: int, value: Value) -> None:
+        """Overwrite row ``index`` with ``value``."""
+        index = self._check_index(index)
+        self._scores[index] = value.score
+        self._certainties[index] = _CERTAINTY_CODES[value.certainty]
+        self._over_event_indices[index] = self._over_event_code(value.over_event)
+        if value.line is None:
+            self._lines.pop(index, None)
+        else:
+            self._lines[index] = value.line
+
+    def __getitem__(self, index: int) -> Value:
+        """Materialize row ``index`` as a ``Value``."""
+        index = self._check_index(index)
+        return Value(
+            score=float(self._scores[index]),
+            certainty=self.certainty_at(index),
+            over_event=self.over_event_at(index),
+            line=self._lines.get(index),
+        )
+
+    def __iter__(self) -> Iterator[Value]:
+        """Materialize every row in order."""
+        for index in range(self._size):
+            yield self[index]
+
+    def view(self, index: int) -> ValueView:
+        """Return a lazy view of row ``index``."""
+        return ValueView(self, self._check_index(index))
+
+    def certainty_at(self, index: int) -> Certainty:
+        """Return the certainty of row ``index``."""
+        certainty = _CERTAINTIES[int(self._certainties[index])]
+        assert certainty is not None
+        return certainty
+
+    def over_event_at(self, index: int) -> OverEvent[Role] | None:
+        """Return the terminal metadata of row ``index``, if any."""
+        code = int(self._over_event_indices[index])
+        return None if code == _NO_OVER_EVENT else self._over_events[code]
@@ -0,0 +1,489 @@
+"""Compact binary wire format for search results exchanged between processes.
+
+Pickling ``Value``, ``OverEvent``, ``Recommendation`` and ``Transition``
+objects one by one dominates the inter-process traffic of distributed
+self-play. ``WireCodec`` packs batches of them into one buffer with
+:mod:`struct`, and decodes them straight from a ``memoryview``.
+
+Domain-specific fields, such as branch keys, roles, terminations or states,
+are written by pluggable :class:`FieldCodec` objects. ``IntFieldCodec``,
+``StrFieldCodec`` and ``EnumFieldCodec`` cover the common cases.
+
+A batch starts with a magic, the format version and the object count, and
+every object starts with a one-byte type tag, so batches may mix types.
+"""
+
+import struct
+from collections.abc import Iterable, Sequence
+from enum import Enum, IntEnum
+from typing import Any, Protocol
+
+from .dynamics import Transition
+from .evaluations import Certainty, Value
+from .game import BranchKey, BranchName, Role
+from .over_event import Outcome, OverEvent, intern_over_event
+from .policy import BranchPolicy, Recommendation
+
+__all__ = [
+    "WIRE_FORMAT_VERSION",
+    "EnumFieldCodec",
+    "FieldCodec",
+    "IntFieldCodec",
+    "MissingFieldCodecError",
+    "StrFieldCodec",
+    "UnknownObjectTagError",
+    "UnsupportedWireObjectError",
+    "UnsupportedWireVersionError",
+    "WireCodec",
+    "WireFormatError",
+]
+
+WIRE_FORMAT_VERSION = 1
+
+_MAGIC = b"VW"
+_HEADER = struct.Struct("<2sBI")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+_VALUE = struct.Struct("<dBB")
+_OUTCOMES = tuple(Outcome)
+_OUTCOME_CODES = {outcome: code for code, outcome in enumerate(_OUTCOMES)}
+_CERTAINTIES = tuple(Certainty)
+_CERTAINTY_CODES = {certainty: code for code, certainty in enumerate(_CERTAINTIES)}
+_OVER_EVENT_FLAGS = 0b11
+
+_WIRE_TYPES: tuple[type, ...] = (Value, OverEvent, Recommendation, Transition)
+
+type WireObject = Value | OverEvent[Role] | Recommendation | Transition[Any]
+type Buffer = bytes | bytearray | memoryview
+
+
+class _Tag(IntEnum):
+    VALUE = 1
+    OVER_EVENT = 2
+    RECOMMENDATION = 3
+    TRANSITION = 4
+
+
+class WireFormatError(ValueError):
+    """Raised when a buffer is not a batch of this wire format."""
+
+    def __init__(self, *args: object) -> None:
+        """Build the error, with a default message."""
+        super().__init__(*(args or ("invalid wire buffer",)))
+
+
+class UnsupportedWireVersionError(WireFormatError):
+    """Raised when a buffer was written by another version of the format."""
+
+    def __init__(self, version: int) -> None:
+        """Build the error for ``version``."""
+        super().__init__(f"unsupported wire format version {version}")
+
+
+class UnknownObjectTagError(WireFormatError):
+    """Raised when a buffer holds an object type this codec does not know."""
+
+    def __init__(self, tag: int) -> None:
+        """Build the error for ``tag``."""
+        super().__init__(f"unknown wire object tag {tag}")
+
+
+class UnsupportedWireObjectError(WireFormatError):
+    """Raised when encoding an object of a type the format does not carry."""
+
+    def __init__(self, obj: object) -> None:
+        """Build the error for ``obj``."""
+        super().__init__(f"cannot encode {type(obj).__name__} objects")
+
+
+class MissingFieldCodecError(ValueError):
+    """Raised when a field is present but the codec has no encoder for it."""
+
+    def __init__(self, field: str) -> None:
+        """Build the error for ``field``."""
+        super().__init__(f"no field codec configured for {field}")
+
+
+class FieldCodec[T](Protocol):
+    """Write one domain-specific field to a buffer and read it back."""
+
+    def encode(self, value: T, out: bytearray) -> None:
+        """Append the encoding of ``value`` to ``out``."""
+        ...
+
+    def decode(self, buffer: memoryview, offset: int) -> tuple[T, int]:
+        """Read a value at ``offset`` and return it with the next offset."""
+        ...
+
+
+class IntFieldCodec:
+    """Encode integers as signed 64-bit values."""
+
+    def encode(self, value: int, out: bytearray) -> None:
+        """Append ``value``."""
+        out += _I64.pack(value)
+
+    def decode(self, buffer: memoryview, offset: int) -> tuple[int, int]:
+        """Read an integer."""
+        return _I64.unpack_from(buffer, offset)[0], offset + _I64.size
+
+
+class StrFieldCodec:
+    """Encode strings as UTF-8 with a 32-bit length prefix."""
+
+    def encode(self, value: str, out: bytearray) -> None:
+        """Append ``value``."""
+        data = value.encode()
+        out += _U32.pack(len(data))
+        out += data
+
+    def decode(self, buffer: memoryview, offset: int) -> tuple[str, int]:
+        """Read a string.
+
+        Raises:
+            WireFormatError: If the buffer ends within the string.
+
+        """
+        length: int = _U32.unpack_from(buffer, offset)[0]
+        start = offset + _U32.size
+        end = start + length
+        if end > len(buffer):
+            raise WireFormatError
+        return str(buffer[start:end], "utf-8"), end
+
+
+class EnumFieldCodec[EnumT: Enum]:
+    """Encode members of one enum by their 16-bit declaration index."""
+
+    def __init__(self, enum_type: type[EnumT]) -> None:
+        """Index the members of ``enum_type``."""
+        self.members: tuple[EnumT, ...] = tuple(enum_type)
+        self._codes = {member: code for code, member in enumerate(self.members)}
+
+    def encode(self, value: EnumT, out: bytearray) -> None:
+        """Append the index of ``value``."""
+        out += _U16.pack(self._codes[value])
+
+    def decode(self, buffer: memoryview, offset: int) -> tuple[EnumT, int]:
+        """Read a member."""
+        code: int = _U16.unpack_from(buffer, offset)[0]
+        member: EnumT = self.members[code]
+        return member, offset + _U16.size
+
+
+_NAMES = StrFieldCodec()
+
+
+def _required[T](codec: FieldCodec[T] | None, field: str) -> FieldCodec[T]:
+    if codec is None:
+        raise MissingFieldCodecError(field)
+    return codec
+
+
+class WireCodec:
+    """Encode and decode batches of search results.
+
+    A field codec left to None can only encode objects where its field is
+    absent; empty ``info`` mappings count as absent.
+
+    Attributes:
+        branch_key: Codec of branch keys, used by lines and policies.
+        role: Codec of the winners of terminal events.
+        termination: Codec of the termination reasons of terminal events.
+        state: Codec of the next states of transitions.
+        modifications: Codec of the state modifications of transitions.
+        info: Codec of the ``info`` mappings of transitions.
+
+    """
+
+    def __init__(  # noqa: PLR0913  # pylint: disable=too-many-arguments
+        self,
+        branch_key: FieldCodec[BranchKey] | None = None,
+        *,
+        role: FieldCodec[Role] | None = None,
+        termination: FieldCodec[Enum] | None = None,
+        state: FieldCodec[Any] | None = None,
+        modifications: FieldCodec[Any] | None = None,
+        info: FieldCodec[Any] | None = None,
+    ) -> None:
+        """Configure the field codecs."""
+        self.branch_key = branch_key
+        self.role = role
+        self.termination = termination
+        self.state = state
+        self.modifications = modifications
+        self.info = info
+
+    def encode(self, obj: WireObject) -> bytes:
+        """Encode a single object as a batch of one."""
+        return self.encode_many([obj])
+
+    def decode(self, buffer: Buffer) -> WireObject:
+        """Decode a batch of one object.
+
+        Raises:
+            WireFormatError: If the buffer is not a valid batch of one object.
+
+        """
+        objs = self.decode_many(buffer)
+        if len(objs) != 1:
+            raise WireFormatError
+        return objs[0]
+
+    def encode_many(self, objs: Iterable[WireObject]) -> bytes:
+        """Encode ``objs`` into one buffer.
+
+        Raises:
+            UnsupportedWireObjectError: If an object is of another type.
+            MissingFieldCodecError: If an object has a field without codec.
+
+        """
+        out = bytearray(_HEADER.size)
+        count = 0
+        for obj in objs:
+            self._write_object(obj, out)
+            count += 1
+        _HEADER.pack_into(out, 0, _MAGIC, WIRE_FORMAT_VERSION, count)
+        return bytes(out)
+
+    def decode_many(self, buffer: Buffer) -> list[WireObject]:
+        """Decode every object of a buffer written by :meth:`encode_many`.
+
+        Raises:
+            WireFormatError: If the buffer has another magic or version, is
+                truncated or corrupt, or has bytes after its last object.
+
+        """
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise WireFormatError
+        magic, version, count = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC:
+            raise WireFormatError
+        if version != WIRE_FORMAT_VERSION:
+            raise UnsupportedWireVersionError(version)
+        offset = _HEADER.size
+        objs: list[WireObject] = []
+        try:
+            for _ in range(count):
+                obj, offset = self._read_object(view, offset)
+                objs.append(obj)
+        except (struct.error, IndexError, UnicodeDecodeError) as error:
+            raise WireFormatError from error
+        if offset != len(view):
+            raise WireFormatError
+        return objs
+
+    def _write_object(self, obj: WireObject, out: bytearray) -> None:
+        if not isinstance(obj, _WIRE_TYPES):
+            raise UnsupportedWireObjectError(obj)
+        if isinstance(obj, Value):
+            out += _U8.pack(_Tag.VALUE)
+            self._write_value(obj, out)
+        elif isinstance(obj, OverEvent):
+            out += _U8.pack(_Tag.OVER_EVENT)
+            self._write_over_event(obj, out)
+        elif isinstance(obj, Recommendation):
+            out += _U8.pack(_Tag.RECOMMENDATION)
+            self._write_recommendation(obj, out)
+        else:
+            out += _U8.pack(_Tag.TRANSITION)
+            self._write_transition(obj, out)
+
+    def _read_object(self, view: memoryview, offset: int) -> tuple[WireObject, int]:
+        tag = view[offset]
+        offset += 1
+        if tag == _Tag.VALUE:
+            return self._read_value(view, offset)
+        if tag == _Tag.OVER_EVENT:
+            return self._read_over_event(view, offset)
+        if tag == _Tag.RECOMMENDATION:
+            return self._read_recommendation(view, offset)
+        if tag == _Tag.TRANSITION:
+            return self._read_transition(view, offset)
+        raise UnknownObjectTagError(tag)
+
+    def _write_over_event(self, event: OverEvent[Role], out: bytearray) -> None:
+        flags = (event.termination is not None) | (event.winner is not None) << 1
+        out += _U8.pack(_OUTCOME_CODES[event.outcome])
+        out += _U8.pack(flags)
+        if event.termination is not None:
+            _required(self.termination, "termination").encode(event.termination, out)
+        if event.winner is not None:
+            _required(self.role, "role").encode(event.winner, out)
+
+    def _read_over_event(
+        self, view: memoryview, offset: int
+    ) -> tuple[OverEvent[Role], int]:
+        outcome = _OUTCOMES[view[offset]]
+        flags = view[offset + 1]
+        offset += 2
+        # Only wins carry a winner; intern_over_event would merely assert it.
+        if flags > _OVER_EVENT_FLAGS or (flags & 2 and outcome is not Outcome.WIN):
+            raise WireFormatError
+        termination: Enum | None = None
+        winner: Role | None = None
+        if flags & 1:
+            termination, offset = _required(self.termination, "termination").decode(
+                view, offset
+            )
+        if flags & 2:
+            winner, offset = _required(self.role, "role").decode(view, offset)
+        return intern_over_event(outcome, termination, winner), offset
+
+    def _write_keys(self, keys: Sequence[BranchKey], out: bytearray) -> None:
+        codec = _required(self.branch_key, "branch_key")
+        out += _U32.pack(len(keys))
+        for key in keys:
+            codec.encode(key, out)
+
+    def _read_keys(self, view: memoryview, offset: int) -> tuple[list[BranchKey], int]:
+        codec = _required(self.branch_key, "branch_key")
+        (count,) = _U32.unpack_from(view, offset)
+        offset += _U32.size
+        keys: list[BranchKey] = []
+        for _ in range(count):
+            key, offset = codec.decode(view, offset)
+            keys.append(key)
+        return keys, offset
+
+    def _write_value(self, value: Value, out: bytearray) -> None:
+        flags = (value.over_event is not None) | (value.line is not None) << 1
+        out += _VALUE.pack(value.score, _CERTAINTY_CODES[value.certainty], flags)
+        if value.over_event is not None:
+            self._write_over_event(value.over_event, out)
+        if value.line is not None:
+            self._write_keys(value.line, out)
+
+    def _read_value(self, view: memoryview, offset: int) -> tuple[Value, int]:
+        score: float
+        certainty: int
+        flags: int
+        score, certainty, flags = _VALUE.unpack_from(view, offset)
+        offset += _VALUE.size
+        over_event: OverEvent[Role] | None = None
+        line: list[BranchKey] | None = None
+        if flags & 1:
+            over_event, offset = self._read_over_event(view, offset)
+        if flags & 2:
+            line, offset = self._read_keys(view, offset)
+        return (
+            Value(
+                score=score,
+                certainty=_CERTAINTIES[certainty],
+                over_event=over_event,
+                line=line,
+            ),
+            offset,
+        )
+
+    def _write_recommendation(
+        self, recommendation: Recommendation, out: bytearray
+    ) -> None:
+        evaluation = recommendation.evaluation
+        policy = recommendation.policy
+        branch_evals = recommendation.branch_evals
+        flags = (
+            (evaluation is not None)
+            | (policy is not None) << 1
+            | (branch_evals is not None) << 2
+        )
+        _NAMES.encode(recommendation.recommended_name, out)
+        out += _U8.pack(flags)
+        if evaluation is not None:
+            self._write_value(evaluation, out)
+        if policy is not None:
+            self._write_keys(list(policy.probs), out)
+            for prob in policy.probs.values():
+                out += _F64.pack(prob)
+        if branch_evals is not None:
+            out += _U32.pack(len(branch_evals))
+            for name, value in branch_evals.items():
+                _NAMES.encode(name, out)
+                self._write_value(value, out)
+
+    def _read_recommendation(
+        self, view: memoryview, offset: int
+    ) -> tuple[Recommendation, int]:
+        name, offset = _NAMES.decode(view, offset)
+        flags = view[offset]
+        offset += 1
+        evaluation: Value | None = None
+        policy: BranchPolicy | None = None
+        branch_evals: dict[BranchName, Value] | None = None
+        if flags & 1:
+            evaluation, offset = self._read_value(view, offset)
+        if flags & 2:
+            keys, offset = self._read_keys(view, offset)
+            probs = struct.unpack_from(f"<{len(keys)}d", view, offset)
+            offset += _F64.size * len(keys)
+            policy = BranchPolicy(probs=dict(zip(keys, probs, strict=True)))
+        if flags & 4:
+            (count,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            branch_evals = {}
+            for _ in range(count):
+                branch_name, offset = _NAMES.decode(view, offset)
+                branch_evals[branch_name], offset = self._read_value(view, offset)
+        return (
+            Recommendation(
+                recommended_name=name,
+                evaluation=evaluation,
+                policy=policy,
+                branch_evals=branch_evals,
+            ),
+            offset,
+        )
+
+    def _write_transition(self, transition: Transition[Any], out: bytearray) -> None:
+        flags = (
+            transition.is_over
+            | (transition.modifications is not None) << 1
+            | (transition.over_event is not None) << 2
+            | bool(transition.info) << 3
+        )
+        out += _U8.pack(flags)
+        _required(self.state, "state").encode(transition.next_state, out)
+        if transition.modifications is not None:
+            _required(self.modifications, "modifications").encode(
+                transition.modifications, out
+            )
+        if transition.over_event is not None:
+            self._write_over_event(transition.over_event, out)
+        if transition.info:
+            _required(self.info, "info").encode(transition.info, out)
+
+    def _read_transition(
+        self, view: memoryview, offset: int
+    ) -> tuple[Transition[Any], int]:
+        flags = view[offset]
+        offset += 1
+        next_state, offset = _required(self.state, "state").decode(view, offset)
+        modifications: object | None = None
+        over_event: OverEvent[Role] | None = None
+        if flags & 2:
+            modifications, offset = _required(
+                self.modifications, "modifications"
+            ).decode(view, offset)
+        if flags & 4:
+            over_event, offset = self._read_over_event(view, offset)
+        if flags & 8:
+            info, offset = _required(self.info, "info").decode(view, offset)
+            transition = Transition(
+                next_state=next_state,
+                modifications=modifications,
+                is_over=bool(flags & 1),
+                over_event=over_event,
+                info=info,
+            )
+        else:
+            transition = Transition(
+                next_state=next_state,
+                modifications=modifications,
+                is_over=bool(flags & 1),
+                over_event=over_event,
+            )
+        return transition, offset
@@ -0,0 +1,221 @@
+"""Tests for the iterative-deepening alpha-beta selector."""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Self
+
+import pytest
+
+from valanga.alpha_beta import AlphaBetaSelector
+from valanga.evaluations import Certainty, Value
+from valanga.game import Color
+from valanga.policy import NoBranchToRecommendError
+
+
+@dataclass
+class NimState:
+    """Mutable Nim pile: players take 1 to 3 stones, taking the last one wins."""
+
+    stones: int
+    turn: Color
+
+    @property
+    def tag(self) -> tuple[int, Color]:
+        """Return the tag of the state."""
+        return (self.stones, self.turn)
+
+    def is_game_over(self) -> bool:
+        """Return whether no stone is left."""
+        return self.stones == 0
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return f"{self.stones}:{self.turn.name}"
+
+
+class NimActions:
+    """Eager branch generator over the legal takes."""
+
+    sort_branch_keys: bool = False
+
+    def __init__(self, actions: Sequence[int]) -> None:
+        """Store the legal takes."""
+        self._actions = list(actions)
+        self._iterator = iter(self._actions)
+
+    @property
+    def all_generated_keys(self) -> Sequence[int] | None:
+        """Return all the takes."""
+        return self._actions
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the takes."""
+        return iter(self._actions)
+
+    def __next__(self) -> int:
+        """Return the next take."""
+        return next(self._iterator)
+
+    def more_than_one(self) -> bool:
+        """Return whether several takes are available."""
+        return len(self._actions) > 1
+
+    def get_all(self) -> Sequence[int]:
+        """Return all the takes."""
+        return self._actions
+
+    def copy_with_reset(self) -> Self:
+        """Return a fresh copy of the generator."""
+        return type(self)(self._actions)
+
+
+class ReversibleNim:
+    """Push/pop dynamics mutating one Nim state in place."""
+
+    def __init__(self, state: NimState) -> None:
+        """Copy the root state once."""
+        self._state = NimState(stones=state.stones, turn=state.turn)
+        self.pushes = 0
+
+    @property
+    def state(self) -> NimState:
+        """Return the current state."""
+        return self._state
+
+    def legal_actions(self) -> NimActions:
+        """Return the legal takes."""
+        return NimActions(range(1, min(3, self._state.stones) + 1))
+
+    def push(self, action: int) -> int:
+        """Take ``action`` stones."""
+        self.pushes += 1
+        self._state.stones -= action
+        self._state.turn = Color(not self._state.turn)
+        return action
+
+    def pop(self, undo: int) -> None:
+        """Put the stones back."""
+        self._state.stones += undo
+        self._state.turn = Color(not self._state.turn)
+
+    def action_name(self, action: int) -> str:
+        """Return the name of a take."""
+        return f"take{action}"
+
+    def action_from_name(self, name: str) -> int:
+        """Parse the name of a take."""
+        return int(name.removeprefix("take"))
+
+
+def evaluate(state: NimState) -> Value:
+    """The player to act on an empty pile has lost."""
+    if state.is_game_over():
+        score = -1.0 if state.turn is Color.WHITE else 1.0
+        return Value(score=score, certainty=Certainty.TERMINAL)
+    return Value(score=0.0, certainty=Certainty.ESTIMATE)
+
+
+def test_selector_finds_the_winning_take() -> None:
+    """Leaving a multiple of four stones is the winning strategy."""
+    selector = AlphaBetaSelector(
+        dynamics_factory=ReversibleNim, evaluator=evaluate, max_depth=10
+    )
+
+    recommendation = selector.recommend(NimState(10, Color.WHITE), seed=0)
+
+    assert recommendation.recommended_name == "take2"
+    assert recommendation.evaluation is not None
+    assert recommendation.evaluation.score == 1.0
+    assert recommendation.evaluation.certainty is Certainty.FORCED
+    line = recommendation.evaluation.line
+    assert line is not None
+    assert line[0] == 2
+    assert sum(line) == 10
+
+
+def test_scores_are_reported_from_white_point_of_view() -> None:
+    """A winning black root should yield a negative evaluation."""
+    selector = AlphaBetaSelector(
+        dynamics_factory=ReversibleNim,
+        evaluator=evaluate,
+        max_depth=8,
+        exact_root_evals=True,
+    )
+
+    recommendation = selector.recommend(NimState(7, Color.BLACK), seed=3)
+
+    assert recommendation.recommended_name == "take3"
+    assert recommendation.branch_evals is not None
+    assert {
+        name: value.score for name, value in recommendation.branch_evals.items()
+    } == {
+        "take1": 1.0,
+        "take2": 1.0,
+        "take3": -1.0,
+    }
+
+
+def test_fail_low_branches_are_not_reported_as_forced() -> None:
+    """Pruned root branches only have bounds, even behind a terminal refutation."""
+    selector = AlphaBetaSelector(
+        dynamics_factory=ReversibleNim, evaluator=evaluate, max_depth=10
+    )
+
+    recommendation = selector.recommend(NimState(10, Color.WHITE), seed=0)
+
+    assert recommendation.branch_evals is not None
+    for name, value in recommendation.branch_evals.items():
+        if name == "take2":
+            assert value.certainty is Certainty.FORCED
+        else:
+            assert value.certainty is Certainty.ESTIMATE
+            assert value.line is None
+            assert value.over_event is None
+
+
+def test_search_restores_the_root_and_reports_progress() -> None:
+    """Push and pop should be balanced and progress should reach 100%."""
+    dynamics: list[ReversibleNim] = []
+
+    def factory(state: NimState) -> ReversibleNim:
+        dynamics.append(ReversibleNim(state))
+        return dynamics[-1]
+
+    progress: list[int] = []
+    selector = AlphaBetaSelector(
+        dynamics_factory=factory, evaluator=evaluate, max_depth=4
+    )
+
+    selector.recommend(
+        NimState(9, Color.WHITE), seed=1, notify_progress=progress.append
+    )
+
+    assert dynamics[0].state == NimState(9, Color.WHITE)
+    assert dynamics[0].pushes > 0
+    assert progress == [25, 50, 75, 100]
+
+
+def test_terminal_root_is_rejected() -> None:
+    """A finished game has nothing to recommend."""
+    selector = AlphaBetaSelector(dynamics_factory=ReversibleNim, evaluator=evaluate)
+
+    with pytest.raises(NoBranchToRecommendError):
+        selector.recommend(NimState(0, Color.WHITE), seed=0)
+
+
+def test_stepped_session_matches_recommend() -> None:
+    """A session paused every few nodes should end with the same result."""
+    selector = AlphaBetaSelector(
+        dynamics_factory=ReversibleNim, evaluator=evaluate, max_depth=6
+    )
+    root = NimState(10, Color.WHITE)
+
+    session = selector.start(root, seed=2)
+    assert session.best() is None
+    steps = 1
+    while not session.step(7):
+        steps += 1
+
+    assert steps > 1
+    assert session.best() == selector.recommend(root, seed=2)
+    assert session.step(7)
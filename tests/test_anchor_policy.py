@@ -0,0 +1,125 @@
+"""Tests for the checkpoint anchor placement policies."""
+
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from valanga.anchor_policy import AdaptiveAnchorPolicy, FixedIntervalAnchorPolicy
+from valanga.checkpoint_store import CheckpointStore, RecordKind
+
+
+@dataclass(frozen=True)
+class CounterState:
+    """Toy state holding a counter."""
+
+    value: int
+
+
+class SlowDeltaCodec:
+    """Codec whose delta replay takes a known amount of time."""
+
+    def __init__(self, delta_seconds: float, anchor_padding: int = 0) -> None:
+        """Configure the replay cost and the anchor payload size."""
+        self.delta_seconds = delta_seconds
+        self.anchor_padding = anchor_padding
+
+    def dump_anchor_ref(self, state: CounterState) -> tuple[int, bytes]:
+        """Store the counter, padded to make anchors larger than deltas."""
+        return (state.value, b"\0" * self.anchor_padding)
+
+    def load_anchor_ref(self, payload: tuple[int, bytes]) -> CounterState:
+        """Restore the counter."""
+        return CounterState(payload[0])
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: CounterState,
+        child_state: CounterState,
+        branch_from_parent: object | None = None,
+    ) -> int:
+        """Store the increment."""
+        del branch_from_parent
+        return child_state.value - parent_state.value
+
+    def load_child_from_delta(
+        self, *, parent_state: CounterState, delta_ref: int
+    ) -> CounterState:
+        """Apply the increment, slowly."""
+        time.sleep(self.delta_seconds)
+        return CounterState(parent_state.value + delta_ref)
+
+
+def record_chain(
+    store: CheckpointStore[CounterState, tuple[int, bytes], int], length: int
+) -> list[RecordKind]:
+    """Record a root anchor and a chain of children, returning their kinds."""
+    store.append_anchor(0, CounterState(0))
+    kinds = []
+    for node_id in range(1, length + 1):
+        record = store.append_child(
+            node_id,
+            node_id - 1,
+            parent_state=CounterState(node_id - 1),
+            child_state=CounterState(node_id),
+        )
+        kinds.append(record.kind)
+    return kinds
+
+
+def test_fixed_interval_policy_anchors_periodically(tmp_path: Path) -> None:
+    """A fixed interval should bound every chain to that many deltas."""
+    codec = SlowDeltaCodec(delta_seconds=0.0)
+    store = CheckpointStore(
+        tmp_path, codec, anchor_policy=FixedIntervalAnchorPolicy(interval=3)
+    )
+
+    with store:
+        kinds = record_chain(store, 8)
+
+        assert kinds.count(RecordKind.ANCHOR) == 2
+        assert max(store.record(node).chain_depth for node in store.node_ids()) == 3
+        assert store.load(8) == CounterState(8)
+
+
+def test_adaptive_policy_bounds_restore_latency(tmp_path: Path) -> None:
+    """Slow deltas should trigger anchors before the latency bound is hit."""
+    codec = SlowDeltaCodec(delta_seconds=0.002, anchor_padding=1024)
+    policy = AdaptiveAnchorPolicy(
+        codec=codec, max_restore_seconds=0.011, sample_every=1, smoothing=0.5
+    )
+
+    with CheckpointStore(tmp_path, codec, anchor_policy=policy) as store:
+        kinds = record_chain(store, 20)
+
+        assert policy.delta_load_seconds is not None
+        assert policy.delta_load_seconds >= 0.002
+        assert RecordKind.ANCHOR in kinds
+        assert RecordKind.DELTA in kinds
+        deepest = max(store.record(node).chain_depth for node in store.node_ids())
+        assert policy.predicted_restore_seconds(deepest) <= 0.011 * 1.5
+        assert store.load(20) == CounterState(20)
+
+
+def test_adaptive_policy_prefers_deltas_when_replay_is_cheap(tmp_path: Path) -> None:
+    """Fast, small deltas should never need an anchor."""
+    codec = SlowDeltaCodec(delta_seconds=0.0, anchor_padding=1024)
+    policy = AdaptiveAnchorPolicy(codec=codec, max_restore_seconds=1.0)
+
+    with CheckpointStore(tmp_path, codec, anchor_policy=policy) as store:
+        kinds = record_chain(store, 50)
+
+    assert set(kinds) == {RecordKind.DELTA}
+
+
+def test_adaptive_policy_anchors_when_deltas_are_not_smaller(tmp_path: Path) -> None:
+    """Deltas as large as anchors bring no storage benefit."""
+    codec = SlowDeltaCodec(delta_seconds=0.0)
+    policy = AdaptiveAnchorPolicy(
+        codec=codec, max_restore_seconds=1.0, max_delta_size_ratio=0.0
+    )
+
+    with CheckpointStore(tmp_path, codec, anchor_policy=policy) as store:
+        kinds = record_chain(store, 5)
+
+    assert set(kinds) == {RecordKind.ANCHOR}
@@ -0,0 +1,150 @@
+"""Tests for the asyncio branch selector adapters."""
+
+import asyncio
+import math
+import threading
+from dataclasses import dataclass
+
+import pytest
+
+from valanga.async_policy import (
+    NoRecommendationYetError,
+    SearchBudget,
+    SteppedAsyncSelector,
+    ThreadedAsyncSelector,
+)
+from valanga.policy import Recommendation
+
+
+@dataclass(frozen=True)
+class TagState:
+    """Minimal state for selectors that ignore the position."""
+
+    tag: int
+
+    def is_game_over(self) -> bool:
+        """Return whether the state is terminal."""
+        return False
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return str(self.tag)
+
+
+class CountingSession:
+    """Session finding a better recommendation every 10 nodes."""
+
+    def __init__(self, total: int) -> None:
+        """Search ``total`` nodes in all."""
+        self.total = total
+        self.nodes = 0
+
+    def step(self, max_nodes: float = math.inf) -> bool:
+        """Advance the node counter."""
+        self.nodes = int(min(self.total, self.nodes + max_nodes))
+        return self.nodes >= self.total
+
+    def best(self) -> Recommendation | None:
+        """Name the recommendation after the completed tens of nodes."""
+        if self.nodes < 10:
+            return None
+        return Recommendation(recommended_name=f"best{self.nodes // 10}")
+
+
+class CountingSelector:
+    """Steppable selector over counting sessions."""
+
+    def __init__(self, total: int) -> None:
+        """Search ``total`` nodes per session."""
+        self.total = total
+
+    def start(
+        self, state: TagState, seed: int, notify_progress: object = None
+    ) -> CountingSession:
+        """Return a fresh session."""
+        del state, seed, notify_progress
+        return CountingSession(self.total)
+
+
+def test_searches_share_the_event_loop() -> None:
+    """Stepped searches should interleave and honour node budgets."""
+
+    async def main() -> list[Recommendation]:
+        selector = SteppedAsyncSelector(CountingSelector(total=100), chunk_nodes=5)
+        return await asyncio.gather(
+            selector.recommend_async(TagState(0), seed=0),
+            selector.recommend_async(
+                TagState(1), seed=0, budget=SearchBudget(max_nodes=42)
+            ),
+        )
+
+    full, budgeted = asyncio.run(main())
+
+    assert full.recommended_name == "best10"
+    assert budgeted.recommended_name == "best4"
+
+
+def test_cancel_returns_the_best_so_far() -> None:
+    """Cooperative cancellation should resolve to the best recommendation."""
+
+    async def main() -> tuple[Recommendation | None, Recommendation]:
+        selector = SteppedAsyncSelector(CountingSelector(total=10**9), chunk_nodes=10)
+        search = selector.start(TagState(0), seed=0)
+        while search.nodes < 30:
+            await asyncio.sleep(0)
+        snapshot = search.best_so_far()
+        search.cancel()
+        return snapshot, await search.result()
+
+    snapshot, final = asyncio.run(main())
+
+    assert snapshot is not None
+    assert final.recommended_name >= snapshot.recommended_name
+
+
+def test_expired_deadline_without_result_raises() -> None:
+    """A search stopped before any recommendation has nothing to return."""
+
+    async def main() -> Recommendation:
+        selector = SteppedAsyncSelector(CountingSelector(total=100), chunk_nodes=1)
+        return await selector.recommend_async(
+            TagState(0), seed=0, budget=SearchBudget(deadline=0.0)
+        )
+
+    with pytest.raises(NoRecommendationYetError):
+        asyncio.run(main())
+
+
+class BlockingSelector:
+    """Plain selector blocking until released."""
+
+    def __init__(self) -> None:
+        """Start blocked."""
+        self.release = threading.Event()
+
+    def recommend(
+        self, state: TagState, seed: int, notify_progress: object = None
+    ) -> Recommendation:
+        """Wait for the release, then recommend."""
+        del state, seed, notify_progress
+        self.release.wait(timeout=5)
+        return Recommendation(recommended_name="threaded")
+
+
+def test_threaded_fallback_runs_off_the_loop() -> None:
+    """Plain selectors should run in a thread and honour the deadline."""
+    blocking = BlockingSelector()
+
+    async def main() -> None:
+        selector = ThreadedAsyncSelector(blocking)
+        with pytest.raises(NoRecommendationYetError):
+            await selector.recommend_async(
+                TagState(0), seed=0, budget=SearchBudget.from_timeout(0.01)
+            )
+        search = selector.start(TagState(0), seed=0)
+        await asyncio.sleep(0.01)
+        assert not search.done()
+        blocking.release.set()
+        assert (await search.result()).recommended_name == "threaded"
+
+    asyncio.run(main())
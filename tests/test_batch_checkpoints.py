@@ -0,0 +1,72 @@
+"""Tests for the batched checkpoint adapter."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import cast
+
+import pytest
+
+from valanga.batch_checkpoints import (
+    InvalidMaxWorkersError,
+    ParallelStateCheckpointCodec,
+)
+
+
+@dataclass(frozen=True)
+class PointState:
+    """Toy state with a structured checkpoint payload."""
+
+    x: int
+    y: int
+
+
+class PointCodec:
+    """Picklable one-state-at-a-time codec."""
+
+    def dump_state_ref(self, state: PointState) -> object:
+        """Store the coordinates as a tuple."""
+        return (state.x, state.y)
+
+    def load_state_ref(self, payload: object) -> PointState:
+        """Rebuild the state from its tuple."""
+        x, y = cast(tuple[int, int], payload)
+        return PointState(x=x, y=y)
+
+
+STATES = [PointState(x=index, y=-index) for index in range(50)]
+
+
+def test_small_batches_stay_in_process() -> None:
+    """Batches below the threshold should not need an executor."""
+    codec = ParallelStateCheckpointCodec(PointCodec(), min_parallel_batch=100)
+
+    payloads = codec.dump_state_refs(STATES)
+
+    assert payloads == [(state.x, state.y) for state in STATES]
+    assert codec.load_state_refs(payloads) == STATES
+
+
+def test_chunks_preserve_order_on_an_executor() -> None:
+    """Chunked results should be reassembled in input order."""
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        codec = ParallelStateCheckpointCodec(
+            PointCodec(), executor=executor, chunksize=7, min_parallel_batch=0
+        )
+        assert codec.load_state_refs(codec.dump_state_refs(STATES)) == STATES
+
+
+def test_default_process_pool_round_trips() -> None:
+    """The default process pool should convert batches across processes."""
+    codec = ParallelStateCheckpointCodec(
+        PointCodec(), max_workers=2, min_parallel_batch=0
+    )
+
+    assert codec.load_state_refs(codec.dump_state_refs(STATES)) == STATES
+    assert codec.load_state_ref(codec.dump_state_ref(STATES[3])) == STATES[3]
+
+
+@pytest.mark.parametrize("max_workers", [0, -1])
+def test_codec_rejects_missing_workers(max_workers: int) -> None:
+    """Fewer than one worker should be refused up front."""
+    with pytest.raises(InvalidMaxWorkersError, match="at least 1"):
+        ParallelStateCheckpointCodec(codec=PointCodec(), max_workers=max_workers)
@@ -0,0 +1,108 @@
+"""Tests for valanga.batched_representation_factory."""
+
+from collections import Counter
+from dataclasses import dataclass
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from valanga.batched_representation_factory import (  # noqa: E402
+    BatchedRepresentationFactory,
+    EmptyBatchError,
+)
+from valanga.representation_factory import RepresentationFactory  # noqa: E402
+
+
+@dataclass(frozen=True)
+class CounterState:
+    """Toy state holding a single integer."""
+
+    tag: int
+
+    def is_game_over(self) -> bool:
+        """Return whether the state is terminal."""
+        return False
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return str(self.tag)
+
+
+@dataclass(frozen=True)
+class CounterRepresentation:
+    """Representation storing a one-hot-like vector of the counter."""
+
+    total: int
+
+    def get_evaluator_input(self, state: CounterState) -> list[float]:
+        """Return the evaluator input for the state."""
+        return [float(self.total), float(state.tag)]
+
+
+def make_factory(
+    calls: Counter[str],
+) -> RepresentationFactory[CounterState, list[float], int]:
+    """Return a factory that records which path each item took."""
+
+    def create_from_state(state: CounterState) -> CounterRepresentation:
+        calls["full"] += 1
+        return CounterRepresentation(total=state.tag)
+
+    def create_from_state_and_modifications(
+        state: CounterState,
+        state_modifications: int,
+        previous_state_representation: CounterRepresentation,
+    ) -> CounterRepresentation:
+        del state
+        calls["incremental"] += 1
+        return CounterRepresentation(
+            total=previous_state_representation.total + state_modifications
+        )
+
+    return RepresentationFactory(
+        create_from_state=create_from_state,
+        create_from_state_and_modifications=create_from_state_and_modifications,
+    )
+
+
+def test_batch_stacks_inputs_and_picks_path_per_item() -> None:
+    """Each item should use the incremental path only when it can."""
+    calls: Counter[str] = Counter()
+    batched = BatchedRepresentationFactory(factory=make_factory(calls))
+    parent = CounterRepresentation(total=10)
+
+    batch = batched.create_from_transitions(
+        [
+            (CounterState(tag=1), None, None),
+            (CounterState(tag=2), parent, 3),
+            (CounterState(tag=3), parent, None),
+        ]
+    )
+
+    assert len(batch) == 3
+    assert calls == Counter(full=2, incremental=1)
+    np.testing.assert_array_equal(
+        batch.evaluator_input, [[1.0, 1.0], [13.0, 2.0], [3.0, 3.0]]
+    )
+    assert batch.representations[1] == CounterRepresentation(total=13)
+
+
+def test_batch_uses_requested_dtype() -> None:
+    """An explicit dtype should override the inferred one."""
+    batched = BatchedRepresentationFactory(
+        factory=make_factory(Counter()), dtype=np.float32
+    )
+
+    batch = batched.create_from_transitions([(CounterState(tag=4), None, None)])
+
+    assert batch.evaluator_input.dtype == np.float32
+    assert batch.evaluator_input.shape == (1, 2)
+
+
+def test_empty_batch_is_rejected() -> None:
+    """An empty batch has no shape to infer."""
+    batched = BatchedRepresentationFactory(factory=make_factory(Counter()))
+
+    with pytest.raises(EmptyBatchError):
+        batched.create_from_transitions([])
@@ -0,0 +1,262 @@
+"""Tests for the file-backed anchor+delta checkpoint store."""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from valanga.checkpoint_store import (
+    COMPACTED_SUFFIX,
+    COMPACTION_MARKER_FILE_NAME,
+    INDEX_FILE_NAME,
+    PAYLOADS_FILE_NAME,
+    CheckpointStore,
+    RecordKind,
+    UnknownNodeError,
+)
+
+
+@dataclass(frozen=True)
+class WalkState:
+    """Toy state: a position on a line reached after some steps."""
+
+    position: int
+    steps: int
+
+
+class WalkCodec:
+    """Incremental codec storing whole states as anchors and moves as deltas."""
+
+    def __init__(self) -> None:
+        """Count the replayed deltas."""
+        self.replayed = 0
+
+    def dump_anchor_ref(self, state: WalkState) -> tuple[int, int]:
+        """Store the whole state."""
+        return (state.position, state.steps)
+
+    def load_anchor_ref(self, payload: tuple[int, int]) -> WalkState:
+        """Restore the whole state."""
+        return WalkState(*payload)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: WalkState,
+        child_state: WalkState,
+        branch_from_parent: object | None = None,
+    ) -> int:
+        """Store the move between parent and child."""
+        del branch_from_parent
+        return child_state.position - parent_state.position
+
+    def load_child_from_delta(
+        self, *, parent_state: WalkState, delta_ref: int
+    ) -> WalkState:
+        """Apply the move to the parent."""
+        self.replayed += 1
+        return WalkState(parent_state.position + delta_ref, parent_state.steps + 1)
+
+
+def record_line(
+    store: CheckpointStore[WalkState, tuple[int, int], int], moves: list[int]
+) -> list[WalkState]:
+    """Record a root anchor followed by one delta per move."""
+    states = [WalkState(0, 0)]
+    store.append_anchor(0, states[0])
+    for node_id, move in enumerate(moves, start=1):
+        parent = states[-1]
+        states.append(WalkState(parent.position + move, parent.steps + 1))
+        store.append_delta(
+            node_id, node_id - 1, parent_state=parent, child_state=states[-1]
+        )
+    return states
+
+
+def test_nodes_are_rebuilt_from_anchor_and_deltas(tmp_path: Path) -> None:
+    """Each node should be rebuilt by replaying its chain."""
+    codec = WalkCodec()
+    with CheckpointStore(tmp_path, codec) as store:
+        states = record_line(store, [1, -2, 5, 3])
+
+        assert [store.load(node_id) for node_id in range(5)] == states
+        assert store.record(4).chain_depth == 4
+        assert [record.node_id for record in store.chain(3)] == [0, 1, 2, 3]
+
+
+def test_store_reopens_from_disk(tmp_path: Path) -> None:
+    """A reopened store should see every flushed record."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        states = record_line(store, [2, 2])
+        store.append_anchor(3, WalkState(9, 9))
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened:
+        assert len(reopened) == 4
+        assert reopened.load(2) == states[2]
+        assert reopened.record(3).kind is RecordKind.ANCHOR
+        assert reopened.load(3) == WalkState(9, 9)
+
+
+def test_anchor_shortens_the_replayed_chain(tmp_path: Path) -> None:
+    """Re-anchoring a node should stop replays at that node."""
+    codec = WalkCodec()
+    with CheckpointStore(tmp_path, codec) as store:
+        states = record_line(store, [1, 1, 1])
+        store.append_anchor(2, states[2])
+
+        codec.replayed = 0
+        assert store.load(3) == states[3]
+        assert codec.replayed == 1
+
+
+def test_torn_trailing_records_are_ignored(tmp_path: Path) -> None:
+    """A partially written index record should be dropped on open."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        record_line(store, [1])
+    with (tmp_path / INDEX_FILE_NAME).open("ab") as index:
+        index.write(b"\x01\x02\x03")
+    with (tmp_path / PAYLOADS_FILE_NAME).open("ab") as payloads:
+        payloads.write(b"garbage")
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened:
+        assert len(reopened) == 2
+        assert reopened.load(1) == WalkState(1, 1)
+        reopened.append_delta(
+            2, 1, parent_state=WalkState(1, 1), child_state=WalkState(3, 2)
+        )
+        assert reopened.load(2) == WalkState(3, 2)
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened_again:
+        assert len(reopened_again) == 3
+        assert reopened_again.load(2) == WalkState(3, 2)
+
+
+def test_unknown_nodes_raise(tmp_path: Path) -> None:
+    """Missing nodes and parents should be reported explicitly."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        with pytest.raises(UnknownNodeError):
+            store.load(7)
+        with pytest.raises(UnknownNodeError):
+            store.append_delta(
+                1, 0, parent_state=WalkState(0, 0), child_state=WalkState(1, 1)
+            )
+
+
+def test_compaction_drops_dead_nodes_and_reanchors(tmp_path: Path) -> None:
+    """Compaction should keep live nodes only and bound their chains."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        states = record_line(store, [1, 2, 3, 4, 5, 6])
+        store.append_anchor(7, WalkState(40, 1))
+        size_before = store.size_bytes
+
+        stats = store.compact([3, 4, 5, 6, 7, 99], max_chain_depth=2)
+
+        assert stats.live_nodes == 5
+        assert stats.dropped_nodes == 3
+        assert stats.reanchored_nodes == 2
+        assert stats.bytes_after == store.size_bytes < size_before
+        assert sorted(store.node_ids()) == [3, 4, 5, 6, 7]
+        assert [store.record(node_id).chain_depth for node_id in (3, 4, 5, 6)] == [
+            0,
+            1,
+            2,
+            0,
+        ]
+        assert [store.load(node_id) for node_id in (3, 4, 5, 6)] == states[3:]
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened:
+        assert len(reopened) == 5
+        assert reopened.load(6) == states[6]
+        assert not (tmp_path / COMPACTION_MARKER_FILE_NAME).exists()
+
+
+class GatedWalkCodec(WalkCodec):
+    """Walk codec whose anchor dumps wait for a gate once it is armed."""
+
+    def __init__(self) -> None:
+        """Start with an open gate."""
+        super().__init__()
+        self.armed = False
+        self.dumping = threading.Event()
+        self.gate = threading.Event()
+
+    def dump_anchor_ref(self, state: WalkState) -> tuple[int, int]:
+        """Wait for the gate when armed."""
+        if self.armed:
+            self.dumping.set()
+            self.gate.wait()
+        return super().dump_anchor_ref(state)
+
+
+def test_background_compaction_keeps_serving_and_appending(tmp_path: Path) -> None:
+    """Reads and appends during a compaction should not block or get lost."""
+    codec = GatedWalkCodec()
+    with CheckpointStore(tmp_path, codec) as store:
+        states = record_line(store, [1, 1, 1])
+        codec.armed = True
+
+        future = store.compact_in_background([2, 3])
+        assert codec.dumping.wait(timeout=5)
+        assert store.load(3) == states[3]
+        store.append_delta(4, 3, parent_state=states[3], child_state=WalkState(9, 4))
+        codec.gate.set()
+        stats = future.result(timeout=5)
+
+        assert stats.reanchored_nodes == 1
+        assert sorted(store.node_ids()) == [2, 3, 4]
+        assert store.load(4) == WalkState(9, 4)
+        assert store.record(4).chain_depth == 2
+
+
+def test_interrupted_compaction_recovers_on_open(tmp_path: Path) -> None:
+    """Committed swaps should be finished and uncommitted ones dropped."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        record_line(store, [1, 1])
+    compacted_index = tmp_path / (INDEX_FILE_NAME + COMPACTED_SUFFIX)
+    compacted_index.write_bytes(b"partial")
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened:
+        assert len(reopened) == 3
+    assert not compacted_index.exists()
+
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        store.compact([0])
+    names = (PAYLOADS_FILE_NAME, INDEX_FILE_NAME)
+    compacted = {name: (tmp_path / name).read_bytes() for name in names}
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        record_line(store, [5])
+    for name in names:
+        (tmp_path / (name + COMPACTED_SUFFIX)).write_bytes(compacted[name])
+    (tmp_path / COMPACTION_MARKER_FILE_NAME).touch()
+
+    with CheckpointStore(tmp_path, WalkCodec()) as reopened:
+        assert sorted(reopened.node_ids()) == [0]
+
+
+def test_loads_racing_compactions_read_consistent_payloads(tmp_path: Path) -> None:
+    """Loads should never decode payloads at offsets a swap has moved."""
+    with CheckpointStore(tmp_path, WalkCodec()) as store:
+        states = record_line(store, [1] * 8)
+        stop = threading.Event()
+        errors: list[BaseException] = []
+
+        def compact_repeatedly() -> None:
+            try:
+                depth = 0
+                while not stop.is_set():
+                    store.compact(range(9), max_chain_depth=1 + depth % 3)
+                    depth += 1
+            except BaseException as error:
+                errors.append(error)
+
+        compactor = threading.Thread(target=compact_repeatedly)
+        compactor.start()
+        try:
+            for _ in range(2000):
+                assert store.load(8) == states[8]
+        finally:
+            stop.set()
+            compactor.join()
+
+        assert errors == []
@@ -0,0 +1,140 @@
+"""Tests for the background checkpoint writer."""
+
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from valanga.checkpoint_store import CheckpointStore, UnknownNodeError
+from valanga.checkpoint_writer import (
+    BackgroundCheckpointWriter,
+    CheckpointWriterClosedError,
+    CheckpointWriterError,
+    UnpairedSummaryOptionError,
+)
+from valanga.checkpoints import CheckpointStateSummary
+
+
+@dataclass(frozen=True)
+class CountState:
+    """Toy state holding a counter."""
+
+    value: int
+
+
+class CountCodec:
+    """Incremental codec storing the counter and its increments."""
+
+    def __init__(self, gate: threading.Event | None = None) -> None:
+        """Optionally block every anchor dump until ``gate`` is set."""
+        self.gate = gate
+
+    def dump_anchor_ref(self, state: CountState) -> int:
+        """Store the counter."""
+        if self.gate is not None:
+            self.gate.wait()
+        return state.value
+
+    def load_anchor_ref(self, payload: int) -> CountState:
+        """Restore the counter."""
+        return CountState(payload)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: CountState,
+        child_state: CountState,
+        branch_from_parent: object | None = None,
+    ) -> int:
+        """Store the increment."""
+        del branch_from_parent
+        return child_state.value - parent_state.value
+
+    def load_child_from_delta(
+        self, *, parent_state: CountState, delta_ref: int
+    ) -> CountState:
+        """Apply the increment."""
+        return CountState(parent_state.value + delta_ref)
+
+
+class CountSummaryCodec:
+    """Summarize states by their counter."""
+
+    def dump_state_summary(self, state: CountState) -> CheckpointStateSummary:
+        """Use the counter as tag."""
+        return CheckpointStateSummary(tag=state.value, is_terminal=state.value > 2)
+
+
+def test_submitted_states_are_recorded_and_summarized(tmp_path: Path) -> None:
+    """Flushing should wait for every job, including summaries."""
+    summaries: dict[int, CheckpointStateSummary] = {}
+    with CheckpointStore(tmp_path, CountCodec()) as store:
+        writer = BackgroundCheckpointWriter(
+            store,
+            summary_codec=CountSummaryCodec(),
+            summary_sink=summaries.__setitem__,
+            max_pending=2,
+        )
+        states = [CountState(value) for value in range(5)]
+        writer.submit_anchor(0, states[0])
+        for node_id in range(1, 5):
+            writer.submit_child(
+                node_id,
+                node_id - 1,
+                parent_state=states[node_id - 1],
+                child_state=states[node_id],
+            )
+        writer.flush()
+
+        assert writer.written == 5
+        assert [store.load(node_id) for node_id in range(5)] == states
+        assert summaries[4] == CheckpointStateSummary(tag=4, is_terminal=True)
+        writer.close()
+
+    with CheckpointStore(tmp_path, CountCodec()) as reopened:
+        assert reopened.load(4) == states[4]
+
+
+def test_full_queue_applies_backpressure(tmp_path: Path) -> None:
+    """Submitting to a full queue should block until the worker catches up."""
+    gate = threading.Event()
+    with CheckpointStore(tmp_path, CountCodec(gate)) as store:
+        writer = BackgroundCheckpointWriter(store, max_pending=1)
+        writer.submit_anchor(0, CountState(0))
+        writer.submit_anchor(1, CountState(1))
+        blocked = threading.Thread(target=writer.submit_anchor, args=(2, CountState(2)))
+        blocked.start()
+        blocked.join(timeout=0.1)
+
+        assert blocked.is_alive()
+        gate.set()
+        blocked.join()
+        writer.close()
+        assert len(store) == 3
+
+
+def test_worker_errors_surface_on_the_caller(tmp_path: Path) -> None:
+    """A failed job should be reported by the next barrier."""
+    with CheckpointStore(tmp_path, CountCodec()) as store:
+        writer = BackgroundCheckpointWriter(store)
+        writer.submit_child(1, 0, parent_state=CountState(0), child_state=CountState(1))
+
+        with pytest.raises(CheckpointWriterError) as excinfo:
+            writer.flush()
+        assert isinstance(excinfo.value.__cause__, UnknownNodeError)
+        with pytest.raises(CheckpointWriterError):
+            writer.submit_anchor(2, CountState(2))
+        with pytest.raises(CheckpointWriterError):
+            writer.close()
+        with pytest.raises(CheckpointWriterClosedError):
+            writer.submit_anchor(3, CountState(3))
+
+
+def test_summary_codec_and_sink_go_together(tmp_path: Path) -> None:
+    """A summary codec without a sink, or the reverse, should be refused."""
+    with CheckpointStore(tmp_path, CountCodec()) as store:
+        with pytest.raises(UnpairedSummaryOptionError):
+            BackgroundCheckpointWriter(store, summary_codec=CountSummaryCodec())
+        with pytest.raises(UnpairedSummaryOptionError):
+            BackgroundCheckpointWriter(store, summary_sink=print)
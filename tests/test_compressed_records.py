@@ -0,0 +1,100 @@
+"""Tests for the block-compressed record file format."""
+
+import pickle
+import struct
+from pathlib import Path
+
+import pytest
+
+from valanga.compressed_records import (
+    CompressedRecordReader,
+    CompressedRecordWriter,
+    Compression,
+    CorruptRecordFileError,
+    DictionaryMismatchError,
+    UnsupportedDictionaryError,
+    build_shared_dictionary,
+)
+
+RECORDS = [pickle.dumps(("move", index % 7, index % 3)) for index in range(500)]
+
+
+@pytest.mark.parametrize("compression", list(Compression))
+def test_records_are_read_back_by_index(
+    tmp_path: Path, compression: Compression
+) -> None:
+    """Every record should be readable at random and in order."""
+    path = tmp_path / "records.bin"
+    with CompressedRecordWriter(
+        path, compression=compression, block_size=512
+    ) as writer:
+        writer.extend(RECORDS)
+
+    with CompressedRecordReader(path) as reader:
+        assert len(reader) == len(RECORDS)
+        assert len(reader.blocks) > 1
+        assert reader[321] == RECORDS[321]
+        assert reader[-1] == RECORDS[-1]
+        assert reader[0] == RECORDS[0]
+        assert list(reader) == RECORDS
+        with pytest.raises(IndexError):
+            reader[len(RECORDS)]
+
+
+def test_blocks_compress_repetitive_records(tmp_path: Path) -> None:
+    """Block compression should shrink small repetitive payloads."""
+    path = tmp_path / "records.bin"
+    with CompressedRecordWriter(path) as writer:
+        writer.extend(RECORDS)
+
+    assert path.stat().st_size < sum(map(len, RECORDS)) // 5
+
+
+def test_shared_dictionary_must_match(tmp_path: Path) -> None:
+    """Files written with a dictionary need the same dictionary to be read."""
+    dictionary = build_shared_dictionary(RECORDS[:100])
+    path = tmp_path / "records.bin"
+    with CompressedRecordWriter(path, dictionary=dictionary, block_size=64) as writer:
+        writer.extend(RECORDS)
+
+    with CompressedRecordReader(path, dictionary=dictionary) as reader:
+        assert list(reader) == RECORDS
+    with pytest.raises(DictionaryMismatchError):
+        CompressedRecordReader(path)
+    with pytest.raises(UnsupportedDictionaryError):
+        CompressedRecordWriter(
+            tmp_path / "lzma.bin", compression=Compression.LZMA, dictionary=dictionary
+        )
+
+
+def test_unclosed_file_is_recovered_by_scanning(tmp_path: Path) -> None:
+    """Flushed blocks should be readable without the trailing index."""
+    path = tmp_path / "records.bin"
+    writer = CompressedRecordWriter(path, block_size=256)
+    writer.extend(RECORDS[:100])
+    writer.flush()
+    with path.open("ab") as torn:
+        torn.write(b"\x01\x02")
+
+    with CompressedRecordReader(path) as reader:
+        assert list(reader) == RECORDS[:100]
+    writer.close()
+
+
+@pytest.mark.parametrize("field", [1, 2])
+def test_inconsistent_block_sizes_raise_corrupt_file_errors(
+    tmp_path: Path, field: int
+) -> None:
+    """A raw size or record count disagreeing with the payload should be rejected."""
+    path = tmp_path / "records.bin"
+    with CompressedRecordWriter(path, compression=Compression.NONE) as writer:
+        writer.extend(RECORDS[:10])
+    data = bytearray(path.read_bytes())
+    header_offset = struct.calcsize("<8sB8s") + field * 4
+    (value,) = struct.unpack_from("<I", data, header_offset)
+    struct.pack_into("<I", data, header_offset, value + 1)
+    path.write_bytes(bytes(data))
+
+    with CompressedRecordReader(path) as reader:
+        with pytest.raises(CorruptRecordFileError):
+            reader[0]
@@ -0,0 +1,175 @@
+"""Tests for the cross-thread evaluation batcher."""
+
+import threading
+from dataclasses import dataclass
+
+import pytest
+
+from valanga.eval_batching import (
+    BatcherClosedError,
+    EvaluationBatcher,
+    EvaluationCountMismatchError,
+    InvalidBatchSizeError,
+    MissingRepresentationError,
+)
+from valanga.evaluations import Certainty, Value
+
+
+@dataclass(frozen=True)
+class CountState:
+    """Toy state holding a counter."""
+
+    value: int
+
+    @property
+    def tag(self) -> int:
+        """Return the counter as tag."""
+        return self.value
+
+    def is_game_over(self) -> bool:
+        """Return whether the state is terminal."""
+        return False
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return str(self.value)
+
+
+class CountRepresentation:
+    """Representation whose evaluator input is the counter."""
+
+    def get_evaluator_input(self, state: CountState) -> int:
+        """Return the counter."""
+        return state.value
+
+
+@dataclass(frozen=True)
+class Item:
+    """Evaluation item over a counter state."""
+
+    state: CountState
+    state_representation: CountRepresentation | None = None
+
+    @classmethod
+    def of(cls, value: int) -> "Item":
+        """Return an item with a representation."""
+        return cls(CountState(value), CountRepresentation())
+
+
+class DoublingEvaluator:
+    """Vectorized evaluator scoring each counter twice its value."""
+
+    def __init__(self) -> None:
+        """Record the size of every batch."""
+        self.batch_sizes: list[int] = []
+
+    def __call__(self, inputs: object) -> list[Value]:
+        """Evaluate a sequence of counters."""
+        assert isinstance(inputs, list | tuple)
+        self.batch_sizes.append(len(inputs))
+        return [Value(score=2.0 * x, certainty=Certainty.ESTIMATE) for x in inputs]
+
+
+def test_full_batches_from_many_threads() -> None:
+    """Submissions from several threads should be evaluated in full batches."""
+    evaluator = DoublingEvaluator()
+    results: dict[int, float] = {}
+
+    with EvaluationBatcher(evaluator, max_batch_size=8, max_latency=10.0) as batcher:
+
+        def search(offset: int) -> None:
+            futures = [batcher.submit(Item.of(offset + i)) for i in range(4)]
+            for i, future in enumerate(futures):
+                results[offset + i] = future.result(timeout=5).score
+
+        threads = [threading.Thread(target=search, args=(10 * t,)) for t in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = batcher.stats()
+
+    assert results == {
+        10 * t + i: 2.0 * (10 * t + i) for t in range(4) for i in range(4)
+    }
+    assert evaluator.batch_sizes == [8, 8]
+    assert stats.full_flushes == 2
+    assert stats.batch_sizes == {8: 2}
+    assert sum(stats.queue_depths.values()) == 16
+    assert stats.mean_batch_size == 8.0
+
+
+def test_latency_deadline_flushes_partial_batches() -> None:
+    """A lone item should be evaluated once the latency deadline passes."""
+    evaluator = DoublingEvaluator()
+    with EvaluationBatcher(evaluator, max_batch_size=64, max_latency=0.01) as batcher:
+        value = batcher.evaluate(Item.of(3))
+        stats = batcher.stats()
+
+    assert value.score == 6.0
+    assert stats.deadline_flushes == 1
+    assert stats.batch_sizes == {1: 1}
+
+
+def test_close_flushes_pending_items_and_rejects_new_ones() -> None:
+    """Closing should evaluate what is pending and refuse later submissions."""
+    evaluator = DoublingEvaluator()
+    batcher = EvaluationBatcher(
+        evaluator, max_batch_size=64, max_latency=60.0, stack=tuple
+    )
+    futures = [batcher.submit(Item.of(i)) for i in range(2)]
+    batcher.close()
+
+    assert all(future.done() for future in futures)
+    assert [future.result().score for future in futures] == [0.0, 2.0]
+    assert evaluator.batch_sizes == [2]
+    with pytest.raises(BatcherClosedError):
+        batcher.submit(Item.of(0))
+
+
+def test_cancelled_futures_are_dropped_and_the_worker_survives() -> None:
+    """A cancelled submission should be skipped without stopping the worker."""
+    evaluator = DoublingEvaluator()
+    with EvaluationBatcher(evaluator, max_batch_size=2, max_latency=60.0) as batcher:
+        cancelled = batcher.submit(Item.of(1))
+        assert cancelled.cancel()
+        kept = batcher.submit(Item.of(2))
+        assert kept.result(timeout=5).score == 4.0
+        later = [batcher.submit(Item.of(i)) for i in (3, 4)]
+        assert [future.result(timeout=5).score for future in later] == [6.0, 8.0]
+        stats = batcher.stats()
+
+    assert cancelled.cancelled()
+    assert evaluator.batch_sizes == [1, 2]
+    assert stats.cancelled == 1
+    assert stats.items == 3
+
+
+def test_evaluator_errors_reach_the_futures() -> None:
+    """Evaluator failures should be set on the futures of their batch only."""
+
+    def short_evaluator(inputs: object) -> list[Value]:
+        del inputs
+        return []
+
+    with EvaluationBatcher(short_evaluator, max_latency=0.0) as batcher:
+        with pytest.raises(EvaluationCountMismatchError):
+            batcher.evaluate(Item.of(1))
+        batcher.evaluator = DoublingEvaluator()
+        assert batcher.evaluate(Item.of(2)).score == 4.0
+
+
+def test_items_need_a_representation() -> None:
+    """Items without a representation cannot be stacked."""
+    with (
+        EvaluationBatcher(DoublingEvaluator()) as batcher,
+        pytest.raises(MissingRepresentationError),
+    ):
+        batcher.submit(Item(CountState(1)))
+
+
+@pytest.mark.parametrize("max_batch_size", [0, -1])
+def test_batcher_rejects_empty_batches(max_batch_size: int) -> None:
+    """Batches of fewer than one item should be refused up front."""
+    with pytest.raises(InvalidBatchSizeError, match="at least 1"):
+        EvaluationBatcher(DoublingEvaluator(), max_batch_size=max_batch_size)
@@ -0,0 +1,251 @@
+"""Tests for the instrumentation wrappers and latency histograms."""
+
+import json
+import threading
+import timeit
+
+import pytest
+
+from valanga.batch_checkpoints import ParallelStateCheckpointCodec
+from valanga.instrumentation import (
+    Instrumentation,
+    InstrumentedBatchCheckpointCodec,
+    InstrumentedDynamics,
+    InstrumentedIncrementalCheckpointCodec,
+    InstrumentedReversibleDynamics,
+    InstrumentedStateCheckpointCodec,
+    InstrumentedSummaryCheckpointCodec,
+    LatencyHistogram,
+    instrument_representation_factory,
+)
+from valanga.perft import perft, perft_reversible
+from valanga.reference_games import (
+    ReversibleTicTacToe,
+    TicTacToeCheckpointCodec,
+    TicTacToeDynamics,
+    TicTacToeState,
+)
+from valanga.representation_factory import RepresentationFactory
+
+
+def test_histogram_buckets_bound_the_relative_error() -> None:
+    """Every value should land in a bucket holding it, at most 1/16 wide."""
+    histogram = LatencyHistogram()
+    values = [0, 1, 31, 32, 33, 63, 64, 1000, 123_456, 10**9]
+    for value in values:
+        histogram.record(value)
+
+    buckets = list(histogram.buckets())
+    assert sum(count for _, _, count in buckets) == len(values)
+    for value in values:
+        low, high, _ = next(b for b in buckets if b[0] <= value <= b[1])
+        assert high - low <= max(low, 1) / 16
+    assert histogram.count == len(values)
+    assert histogram.min_ns == 0
+    assert histogram.max_ns == 10**9
+    assert histogram.total_ns == sum(values)
+
+
+def test_histogram_quantiles_never_underestimate() -> None:
+    """Quantiles should be upper bounds within the bucket precision."""
+    histogram = LatencyHistogram()
+    for value in range(1, 1001):
+        histogram.record(value)
+
+    for quantile, exact in [(0.5, 500), (0.9, 900), (0.99, 990), (1.0, 1000)]:
+        reported = histogram.value_at_quantile(quantile)
+        assert exact <= reported <= exact * 17 / 16
+    assert histogram.value_at_quantile(1.0) == 1000
+    assert LatencyHistogram().value_at_quantile(0.5) == 0
+
+
+def test_histogram_merge_and_clear() -> None:
+    """Merging should add counts; clearing should forget them."""
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(10)
+    second.record(5)
+    second.record(5000)
+
+    first.merge(second)
+    first.merge(LatencyHistogram())
+
+    assert (first.count, first.min_ns, first.max_ns) == (3, 5, 5000)
+    assert first.total_ns == 5015
+    first.clear()
+    assert first.count == 0
+    assert list(first.buckets()) == []
+
+
+def test_dynamics_wrapper_counts_every_call() -> None:
+    """Perft through the wrapper should record one call per node."""
+    instrumentation = Instrumentation()
+    dynamics = InstrumentedDynamics(TicTacToeDynamics(), instrumentation)
+
+    assert perft(dynamics, TicTacToeState(), 3) == 504
+    assert dynamics.action_name(TicTacToeState(), 4) == "b2"
+    assert dynamics.action_from_name(TicTacToeState(), "b2") == 4
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.calls("dynamics.legal_actions") == 1 + 9 + 72
+    assert snapshot.calls("dynamics.step") == 9 + 72 + 504
+    assert snapshot.calls("dynamics.action_name") == 1
+    assert snapshot.calls("dynamics.action_from_name") == 1
+    assert snapshot.calls("dynamics.missing") == 0
+    assert snapshot.threads == 1
+
+
+def test_reversible_wrapper_counts_every_call() -> None:
+    """Push and pop should be counted under the given prefix."""
+    instrumentation = Instrumentation()
+    dynamics = InstrumentedReversibleDynamics(
+        ReversibleTicTacToe(), instrumentation, prefix="ttt"
+    )
+
+    assert perft_reversible(dynamics, 2) == 72
+    assert dynamics.state.snapshot() == TicTacToeState()
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.calls("ttt.push") == snapshot.calls("ttt.pop") == 9 + 72
+    assert snapshot.calls("ttt.legal_actions") == 1 + 9
+
+
+def test_failing_calls_are_recorded_and_raise() -> None:
+    """An exception should propagate after its call is recorded."""
+    instrumentation = Instrumentation()
+    dynamics = InstrumentedDynamics(TicTacToeDynamics(), instrumentation)
+
+    with pytest.raises(ValueError, match="substring not found"):
+        dynamics.action_from_name(TicTacToeState(), "z9")
+
+    assert instrumentation.snapshot().calls("dynamics.action_from_name") == 1
+
+
+def test_representation_factory_wrapper() -> None:
+    """Both creators should be timed, and transitions should still dispatch."""
+    instrumentation = Instrumentation()
+    factory = instrument_representation_factory(
+        RepresentationFactory(
+            create_from_state=lambda state: ("full", state),
+            create_from_state_and_modifications=lambda state, mods, prev: (
+                "delta",
+                state,
+                mods,
+                prev,
+            ),
+        ),
+        instrumentation,
+    )
+
+    root = factory.create_from_transition("root", None, None)
+    child = factory.create_from_transition("child", root, 4)
+
+    assert root == ("full", "root")
+    assert child == ("delta", "child", 4, root)
+    snapshot = instrumentation.snapshot()
+    assert snapshot.calls("representation.create_from_state") == 1
+    assert snapshot.calls("representation.create_from_state_and_modifications") == 1
+
+
+def test_checkpoint_codec_wrappers() -> None:
+    """Codec wrappers should round-trip states and count their calls."""
+    instrumentation = Instrumentation()
+    codec = TicTacToeCheckpointCodec()
+    states = InstrumentedStateCheckpointCodec(codec, instrumentation)
+    incremental = InstrumentedIncrementalCheckpointCodec(codec, instrumentation)
+    parent = TicTacToeState().play(4)
+    child = parent.play(0)
+
+    assert states.load_state_ref(states.dump_state_ref(child)) == child
+    assert incremental.load_anchor_ref(incremental.dump_anchor_ref(parent)) == parent
+    delta = incremental.dump_delta_from_parent(parent_state=parent, child_state=child)
+    assert incremental.load_child_from_delta(parent_state=parent, delta_ref=delta) == (
+        child
+    )
+
+    methods = instrumentation.snapshot().to_dict()["methods"]
+    assert {key: entry["calls"] for key, entry in methods.items()} == {
+        "checkpoint_codec.dump_anchor_ref": 1,
+        "checkpoint_codec.dump_delta_from_parent": 1,
+        "checkpoint_codec.dump_state_ref": 1,
+        "checkpoint_codec.load_anchor_ref": 1,
+        "checkpoint_codec.load_child_from_delta": 1,
+        "checkpoint_codec.load_state_ref": 1,
+    }
+
+
+def test_batch_and_summary_codec_wrappers() -> None:
+    """Batches should count as one call each, summaries as one per state."""
+    instrumentation = Instrumentation()
+    codec = TicTacToeCheckpointCodec()
+    batch = InstrumentedBatchCheckpointCodec(
+        ParallelStateCheckpointCodec(codec, max_workers=1), instrumentation
+    )
+    summaries = InstrumentedSummaryCheckpointCodec(codec, instrumentation)
+    states = [TicTacToeState(), TicTacToeState().play(4)]
+
+    assert batch.load_state_refs(batch.dump_state_refs(states)) == states
+    assert [summaries.dump_state_summary(state) for state in states] == [
+        codec.dump_state_summary(state) for state in states
+    ]
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.calls("checkpoint_codec.dump_state_refs") == 1
+    assert snapshot.calls("checkpoint_codec.load_state_refs") == 1
+    assert snapshot.calls("checkpoint_codec.dump_state_summary") == 2
+
+
+def test_recording_overhead_stays_bounded() -> None:
+    """Timing a call should cost microseconds, not tens of them.
+
+    The bound is loose on purpose, so slow or busy machines pass; it catches
+    a hot path that starts locking, allocating or growing per call.
+    """
+    instrumentation = Instrumentation()
+    histogram = LatencyHistogram()
+    calls = 20_000
+
+    per_call_ns = (
+        min(
+            timeit.repeat(
+                lambda: instrumentation.record("key", 1234), number=calls, repeat=5
+            )
+        )
+        / calls
+        * 1e9
+    )
+    histogram_ns = (
+        min(timeit.repeat(lambda: histogram.record(1234), number=calls, repeat=5))
+        / calls
+        * 1e9
+    )
+
+    assert per_call_ns < 20_000
+    assert histogram_ns < 20_000
+    assert instrumentation.snapshot().calls("key") == 5 * calls
+
+
+def test_snapshot_merges_threads_and_exports_json() -> None:
+    """Every thread's calls should be merged, and the export should be JSON."""
+    instrumentation = Instrumentation()
+    dynamics = InstrumentedDynamics(TicTacToeDynamics(), instrumentation)
+    workers = [
+        threading.Thread(target=perft, args=(dynamics, TicTacToeState(), 2))
+        for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot.threads == 4
+    assert snapshot.calls("dynamics.step") == 4 * (9 + 72)
+
+    exported = json.loads(snapshot.to_json(include_buckets=True))
+    step = exported["methods"]["dynamics.step"]
+    assert step["calls"] == 4 * (9 + 72)
+    assert step["min_ns"] <= step["p50"] <= step["p99.9"] <= step["max_ns"]
+    assert sum(count for _, _, count in step["buckets"]) == step["calls"]
+
+    instrumentation.reset()
+    assert instrumentation.snapshot().calls("dynamics.step") == 0
@@ -0,0 +1,107 @@
+"""Tests for lazy checkpoint-backed state handles."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from valanga.checkpoint_store import CheckpointStore
+from valanga.checkpoints import CheckpointStateSummary
+from valanga.lazy_state import LazyState, lazy_states
+
+
+@dataclass(frozen=True)
+class PileState:
+    """Toy state: a pile of stones."""
+
+    stones: int
+
+    @property
+    def tag(self) -> int:
+        """Return the number of stones."""
+        return self.stones
+
+    def is_game_over(self) -> bool:
+        """Return whether the pile is empty."""
+        return self.stones == 0
+
+    def pprint(self) -> str:
+        """Return the number of stones."""
+        return str(self.stones)
+
+
+class PileCodec:
+    """Incremental codec counting the restored anchors."""
+
+    def __init__(self) -> None:
+        """Start without any restore."""
+        self.restored = 0
+
+    def dump_anchor_ref(self, state: PileState) -> int:
+        """Store the pile size."""
+        return state.stones
+
+    def load_anchor_ref(self, payload: int) -> PileState:
+        """Restore the pile."""
+        self.restored += 1
+        return PileState(payload)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: PileState,
+        child_state: PileState,
+        branch_from_parent: object | None = None,
+    ) -> int:
+        """Store the stones taken."""
+        del branch_from_parent
+        return parent_state.stones - child_state.stones
+
+    def load_child_from_delta(
+        self, *, parent_state: PileState, delta_ref: int
+    ) -> PileState:
+        """Take the stones."""
+        return PileState(parent_state.stones - delta_ref)
+
+
+def test_summary_answers_without_restoring(tmp_path: Path) -> None:
+    """Summarized facts should not restore the state."""
+    codec = PileCodec()
+    with CheckpointStore(tmp_path, codec) as store:
+        store.append_anchor(0, PileState(3))
+        store.append_delta(1, 0, parent_state=PileState(3), child_state=PileState(0))
+        handles = lazy_states(
+            store,
+            [
+                (0, CheckpointStateSummary(tag=3, is_terminal=False)),
+                (1, CheckpointStateSummary(tag=0, is_terminal=True)),
+            ],
+        )
+
+        assert handles[0].tag == 3
+        assert handles[1].is_game_over()
+        assert codec.restored == 0
+        assert not handles[1].is_materialized
+
+        assert handles[1].stones == 0
+        assert handles[1].pprint() == "0"
+        assert codec.restored == 1
+        assert handles[1].is_materialized
+
+
+def test_missing_summary_fields_fall_back_to_the_state() -> None:
+    """Unknown summary fields should be answered by the restored state."""
+    loads: list[int] = []
+
+    def load() -> PileState:
+        loads.append(1)
+        return PileState(2)
+
+    handle = LazyState(CheckpointStateSummary(), load)
+
+    assert handle.tag == 2
+    assert not handle.is_game_over()
+    assert len(loads) == 1
+    handle.release()
+    assert not handle.is_materialized
+    assert handle.state == PileState(2)
+    assert len(loads) == 2
+    assert "materialized=True" in repr(handle)
@@ -0,0 +1,199 @@
+"""Tests for the array-backed MCTS selector."""
+
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from typing import Self
+
+import pytest
+
+from valanga.dynamics import Transition
+from valanga.evaluations import Certainty, Value
+from valanga.game import Color
+from valanga.mcts import InvalidSimulationCountError, MctsSelector
+from valanga.policy import NoBranchToRecommendError
+
+
+@dataclass(frozen=True)
+class NimState:
+    """Nim pile: players take 1 to 3 stones, taking the last one wins."""
+
+    stones: int
+    turn: Color
+
+    @property
+    def tag(self) -> tuple[int, Color]:
+        """Return the tag of the state."""
+        return (self.stones, self.turn)
+
+    def is_game_over(self) -> bool:
+        """Return whether no stone is left."""
+        return self.stones == 0
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return f"{self.stones}:{self.turn.name}"
+
+
+class NimActions:
+    """Eager branch generator over the legal takes."""
+
+    sort_branch_keys: bool = False
+
+    def __init__(self, actions: Sequence[int]) -> None:
+        """Store the legal takes."""
+        self._actions = list(actions)
+        self._iterator = iter(self._actions)
+
+    @property
+    def all_generated_keys(self) -> Sequence[int] | None:
+        """Return all the takes."""
+        return self._actions
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate over the takes."""
+        return iter(self._actions)
+
+    def __next__(self) -> int:
+        """Return the next take."""
+        return next(self._iterator)
+
+    def more_than_one(self) -> bool:
+        """Return whether several takes are available."""
+        return len(self._actions) > 1
+
+    def get_all(self) -> Sequence[int]:
+        """Return all the takes."""
+        return self._actions
+
+    def copy_with_reset(self) -> Self:
+        """Return a fresh copy of the generator."""
+        return type(self)(self._actions)
+
+
+class NimDynamics:
+    """Stateless Nim dynamics."""
+
+    def legal_actions(self, state: NimState) -> NimActions:
+        """Return the legal takes."""
+        return NimActions(range(1, min(3, state.stones) + 1))
+
+    def step(self, state: NimState, action: int) -> Transition[NimState]:
+        """Take ``action`` stones."""
+        next_state = NimState(state.stones - action, Color(not state.turn))
+        return Transition(next_state=next_state, is_over=next_state.is_game_over())
+
+    def action_name(self, state: NimState, action: int) -> str:
+        """Return the name of a take."""
+        del state
+        return f"take{action}"
+
+    def action_from_name(self, state: NimState, name: str) -> int:
+        """Parse the name of a take."""
+        del state
+        return int(name.removeprefix("take"))
+
+
+def evaluate(state: NimState) -> Value:
+    """The player to act on an empty pile has lost."""
+    if state.is_game_over():
+        score = -1.0 if state.turn is Color.WHITE else 1.0
+        return Value(score=score, certainty=Certainty.TERMINAL)
+    return Value(score=0.0, certainty=Certainty.ESTIMATE)
+
+
+def make_selector(num_simulations: int = 3000) -> MctsSelector[NimState]:
+    """Return a selector on Nim."""
+    return MctsSelector(
+        dynamics=NimDynamics(), evaluator=evaluate, num_simulations=num_simulations
+    )
+
+
+def test_mcts_finds_the_winning_take() -> None:
+    """Leaving a multiple of four stones is the winning strategy."""
+    recommendation = make_selector().recommend(NimState(5, Color.WHITE), seed=0)
+
+    assert recommendation.recommended_name == "take1"
+    assert recommendation.policy is not None
+    assert (
+        max(recommendation.policy.probs, key=recommendation.policy.probs.__getitem__)
+        == 1
+    )
+    assert sum(recommendation.policy.probs.values()) == pytest.approx(1.0)
+    assert recommendation.evaluation is not None
+    assert recommendation.evaluation.score > 0.5
+    assert recommendation.evaluation.line is not None
+    assert recommendation.evaluation.line[0] == 1
+
+
+def test_black_evaluations_are_reported_from_white_point_of_view() -> None:
+    """A winning black root should yield negative white-centric scores."""
+    recommendation = make_selector().recommend(NimState(6, Color.BLACK), seed=1)
+
+    assert recommendation.recommended_name == "take2"
+    assert recommendation.branch_evals is not None
+    assert recommendation.branch_evals["take2"].score < -0.5
+
+
+def test_mcts_is_deterministic_for_a_seed() -> None:
+    """The same seed should produce the same policy."""
+    selector = make_selector(num_simulations=200)
+
+    first = selector.recommend(NimState(11, Color.WHITE), seed=7)
+    second = selector.recommend(NimState(11, Color.WHITE), seed=7)
+
+    assert first == second
+
+
+def test_progress_is_reported_in_percent() -> None:
+    """Progress should be reported once per completed percent."""
+    progress: list[int] = []
+
+    make_selector(num_simulations=50).recommend(
+        NimState(8, Color.WHITE), seed=0, notify_progress=progress.append
+    )
+
+    assert progress[-1] == 100
+    assert progress == sorted(set(progress))
+
+
+def test_terminal_root_is_rejected() -> None:
+    """A finished game has nothing to recommend."""
+    with pytest.raises(NoBranchToRecommendError):
+        make_selector().recommend(NimState(0, Color.WHITE), seed=0)
+
+
+def test_stepped_session_matches_recommend() -> None:
+    """Playouts run in steps should give the same recommendation."""
+    selector = make_selector(num_simulations=120)
+    root = NimState(9, Color.WHITE)
+
+    session = selector.start(root, seed=4)
+    assert session.best() is None
+    assert not session.step(50)
+    assert session.nodes == 50
+    assert session.best() is not None
+    while not session.step(50):
+        pass
+
+    assert session.nodes == 120
+    assert session.best() == selector.recommend(root, seed=4)
+
+
+@pytest.mark.parametrize("root", [NimState(5, Color.WHITE), NimState(6, Color.BLACK)])
+def test_root_value_is_signed_by_the_root_role(root: NimState) -> None:
+    """The root should sum its children's values, all seen by the root role."""
+    session = make_selector(500).start(root, seed=0)
+    session.step()
+    tree = session.tree  # type: ignore[attr-defined]
+
+    children = tree.children(0)
+    assert tree.value_sums[0] == pytest.approx(
+        sum(tree.value_sums[child] for child in children)
+    )
+    assert tree.mean(0) > 0.5
+
+
+def test_simulation_count_must_be_positive() -> None:
+    """A selector without playouts could never recommend anything."""
+    with pytest.raises(InvalidSimulationCountError):
+        make_selector(0)
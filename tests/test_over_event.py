@@ -1,5 +1,7 @@
 """Tests for valanga.over_event module."""
 
+import pickle
+from dataclasses import FrozenInstanceError
 from enum import Enum, auto
 
 import pytest
@@ -136,3 +138,51 @@ def test_package_exports_only_include_the_final_over_event_surface() -> None:
     assert valanga.Outcome is Outcome
     assert valanga.OverEvent is OverEvent
     assert {"Outcome", "OverEvent"}.issubset(set(valanga.__all__))
+
+
+def test_interned_events_are_shared_and_immutable() -> None:
+    """Interning the same fields should return one frozen instance."""
+    first = valanga.intern_over_event(
+        Outcome.WIN, DummyTermination.CHECKMATE, Color.WHITE
+    )
+    second = OverEvent(
+        outcome=Outcome.WIN,
+        termination=DummyTermination.CHECKMATE,
+        winner=Color.WHITE,
+    ).interned()
+
+    assert first is second
+    assert hash(first) == hash(second)
+    with pytest.raises(FrozenInstanceError):
+        first.outcome = Outcome.DRAW  # type: ignore[misc]
+
+
+def test_interned_events_compare_equal_to_plain_events() -> None:
+    """Interned and plain events with the same fields should be equal."""
+    plain = OverEvent(outcome=Outcome.DRAW, termination=DummyTermination.STEP_LIMIT)
+    interned = plain.interned()
+
+    assert interned == plain
+    assert plain == interned
+    assert interned != valanga.intern_over_event(Outcome.DRAW)
+    assert interned.is_draw() is True
+
+
+def test_interning_keeps_role_types_apart() -> None:
+    """An int winner should not collide with an equal int-valued Color."""
+    assert valanga.intern_over_event(
+        Outcome.WIN, winner=Color.WHITE
+    ) is not valanga.intern_over_event(Outcome.WIN, winner=1)
+
+
+def test_interning_still_validates_invariants() -> None:
+    """Invalid field combinations should be rejected once, at interning time."""
+    with pytest.raises(AssertionError):
+        valanga.intern_over_event(Outcome.LOSS, winner=Color.BLACK)
+
+
+def test_interned_events_unpickle_to_the_shared_instance() -> None:
+    """Pickling should preserve the flyweight identity."""
+    event = valanga.intern_over_event(Outcome.WIN, DummyTermination.GOAL_REACHED)
+
+    assert pickle.loads(pickle.dumps(event)) is event
@@ -0,0 +1,84 @@
+"""Tests for the perft benchmarks and the tic-tac-toe reference game."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from valanga.over_event import Outcome
+from valanga.perft import (
+    benchmark_reversible,
+    benchmark_step,
+    main,
+    perft,
+    perft_reversible,
+)
+from valanga.reference_games import (
+    REFERENCE_GAMES,
+    ReversibleTicTacToe,
+    TicTacToeDynamics,
+    TicTacToeState,
+)
+
+# Move sequences of each length, games stopping once a line is complete.
+TIC_TAC_TOE_PERFT = [1, 9, 72, 504, 3024, 15120]
+
+
+@pytest.mark.parametrize("depth", range(len(TIC_TAC_TOE_PERFT)))
+def test_tic_tac_toe_perft_counts(depth: int) -> None:
+    """Both flavours should agree with the known tic-tac-toe counts."""
+    reversible = ReversibleTicTacToe()
+
+    assert (
+        perft(TicTacToeDynamics(), TicTacToeState(), depth)
+        == (TIC_TAC_TOE_PERFT[depth])
+    )
+    assert perft_reversible(reversible, depth) == TIC_TAC_TOE_PERFT[depth]
+    assert reversible.state.snapshot() == TicTacToeState()
+
+
+def test_tic_tac_toe_rules() -> None:
+    """A completed line should end the game with its winner."""
+    dynamics = TicTacToeDynamics()
+    state = TicTacToeState()
+    transition = None
+    for name in ["a1", "a2", "b1", "b2", "c1"]:
+        transition = dynamics.step(state, dynamics.action_from_name(state, name))
+        state = transition.next_state
+
+    assert transition is not None
+    assert transition.is_over
+    assert transition.over_event is not None
+    assert transition.over_event.outcome is Outcome.WIN
+    assert transition.over_event.winner is TicTacToeState().turn
+    assert list(dynamics.legal_actions(state)) == []
+    assert state.pprint() == "...\nOO.\nXXX"
+    assert dynamics.action_name(state, 4) == "b2"
+
+
+def test_benchmarks_report_both_modes() -> None:
+    """Benchmarks should count the same tree and measure it."""
+    step = benchmark_step(
+        TicTacToeDynamics(), TicTacToeState(), 3, game="ttt", repeat=1
+    )
+    push_pop = benchmark_reversible(ReversibleTicTacToe(), 3, game="ttt", repeat=1)
+
+    for result in (step, push_pop):
+        assert result.leaves == 504
+        assert result.nodes == 1 + 9 + 72 + 504
+        assert result.nodes_per_second > 0
+        assert result.peak_bytes_per_node > 0
+    assert (step.mode, push_pop.mode) == ("step", "push-pop")
+
+
+def test_cli_writes_json_results(tmp_path: Path) -> None:
+    """The command line should write one result per game and mode."""
+    output = tmp_path / "perft.json"
+
+    assert main(["--depth", "2", "--repeat", "1", "--output", str(output)]) == 0
+
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert {(r["game"], r["mode"]) for r in report["results"]} == {
+        (game, mode) for game in REFERENCE_GAMES for mode in ("step", "push-pop")
+    }
+    assert "python" in report
@@ -0,0 +1,178 @@
+"""Tests for the LRU reconstruction cache."""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from valanga.checkpoint_store import CheckpointCycleError, CheckpointStore
+from valanga.reconstruction_cache import ReconstructionCache
+
+
+@dataclass(frozen=True)
+class PathState:
+    """Toy state: the branches taken from the root."""
+
+    path: tuple[int, ...]
+
+
+class PathCodec:
+    """Codec whose deltas append one branch to the parent path."""
+
+    def __init__(self) -> None:
+        """Count replayed deltas and loaded anchors."""
+        self.replayed = 0
+        self.anchors_loaded = 0
+
+    def dump_anchor_ref(self, state: PathState) -> tuple[int, ...]:
+        """Store the whole path."""
+        return state.path
+
+    def load_anchor_ref(self, payload: tuple[int, ...]) -> PathState:
+        """Restore the whole path."""
+        self.anchors_loaded += 1
+        return PathState(payload)
+
+    def dump_delta_from_parent(
+        self,
+        *,
+        parent_state: PathState,
+        child_state: PathState,
+        branch_from_parent: object | None = None,
+    ) -> int:
+        """Store the last branch."""
+        del parent_state, branch_from_parent
+        return child_state.path[-1]
+
+    def load_child_from_delta(
+        self, *, parent_state: PathState, delta_ref: int
+    ) -> PathState:
+        """Append the branch to the parent path."""
+        self.replayed += 1
+        return PathState((*parent_state.path, delta_ref))
+
+
+def test_lru_evicts_least_recently_used_states() -> None:
+    """The budget should be enforced by evicting the oldest entries."""
+    cache: ReconstructionCache[str] = ReconstructionCache(max_cost=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+
+    assert 2 not in cache
+    assert 1 in cache
+    assert cache.stats.evictions == 1
+    assert cache.get(2) is None
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 1
+
+
+def test_cost_function_bounds_memory() -> None:
+    """States should be weighed with the provided cost function."""
+    cache: ReconstructionCache[str] = ReconstructionCache(max_cost=10, cost=len)
+    cache.put(1, "x" * 6)
+    cache.put(2, "y" * 4)
+    cache.put(3, "z" * 3)
+    cache.put(4, "w" * 11)
+
+    assert cache.stats.total_cost == 7
+    assert 4 not in cache
+    assert len(cache) == 2
+
+
+def test_siblings_restore_from_the_cached_parent(tmp_path: Path) -> None:
+    """Restoring siblings should only replay their own delta."""
+    codec = PathCodec()
+    cache: ReconstructionCache[PathState] = ReconstructionCache(max_cost=100)
+    with CheckpointStore(tmp_path, codec, cache=cache) as store:
+        parent = PathState(())
+        store.append_anchor(0, parent)
+        for depth in range(1, 6):
+            child = PathState((*parent.path, 0))
+            store.append_delta(depth, depth - 1, parent_state=parent, child_state=child)
+            parent = child
+        for sibling in range(1, 4):
+            store.append_delta(
+                100 + sibling,
+                5,
+                parent_state=parent,
+                child_state=PathState((*parent.path, sibling)),
+            )
+
+        assert store.load(101) == PathState((0, 0, 0, 0, 0, 1))
+        assert codec.replayed == 6
+        assert store.load(102) == PathState((0, 0, 0, 0, 0, 2))
+        assert store.load(103) == PathState((0, 0, 0, 0, 0, 3))
+        assert codec.replayed == 8
+        assert codec.anchors_loaded == 1
+        assert store.load(103) == PathState((0, 0, 0, 0, 0, 3))
+        assert codec.replayed == 8
+
+
+def test_recording_a_node_again_uncaches_its_subtree(tmp_path: Path) -> None:
+    """Loads should see a re-recorded node, and descendants rebuilt through it."""
+    cache: ReconstructionCache[PathState] = ReconstructionCache(max_cost=100)
+    with CheckpointStore(tmp_path, PathCodec(), cache=cache) as store:
+        parent = PathState(())
+        store.append_anchor(0, parent)
+        for depth in range(1, 4):
+            child = PathState((*parent.path, 0))
+            store.append_delta(depth, depth - 1, parent_state=parent, child_state=child)
+            parent = child
+        assert store.load(3) == PathState((0, 0, 0))
+
+        store.append_anchor(1, PathState((9,)))
+
+        assert 0 in cache
+        assert all(node_id not in cache for node_id in (1, 2, 3))
+        assert store.load(1) == PathState((9,))
+        assert store.load(3) == PathState((9, 0, 0))
+
+    with CheckpointStore(tmp_path, PathCodec()) as reopened:
+        assert reopened.load(3) == PathState((9, 0, 0))
+
+
+def _record_path(store: CheckpointStore[PathState, tuple[int, ...], int]) -> None:
+    """Record the anchor 0 and the chain 0 -> 1 -> 2 -> 3 of zero branches."""
+    parent = PathState(())
+    store.append_anchor(0, parent)
+    for depth in range(1, 4):
+        child = PathState((*parent.path, 0))
+        store.append_delta(depth, depth - 1, parent_state=parent, child_state=child)
+        parent = child
+
+
+def test_moved_nodes_leave_the_subtree_of_their_old_parent(tmp_path: Path) -> None:
+    """Re-recording a node elsewhere should detach it from its old parent."""
+    cache: ReconstructionCache[PathState] = ReconstructionCache(max_cost=100)
+    with CheckpointStore(tmp_path, PathCodec(), cache=cache) as store:
+        _record_path(store)
+        store.append_delta(
+            2, 0, parent_state=PathState(()), child_state=PathState((7,))
+        )
+        assert store.load(3) == PathState((7, 0))
+        assert store.load(1) == PathState((0,))
+
+        store.append_anchor(1, PathState((9,)))
+
+        assert 1 not in cache
+        assert all(node_id in cache for node_id in (0, 2, 3))
+
+
+def test_deltas_of_their_own_descendants_are_rejected(tmp_path: Path) -> None:
+    """A re-record that would close a chain into a cycle should be refused."""
+    with CheckpointStore(tmp_path, PathCodec()) as store:
+        _record_path(store)
+
+        for parent_id in (3, 1):
+            with pytest.raises(CheckpointCycleError):
+                store.append_delta(
+                    1,
+                    parent_id,
+                    parent_state=PathState((0, 0, 0)),
+                    child_state=PathState((5,)),
+                )
+
+        assert store.load(3) == PathState((0, 0, 0))
+        assert [record.node_id for record in store.chain(3)] == [0, 1, 2, 3]
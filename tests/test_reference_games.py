@@ -0,0 +1,175 @@
+"""Tests for the reference games."""
+
+import random
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from valanga.checkpoint_store import CheckpointStore
+from valanga.game import Color, SoloRole
+from valanga.over_event import Outcome
+from valanga.perft import perft, perft_reversible
+from valanga.reference_games import (
+    REFERENCE_GAMES,
+    ConnectFourDynamics,
+    ConnectFourState,
+    FifteenPuzzleDynamics,
+    FifteenPuzzleState,
+    ReferenceGame,
+    ReversibleConnectFour,
+    scrambled_fifteen_puzzle,
+)
+
+CONNECT_FOUR_PERFT = [1, 7, 49, 343, 2401, 16807]
+
+
+def random_playout(
+    game: ReferenceGame[Any], seed: int, max_moves: int = 40
+) -> list[tuple[Any, Any, Any]]:
+    """Return ``(state, action, transition)`` triples of a random game."""
+    generator = random.Random(seed)
+    state = game.initial_state
+    moves = []
+    while len(moves) < max_moves:
+        actions = list(game.dynamics.legal_actions(state))
+        if not actions:
+            break
+        action = generator.choice(actions)
+        transition = game.dynamics.step(state, action)
+        moves.append((state, action, transition))
+        state = transition.next_state
+    return moves
+
+
+@pytest.fixture(params=sorted(REFERENCE_GAMES))
+def game(request: pytest.FixtureRequest) -> ReferenceGame[Any]:
+    """Return each reference game in turn."""
+    return REFERENCE_GAMES[request.param]()
+
+
+def test_flavours_agree(game: ReferenceGame[Any]) -> None:
+    """Both flavours should count the same trees and restore the root."""
+    reversible = game.reversible(game.initial_state)
+
+    for depth in range(4):
+        assert perft_reversible(reversible, depth) == perft(
+            game.dynamics, game.initial_state, depth
+        )
+    assert reversible.state.snapshot() == game.initial_state
+
+
+def test_playouts_are_consistent(game: ReferenceGame[Any]) -> None:
+    """Pushes, transitions, tags and action names should all agree."""
+    for seed in range(5):
+        reversible = game.reversible(game.initial_state)
+        for state, action, transition in random_playout(game, seed):
+            assert isinstance(state.tag, int)
+            assert state.turn in (*Color, SoloRole.SOLO)
+            name = game.dynamics.action_name(state, action)
+            assert game.dynamics.action_from_name(state, name) == action
+            assert reversible.action_name(action) == name
+            assert reversible.push(action) == transition.modifications
+            assert reversible.state.snapshot() == transition.next_state
+            assert transition.is_over == transition.next_state.is_game_over()
+
+
+def test_reversible_state_is_a_live_board(game: ReferenceGame[Any]) -> None:
+    """The push/pop state should change in place and read like a state."""
+    reversible = game.reversible(game.initial_state)
+    board = reversible.state
+    for _, action, transition in random_playout(game, seed=1):
+        reversible.push(action)
+        assert reversible.state is board
+        assert board.tag == transition.next_state.tag
+        assert board.turn == transition.next_state.turn
+        assert board.is_game_over() == transition.next_state.is_game_over()
+        assert board.pprint() == transition.next_state.pprint()
+
+
+def test_checkpoint_codec_round_trips(game: ReferenceGame[Any]) -> None:
+    """Anchors and deltas should reconstruct every state of a playout."""
+    codec = game.checkpoint_codec
+    for state, action, transition in random_playout(game, seed=3):
+        child = transition.next_state
+        delta = codec.dump_delta_from_parent(
+            parent_state=state, child_state=child, branch_from_parent=action
+        )
+        assert isinstance(delta, int)
+        assert codec.load_child_from_delta(parent_state=state, delta_ref=delta) == child
+        assert codec.load_anchor_ref(codec.dump_anchor_ref(child)) == child
+
+
+def test_codecs_drive_a_checkpoint_store(
+    game: ReferenceGame[Any], tmp_path: Path
+) -> None:
+    """The codecs should plug into the checkpoint store as is."""
+    moves = random_playout(game, seed=1)
+    with CheckpointStore(tmp_path, game.checkpoint_codec) as store:
+        store.append_anchor(0, game.initial_state)
+        for node_id, (state, action, transition) in enumerate(moves, start=1):
+            store.append_child(
+                node_id,
+                node_id - 1,
+                parent_state=state,
+                child_state=transition.next_state,
+                branch_from_parent=action,
+            )
+        assert store.load(len(moves)) == moves[-1][2].next_state
+
+
+def test_connect_four_perft_counts() -> None:
+    """The first Connect Four plies should match the known counts."""
+    for depth, count in enumerate(CONNECT_FOUR_PERFT):
+        assert perft(ConnectFourDynamics(), ConnectFourState(), depth) == count
+
+
+@pytest.mark.parametrize(
+    ("columns", "winner"),
+    [
+        ("1212121", Color.WHITE),
+        ("12345671234567", None),
+        ("12233434544", Color.WHITE),
+        ("71234566", None),
+    ],
+)
+def test_connect_four_alignments(columns: str, winner: Color | None) -> None:
+    """Vertical and diagonal alignments should end the game."""
+    dynamics = ConnectFourDynamics()
+    reversible = ReversibleConnectFour()
+    state = ConnectFourState()
+    for name in columns:
+        action = dynamics.action_from_name(state, name)
+        reversible.push(action)
+        state = dynamics.step(state, action).next_state
+
+    over_event = state.over_event()
+    if winner is None:
+        assert over_event is None
+        assert len(dynamics.legal_actions(state)) == 7
+    else:
+        assert over_event is not None
+        assert over_event.winner is winner
+        assert list(reversible.legal_actions()) == []
+
+
+def test_fifteen_puzzle_solves_and_scrambles() -> None:
+    """Sliding back into the solution should end the episode with a win."""
+    dynamics = FifteenPuzzleDynamics()
+    solved = FifteenPuzzleState()
+    assert solved.is_game_over()
+    assert list(dynamics.legal_actions(solved)) == []
+
+    unsolved = solved.move_blank(dynamics.action_from_name(solved, "L"))
+    assert dynamics.action_name(unsolved, 15) == "R"
+    transition = dynamics.step(unsolved, 15)
+    assert transition.next_state == solved
+    assert transition.over_event is not None
+    assert transition.over_event.outcome is Outcome.WIN
+    assert transition.over_event.winner is SoloRole.SOLO
+
+    scrambled = scrambled_fifteen_puzzle(seed=7)
+    assert not scrambled.is_game_over()
+    assert sorted(scrambled.tile_at(p) for p in range(16)) == list(range(16))
+    assert FifteenPuzzleState.from_tag(scrambled.tag) == scrambled
+    assert scrambled.pprint().count("\n") == 3
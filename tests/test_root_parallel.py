@@ -0,0 +1,145 @@
+"""Tests for the root-parallel selector."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pytest
+
+from valanga.evaluations import Certainty, Value
+from valanga.policy import BranchPolicy, Recommendation
+from valanga.root_parallel import (
+    InvalidWorkerCountError,
+    RootParallelSelector,
+    derive_seed,
+    merge_recommendations,
+)
+
+
+@dataclass(frozen=True)
+class TagState:
+    """Minimal state for selectors that ignore the position."""
+
+    tag: int
+
+    def is_game_over(self) -> bool:
+        """Return whether the state is terminal."""
+        return False
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return str(self.tag)
+
+
+class SeedSelector:
+    """Selector whose recommendation depends only on its seed."""
+
+    def recommend(
+        self, state: TagState, seed: int, notify_progress: object = None
+    ) -> Recommendation:
+        """Recommend branch ``a`` or ``b`` depending on the seed parity."""
+        del notify_progress
+        name = "ab"[seed % 2]
+        return Recommendation(
+            recommended_name=name,
+            evaluation=Value(score=float(state.tag), certainty=Certainty.ESTIMATE),
+            policy=BranchPolicy(probs={name: 1.0}),
+            branch_evals={name: Value(score=seed % 7, certainty=Certainty.ESTIMATE)},
+        )
+
+
+def make_estimate(score: float) -> Value:
+    """Return an estimated value."""
+    return Value(score=score, certainty=Certainty.ESTIMATE)
+
+
+def test_derived_seeds_are_stable_and_distinct() -> None:
+    """Worker seeds should be reproducible and differ across workers."""
+    seeds = [derive_seed(42, index) for index in range(16)]
+
+    assert seeds == [derive_seed(42, index) for index in range(16)]
+    assert len(set(seeds)) == 16
+    assert all(seed >= 0 for seed in seeds)
+    assert derive_seed(43, 0) != seeds[0]
+
+
+def test_merge_votes_and_averages() -> None:
+    """The majority branch wins and policies and values are averaged."""
+    merged = merge_recommendations(
+        [
+            Recommendation(
+                recommended_name="a",
+                evaluation=make_estimate(1.0),
+                policy=BranchPolicy(probs={"a": 0.75, "b": 0.25}),
+                branch_evals={"a": make_estimate(1.0), "b": make_estimate(0.0)},
+            ),
+            Recommendation(
+                recommended_name="b",
+                evaluation=make_estimate(5.0),
+                policy=BranchPolicy(probs={"b": 1.0}),
+                branch_evals={"b": make_estimate(2.0)},
+            ),
+            Recommendation(
+                recommended_name="a",
+                evaluation=make_estimate(3.0),
+                policy=BranchPolicy(probs={"a": 0.25, "b": 0.75}),
+            ),
+        ]
+    )
+
+    assert merged.recommended_name == "a"
+    assert merged.evaluation == make_estimate(2.0)
+    assert merged.policy is not None
+    assert dict(merged.policy.probs) == pytest.approx({"a": 1 / 3, "b": 2 / 3})
+    assert merged.branch_evals == {"a": make_estimate(1.0), "b": make_estimate(1.0)}
+
+
+def test_merge_keeps_certainty_only_when_workers_agree() -> None:
+    """Disagreeing certainties should fall back to an estimate."""
+    forced = Value(score=1.0, certainty=Certainty.FORCED)
+
+    agreed = merge_recommendations([Recommendation("a", forced)] * 2)
+    disagreed = merge_recommendations(
+        [Recommendation("a", forced), Recommendation("a", make_estimate(0.0))]
+    )
+
+    assert agreed.evaluation == forced
+    assert disagreed.evaluation is not None
+    assert disagreed.evaluation.certainty is Certainty.ESTIMATE
+
+
+def test_root_parallel_is_reproducible_and_reports_progress() -> None:
+    """A given seed and worker count should always give the same result."""
+    progress: list[int] = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        selector = RootParallelSelector(
+            selector=SeedSelector(), num_workers=4, executor=executor
+        )
+        first = selector.recommend(
+            TagState(3), seed=11, notify_progress=progress.append
+        )
+        second = selector.recommend(TagState(3), seed=11)
+
+    assert first == second
+    assert progress == [25, 50, 75, 100]
+
+
+def test_root_parallel_runs_in_worker_processes() -> None:
+    """The default executor should be a process pool."""
+    selector = RootParallelSelector(selector=SeedSelector(), num_workers=2)
+
+    recommendation = selector.recommend(TagState(5), seed=0)
+
+    assert recommendation.evaluation == make_estimate(5.0)
+    assert recommendation == merge_recommendations(
+        [
+            SeedSelector().recommend(TagState(5), derive_seed(0, index))
+            for index in range(2)
+        ]
+    )
+
+
+@pytest.mark.parametrize("num_workers", [0, -1])
+def test_root_parallel_rejects_missing_workers(num_workers: int) -> None:
+    """Fewer than one worker should be refused up front."""
+    with pytest.raises(InvalidWorkerCountError, match="at least 1"):
+        RootParallelSelector(selector=SeedSelector(), num_workers=num_workers)
@@ -0,0 +1,184 @@
+"""Tests for the self-play pipeline."""
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from valanga.dynamics import Transition
+from valanga.game import Color
+from valanga.over_event import Outcome, OverEvent
+from valanga.policy import BranchPolicy, Recommendation
+from valanga.self_play import (
+    GameRecord,
+    SelfPlayRunner,
+    SelfPlayStats,
+    ShardedGameWriter,
+    iter_shard_games,
+    play_game,
+)
+
+
+@dataclass(frozen=True)
+class NimState:
+    """Nim pile: players take 1 to 3 stones, taking the last one wins."""
+
+    stones: int
+    turn: Color
+
+    @property
+    def tag(self) -> tuple[int, Color]:
+        """Return the tag of the state."""
+        return (self.stones, self.turn)
+
+    def is_game_over(self) -> bool:
+        """Return whether no stone is left."""
+        return self.stones == 0
+
+    def pprint(self) -> str:
+        """Return a compact debug representation."""
+        return f"{self.stones}:{self.turn.name}"
+
+
+class NimDynamics:
+    """Stateless Nim dynamics reporting the winner."""
+
+    def legal_actions(self, state: NimState) -> range:
+        """Return the legal takes."""
+        return range(1, min(3, state.stones) + 1)
+
+    def step(self, state: NimState, action: int) -> Transition[NimState]:
+        """Take ``action`` stones."""
+        next_state = NimState(state.stones - action, Color(not state.turn))
+        if not next_state.is_game_over():
+            return Transition(next_state=next_state)
+        return Transition(
+            next_state=next_state,
+            is_over=True,
+            over_event=OverEvent(outcome=Outcome.WIN, winner=state.turn),
+        )
+
+    def action_name(self, state: NimState, action: int) -> str:
+        """Return the name of a take."""
+        del state
+        return f"take{action}"
+
+    def action_from_name(self, state: NimState, name: str) -> int:
+        """Parse the name of a take."""
+        del state
+        return int(name.removeprefix("take"))
+
+
+class SeededSelector:
+    """Selector taking a seed-dependent number of stones."""
+
+    def recommend(
+        self, state: NimState, seed: int, notify_progress: object = None
+    ) -> Recommendation:
+        """Take ``1 + seed % 3`` stones, or fewer near the end."""
+        del notify_progress
+        take = min(1 + seed % 3, state.stones)
+        return Recommendation(
+            recommended_name=f"take{take}", policy=BranchPolicy(probs={take: 1.0})
+        )
+
+
+def make_runner(**kwargs: object) -> SelfPlayRunner[NimState]:
+    """Return a runner on a pile of 10 stones."""
+    return SelfPlayRunner(
+        dynamics=NimDynamics(),
+        selector=SeededSelector(),
+        initial_state=NimState(10, Color.WHITE),
+        **kwargs,  # type: ignore[arg-type]
+    )
+
+
+class ListSink:
+    """Sink keeping the games in memory."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self.games: list[GameRecord] = []
+
+    def write(self, game: GameRecord) -> None:
+        """Keep ``game``."""
+        self.games.append(game)
+
+
+def test_play_game_records_actions_policies_and_result() -> None:
+    """A game should be played to the end and record every move."""
+    game = play_game(
+        NimDynamics(), SeededSelector(), NimState(10, Color.WHITE), game_index=3, seed=7
+    )
+
+    assert game.game_index == 3
+    assert sum(int(name.removeprefix("take")) for name in game.actions) == 10
+    assert len(game.policies) == len(game)
+    assert game.over_event is not None
+    assert game.over_event.winner is (Color.WHITE if len(game) % 2 else Color.BLACK)
+
+    capped = play_game(
+        NimDynamics(),
+        SeededSelector(),
+        NimState(10, Color.WHITE),
+        game_index=0,
+        seed=7,
+        max_moves=2,
+    )
+    assert capped.actions == game.actions[:2]
+    assert capped.over_event is None
+
+
+def test_runner_bounds_in_flight_games_and_counts_throughput() -> None:
+    """Runs should be reproducible and keep few games in flight."""
+    reported: list[int] = []
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        runner = make_runner(num_workers=2, executor=executor, max_in_flight=3)
+        sink = ListSink()
+        stats = runner.run(
+            20, seed=5, sink=sink, notify_stats=lambda s: reported.append(s.games)
+        )
+        replay = {game.game_index: game for game in runner.iter_games(20, seed=5)}
+
+    assert sorted(game.game_index for game in sink.games) == list(range(20))
+    assert {game.game_index: game for game in sink.games} == replay
+    assert reported == list(range(1, 21))
+    assert stats.games == 20
+    assert stats.moves == sum(len(game) for game in sink.games)
+    assert stats.moves_per_second >= stats.games_per_second > 0
+
+
+def test_sharded_writer_resumes_interrupted_runs(tmp_path: Path) -> None:
+    """Only complete shards should survive, and a resumed run fills the rest."""
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        runner = make_runner(num_workers=2, executor=executor)
+        writer = ShardedGameWriter(tmp_path, num_games=10, games_per_shard=4)
+        for game in runner.iter_games(10, seed=1):
+            if game.game_index >= 4:
+                continue
+            writer.write(game)
+        assert writer.completed_games() == {0, 1, 2, 3}
+
+        resumed = ShardedGameWriter(tmp_path, num_games=10, games_per_shard=4)
+        stats = SelfPlayStats()
+        runner.run(10, seed=1, sink=resumed, skip=resumed.completed_games())
+        for game in runner.iter_games(
+            10, seed=1, skip=resumed.completed_games(), stats=stats
+        ):
+            resumed.write(game)
+        full = sorted(runner.iter_games(10, seed=1), key=lambda g: g.game_index)
+
+    assert stats.games == 0
+    assert resumed.completed_games() == set(range(10))
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "games-000000.pkl",
+        "games-000001.pkl",
+        "games-000002.pkl",
+    ]
+    assert list(iter_shard_games(tmp_path)) == full
+
+
+def test_runner_uses_worker_processes() -> None:
+    """The default executor should be a process pool."""
+    games = list(make_runner(num_workers=2).iter_games(4, seed=0))
+
+    assert sorted(game.game_index for game in games) == [0, 1, 2, 3]
@@ -0,0 +1,93 @@
+"""Tests for the shared-memory evaluator input ring."""
+
+import multiprocessing
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from valanga.shared_input_ring import (  # noqa: E402
+    OutOfOrderReleaseError,
+    SharedInputRing,
+)
+
+
+def test_batches_are_consecutive_committed_slots() -> None:
+    """Batches should stop at the first uncommitted slot and at the ring end."""
+    with SharedInputRing((2,), np.float32, num_slots=4) as ring:
+        first = ring.reserve()
+        second = ring.reserve()
+        assert first is not None
+        assert second is not None
+        second.array[:] = [3, 4]
+        ring.commit(second.ticket)
+
+        assert ring.acquire_batch(timeout=0.01) is None
+
+        first.array[:] = [1, 2]
+        ring.commit(first.ticket)
+        ring.write([5, 6])
+        batch = ring.acquire_batch(max_size=2)
+        assert batch is not None
+        assert list(batch.tickets) == [0, 1]
+        np.testing.assert_array_equal(batch.array, [[1, 2], [3, 4]])
+        assert not batch.array.flags.writeable
+
+        rest = ring.acquire_batch()
+        assert rest is not None
+        with pytest.raises(OutOfOrderReleaseError):
+            ring.release(rest)
+        ring.release(batch)
+        ring.release(rest)
+        assert ring.pending() == 0
+
+
+def test_full_ring_times_out_and_wraps_after_release() -> None:
+    """Producers should wait for free slots, and slots should be reused."""
+    with SharedInputRing((1,), np.int64, num_slots=2) as ring:
+        assert ring.write([0]) == 0
+        assert ring.write([1]) == 1
+        assert ring.reserve(timeout=0.01) is None
+
+        batch = ring.acquire_batch()
+        assert batch is not None
+        ring.release(batch)
+        assert ring.write([2]) == 2
+
+        wrapped = ring.acquire_batch()
+        assert wrapped is not None
+        assert wrapped.first_ticket == 2
+        np.testing.assert_array_equal(wrapped.array, [[2]])
+        ring.release(wrapped)
+
+
+def _produce(ring: SharedInputRing, worker: int, count: int) -> None:
+    """Write ``count`` inputs tagged with the worker index."""
+    for index in range(count):
+        ring.write([worker, index])
+    ring.close()
+
+
+def test_worker_processes_write_into_the_ring() -> None:
+    """Inputs written by other processes should reach the consumer intact."""
+    workers, count = 2, 20
+    context = multiprocessing.get_context("spawn")
+    with SharedInputRing((2,), np.int64, num_slots=8, mp_context=context) as ring:
+        processes = [
+            context.Process(target=_produce, args=(ring, worker, count))
+            for worker in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        received: list[tuple[int, int]] = []
+        while len(received) < workers * count:
+            batch = ring.acquire_batch(timeout=10)
+            assert batch is not None
+            received.extend(tuple(row) for row in batch.array.tolist())
+            ring.release(batch)
+        for process in processes:
+            process.join()
+
+    assert sorted(received) == [
+        (worker, index) for worker in range(workers) for index in range(count)
+    ]
@@ -0,0 +1,98 @@
+"""Tests for valanga.summary_index."""
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from valanga.checkpoint_store import UnknownNodeError  # noqa: E402
+from valanga.checkpoints import CheckpointStateSummary  # noqa: E402
+from valanga.summary_index import (  # noqa: E402
+    CheckpointSummaryIndex,
+    SummaryLengthMismatchError,
+)
+
+
+def build_index() -> CheckpointSummaryIndex:
+    """Return a small index with mixed summaries."""
+    index = CheckpointSummaryIndex(capacity=2)
+    index.extend(
+        [10, 11, 12, 13],
+        [
+            CheckpointStateSummary(tag="a", is_terminal=False),
+            CheckpointStateSummary(tag="b", is_terminal=True),
+            CheckpointStateSummary(tag="a", is_terminal=True),
+            CheckpointStateSummary(),
+        ],
+    )
+    index.append(14, CheckpointStateSummary(tag=("tuple", 1), is_terminal=False))
+    return index
+
+
+def test_filters_return_node_ids() -> None:
+    """Tag and terminal filters should return the matching node ids."""
+    index = build_index()
+
+    assert len(index) == 5
+    np.testing.assert_array_equal(index.node_ids_with_tag("a"), [10, 12])
+    np.testing.assert_array_equal(index.node_ids_with_tag(("tuple", 1)), [14])
+    assert index.node_ids_with_tag("missing").size == 0
+    np.testing.assert_array_equal(index.node_ids_where_terminal(), [11, 12])
+    np.testing.assert_array_equal(index.node_ids_where_terminal(False), [10, 14])
+    np.testing.assert_array_equal(index.node_ids_where_terminal(None), [13])
+
+
+def test_summary_lookup() -> None:
+    """Summaries should be rebuilt from the columns."""
+    index = build_index()
+
+    assert index.summary_of(11) == CheckpointStateSummary(tag="b", is_terminal=True)
+    assert index.summary_of(13) == CheckpointStateSummary()
+    with pytest.raises(UnknownNodeError):
+        index.summary_of(99)
+
+
+def test_saved_index_reopens_memory_mapped(tmp_path: Path) -> None:
+    """A saved index should be queryable through memory maps and appendable."""
+    build_index().save(tmp_path)
+
+    reopened = CheckpointSummaryIndex.load(tmp_path)
+
+    assert isinstance(reopened.node_ids.base, np.memmap) or isinstance(
+        reopened.node_ids, np.memmap
+    )
+    np.testing.assert_array_equal(reopened.node_ids_with_tag("a"), [10, 12])
+    reopened.append(15, CheckpointStateSummary(tag="a", is_terminal=None))
+    np.testing.assert_array_equal(reopened.node_ids_with_tag("a"), [10, 12, 15])
+
+
+def test_bulk_append_requires_matching_lengths() -> None:
+    """Each node id needs exactly one summary."""
+    with pytest.raises(SummaryLengthMismatchError):
+        CheckpointSummaryIndex().extend([1, 2], [CheckpointStateSummary()])
+
+
+def test_items_yield_every_row() -> None:
+    """Rows should be iterated with their rebuilt summaries."""
+    items = list(build_index().items())
+
+    assert [node_id for node_id, _ in items] == [10, 11, 12, 13, 14]
+    assert items[1] == (11, CheckpointStateSummary(tag="b", is_terminal=True))
+
+
+def test_reindexed_nodes_only_match_their_latest_summary(tmp_path: Path) -> None:
+    """Superseded rows should no longer answer tag or terminal queries."""
+    index = build_index()
+    index.append(10, CheckpointStateSummary(tag="b", is_terminal=True))
+
+    np.testing.assert_array_equal(index.node_ids_with_tag("a"), [12])
+    np.testing.assert_array_equal(index.node_ids_with_tag("b"), [11, 10])
+    np.testing.assert_array_equal(index.node_ids_where_terminal(False), [14])
+    assert index.summary_of(10) == CheckpointStateSummary(tag="b", is_terminal=True)
+
+    index.save(tmp_path)
+    index.save(tmp_path)
+    reopened = CheckpointSummaryIndex.load(tmp_path)
+    np.testing.assert_array_equal(reopened.node_ids_with_tag("a"), [12])
+    assert not list(tmp_path.glob("*.tmp"))
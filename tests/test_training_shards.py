@@ -0,0 +1,134 @@
+"""Tests for valanga.training_shards."""
+
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from valanga.evaluations import Certainty, Value  # noqa: E402
+from valanga.policy import BranchPolicy  # noqa: E402
+from valanga.training_shards import (  # noqa: E402
+    IncompatibleShardLayoutError,
+    NonIntegerBranchKeyError,
+    PolicyPositionOutOfRangeError,
+    TrainingShardReader,
+    TrainingShardWriter,
+)
+
+
+def write_samples(writer: TrainingShardWriter, start: int, stop: int) -> None:
+    """Write samples whose every column derives from the sample number."""
+    for number in range(start, stop):
+        certainty = Certainty.TERMINAL if number % 2 else Certainty.ESTIMATE
+        writer.write(
+            np.full((2, 3), number),
+            Value(score=number / 10, certainty=certainty),
+            BranchPolicy(probs={number % 4: 0.75, (number + 1) % 4: 0.25}),
+        )
+
+
+def test_samples_round_trip_across_shards(tmp_path: Path) -> None:
+    """Samples should be readable back from several shards, partial included."""
+    with TrainingShardWriter(
+        tmp_path, input_shape=(2, 3), policy_size=4, samples_per_shard=4
+    ) as writer:
+        write_samples(writer, 0, 10)
+        assert len(writer) == 10
+
+    reader = TrainingShardReader(tmp_path)
+
+    assert len(reader) == 10
+    assert reader.num_shards == 3
+    assert len(reader.shard(2)) == 2
+    sample = reader[6]
+    assert sample.inputs.shape == (1, 2, 3)
+    assert np.all(sample.inputs == 6)
+    assert sample.scores[0] == pytest.approx(0.6)
+    assert sample.certainty(0) is Certainty.ESTIMATE
+    assert sample.policies[0].tolist() == [0.0, 0.0, 0.75, 0.25]
+
+    batch = reader.gather([9, 0, 5, -1])
+    assert batch.inputs[:, 0, 0].tolist() == [9, 0, 5, 9]
+    assert [batch.certainty(row) for row in range(4)] == [
+        Certainty.TERMINAL,
+        Certainty.ESTIMATE,
+        Certainty.TERMINAL,
+        Certainty.TERMINAL,
+    ]
+    with pytest.raises(IndexError):
+        reader.gather([10])
+
+
+def test_reader_memory_maps_the_shards(tmp_path: Path) -> None:
+    """Shard columns should be read-only memory maps."""
+    with TrainingShardWriter(
+        tmp_path, input_shape=(2, 3), policy_size=4, samples_per_shard=8
+    ) as writer:
+        write_samples(writer, 0, 3)
+
+    columns = TrainingShardReader(tmp_path).shard(0)
+
+    assert isinstance(columns.inputs.base, np.memmap)
+    assert not columns.scores.flags.writeable
+
+
+def test_writers_append_to_existing_datasets(tmp_path: Path) -> None:
+    """A new writer should append shards with the same layout."""
+    with TrainingShardWriter(
+        tmp_path, input_shape=(2, 3), policy_size=4, samples_per_shard=4
+    ) as writer:
+        write_samples(writer, 0, 3)
+    with TrainingShardWriter(
+        tmp_path, input_shape=(2, 3), policy_size=4, samples_per_shard=4
+    ) as writer:
+        write_samples(writer, 3, 8)
+
+    reader = TrainingShardReader(tmp_path)
+
+    assert reader.num_shards == 3
+    assert reader.gather(range(8)).inputs[:, 0, 0].tolist() == list(range(8))
+    with pytest.raises(IncompatibleShardLayoutError):
+        TrainingShardWriter(tmp_path, input_shape=(3, 2), policy_size=4)
+
+
+def test_failed_policy_writes_leave_no_partial_row(tmp_path: Path) -> None:
+    """A policy key without position should not leak into the next sample."""
+    with TrainingShardWriter(tmp_path, input_shape=(1,), policy_size=4) as writer:
+        with pytest.raises(NonIntegerBranchKeyError):
+            writer.write(
+                np.zeros(1),
+                Value(score=0.0, certainty=Certainty.ESTIMATE),
+                BranchPolicy(probs={1: 0.5, "b2": 0.5}),
+            )
+        writer.write(np.ones(1), Value(score=1.0, certainty=Certainty.ESTIMATE))
+        assert len(writer) == 1
+
+    assert TrainingShardReader(tmp_path)[0].policies[0].tolist() == [0.0] * 4
+
+
+@pytest.mark.parametrize("position", [-1, 4])
+def test_policy_positions_must_fit_the_vector(tmp_path: Path, position: int) -> None:
+    """Keys mapping outside of the policy vector should not wrap around."""
+    with TrainingShardWriter(tmp_path, input_shape=(1,), policy_size=4) as writer:
+        with pytest.raises(PolicyPositionOutOfRangeError):
+            writer.write(
+                np.zeros(1),
+                Value(score=0.0, certainty=Certainty.ESTIMATE),
+                BranchPolicy(probs={position: 1.0}),
+            )
+        assert len(writer) == 0
+
+
+def test_partial_shards_are_truncated_on_close(tmp_path: Path) -> None:
+    """A shard closed early should only take the room of its samples."""
+    with TrainingShardWriter(
+        tmp_path, input_shape=(2, 3), policy_size=4, samples_per_shard=8
+    ) as writer:
+        write_samples(writer, 0, 11)
+
+    shapes = [np.load(path, mmap_mode="r").shape for path in tmp_path.glob("*.npy")]
+    assert sorted(shape[0] for shape in shapes) == [3] * 4 + [8] * 4
+    reader = TrainingShardReader(tmp_path)
+    assert len(reader) == 11
+    assert reader[10].inputs.tolist() == [np.full((2, 3), 10).tolist()]
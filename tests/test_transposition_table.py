@@ -0,0 +1,106 @@
+"""Tests for the bounded transposition table."""
+
+import pytest
+
+import valanga
+from valanga.evaluations import Certainty, Value
+from valanga.transposition_table import ReplacementPolicy, TranspositionTable
+
+
+def estimate(score: float) -> Value:
+    """Return an estimated value with the given score."""
+    return Value(score=score, certainty=Certainty.ESTIMATE)
+
+
+def test_probe_hits_and_misses_are_counted() -> None:
+    """Stored tags should be found and absent tags should count as misses."""
+    table = TranspositionTable(max_entries=8)
+
+    assert table.store("a", estimate(0.5), depth=2) is True
+    entry = table.probe("a")
+
+    assert entry is not None
+    assert entry.value == estimate(0.5)
+    assert entry.depth == 2
+    assert table.probe("b") is None
+    assert table.stats.hits == 1
+    assert table.stats.misses == 1
+    assert table.stats.hit_rate == pytest.approx(0.5)
+
+
+def test_probe_respects_min_depth_unless_value_is_certain() -> None:
+    """Shallow estimates should miss while certain values always hit."""
+    table = TranspositionTable(max_entries=8)
+    table.store("shallow", estimate(0.1), depth=1)
+    table.store("mate", Value(score=1.0, certainty=Certainty.TERMINAL), depth=0)
+
+    assert table.probe("shallow", min_depth=3) is None
+    assert table.probe("mate", min_depth=3) is not None
+
+
+def test_table_never_exceeds_its_budget() -> None:
+    """The number of entries should stay within the configured budget."""
+    table = TranspositionTable(
+        max_entries=4, bucket_size=2, policy=ReplacementPolicy.ALWAYS_REPLACE
+    )
+
+    for tag in range(100):
+        table.store(tag, estimate(float(tag)), depth=0)
+
+    assert len(table) == table.capacity == 4
+    assert table.stats.evictions == 96
+
+
+def test_depth_preferred_rejects_shallower_entries() -> None:
+    """A full depth-preferred bucket should keep its deeper entries."""
+    table = TranspositionTable(max_entries=1, bucket_size=1)
+    table.store("deep", estimate(0.0), depth=5)
+
+    assert table.store("shallow", estimate(1.0), depth=1) is False
+    assert "deep" in table
+    assert table.store("deeper", estimate(2.0), depth=6) is True
+    assert "deep" not in table
+    assert table.stats.rejections == 1
+    assert table.stats.evictions == 1
+
+
+def test_always_replace_accepts_shallower_entries() -> None:
+    """An always-replace bucket should accept every store."""
+    table = TranspositionTable(
+        max_entries=1, bucket_size=1, policy=ReplacementPolicy.ALWAYS_REPLACE
+    )
+    table.store("deep", estimate(0.0), depth=5)
+
+    assert table.store("shallow", estimate(1.0), depth=1) is True
+    assert "shallow" in table
+    assert "deep" not in table
+
+
+def test_clear_empties_the_slots_in_place() -> None:
+    """Clearing should drop entries but keep the slot list and the counters."""
+    table = TranspositionTable(max_entries=4, bucket_size=2)
+    for tag in range(4):
+        table.store(tag, estimate(float(tag)), depth=1)
+    table.probe(0)
+    slots = table._slots
+
+    table.clear()
+
+    assert len(table) == 0
+    assert table.probe(0) is None
+    assert table._slots is slots
+    assert table.capacity == 4
+    assert table.stats.hits == 1
+    assert table.store("again", estimate(0.0), depth=0) is True
+
+
+def test_invalid_budget_is_rejected() -> None:
+    """A budget smaller than one bucket should be refused."""
+    with pytest.raises(ValueError):
+        TranspositionTable(max_entries=2, bucket_size=4)
+
+
+def test_transposition_table_is_exported() -> None:
+    """The table and its policy enum should be available from the package."""
+    assert valanga.TranspositionTable is TranspositionTable
+    assert valanga.ReplacementPolicy is ReplacementPolicy
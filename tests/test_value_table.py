@@ -0,0 +1,92 @@
+"""Tests for valanga.value_table."""
+
+from enum import Enum, auto
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from valanga.evaluations import Certainty, Value  # noqa: E402
+from valanga.game import Color  # noqa: E402
+from valanga.over_event import Outcome, OverEvent  # noqa: E402
+from valanga.value_table import ValueTable  # noqa: E402
+
+
+class DummyTermination(Enum):
+    """Small enum used to build terminal events."""
+
+    CHECKMATE = auto()
+
+
+def white_mate() -> OverEvent[Color]:
+    """Return a fresh white checkmate event."""
+    return OverEvent(
+        outcome=Outcome.WIN,
+        termination=DummyTermination.CHECKMATE,
+        winner=Color.WHITE,
+    )
+
+
+def test_values_round_trip_through_the_table() -> None:
+    """Rows should materialize back into equal values."""
+    values = [
+        Value(score=0.25, certainty=Certainty.ESTIMATE),
+        Value(score=1.0, certainty=Certainty.TERMINAL, over_event=white_mate()),
+        Value(score=0.5, certainty=Certainty.FORCED, line=["e4", "e5"]),
+    ]
+    table = ValueTable(capacity=1)
+
+    table.extend(values)
+
+    assert len(table) == 3
+    assert list(table) == values
+    assert table[-1] == values[-1]
+
+
+def test_identical_over_events_are_stored_once() -> None:
+    """Equal terminal events should share one interned index."""
+    table = ValueTable()
+    for _ in range(5):
+        table.append(
+            Value(score=1.0, certainty=Certainty.TERMINAL, over_event=white_mate())
+        )
+    table.append(Value(score=0.0, certainty=Certainty.ESTIMATE))
+
+    assert len(table.over_events) == 1
+    np.testing.assert_array_equal(table.over_event_indices, [0, 0, 0, 0, 0, -1])
+
+
+def test_arrays_support_vectorized_updates() -> None:
+    """Writes through the score array should be visible in materialized rows."""
+    table = ValueTable(score_dtype=np.float32)
+    table.extend(Value(score=float(i), certainty=Certainty.ESTIMATE) for i in range(4))
+
+    table.scores[:] *= -1
+
+    assert table.scores.dtype == np.float32
+    assert [value.score for value in table] == [0.0, -1.0, -2.0, -3.0]
+    estimate_code = ValueTable.certainty_code(Certainty.ESTIMATE)
+    assert (table.certainty_codes == estimate_code).all()
+
+
+def test_views_read_and_write_lazily() -> None:
+    """Views should reflect and update the underlying row."""
+    table = ValueTable()
+    table.append(Value(score=0.0, certainty=Certainty.ESTIMATE))
+    view = table.view(0)
+
+    view.score = 3.5
+    assert table[0].score == 3.5
+
+    view.set(Value(score=-1.0, certainty=Certainty.TERMINAL, over_event=white_mate()))
+    assert view.certainty is Certainty.TERMINAL
+    assert view.over_event == white_mate()
+    assert view.get() == table[0]
+
+
+def test_out_of_range_rows_raise() -> None:
+    """Unfilled rows should not be readable."""
+    table = ValueTable(capacity=8)
+
+    with pytest.raises(IndexError):
+        table[0]
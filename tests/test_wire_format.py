@@ -0,0 +1,184 @@
+"""Tests for the binary wire format."""
+
+import pickle
+import struct
+from enum import Enum, auto
+
+import pytest
+
+from valanga.dynamics import Transition
+from valanga.evaluations import Certainty, Value
+from valanga.game import Color
+from valanga.over_event import Outcome, OverEvent
+from valanga.policy import BranchPolicy, Recommendation
+from valanga.wire_format import (
+    EnumFieldCodec,
+    IntFieldCodec,
+    MissingFieldCodecError,
+    StrFieldCodec,
+    UnsupportedWireObjectError,
+    UnsupportedWireVersionError,
+    WireCodec,
+    WireFormatError,
+)
+
+
+class Termination(Enum):
+    """Toy termination reasons."""
+
+    CHECKMATE = auto()
+    STALEMATE = auto()
+
+
+class CountsCodec:
+    """Encode a dict of string counts, standing in for ``info``."""
+
+    def encode(self, value: dict[str, int], out: bytearray) -> None:
+        """Append the items."""
+        out += struct.pack("<I", len(value))
+        for key, count in value.items():
+            StrFieldCodec().encode(key, out)
+            IntFieldCodec().encode(count, out)
+
+    def decode(self, buffer: memoryview, offset: int) -> tuple[dict[str, int], int]:
+        """Read the items."""
+        (size,) = struct.unpack_from("<I", buffer, offset)
+        offset += 4
+        value: dict[str, int] = {}
+        for _ in range(size):
+            key, offset = StrFieldCodec().decode(buffer, offset)
+            value[key], offset = IntFieldCodec().decode(buffer, offset)
+        return value, offset
+
+
+CODEC = WireCodec(
+    StrFieldCodec(),
+    role=EnumFieldCodec(Color),
+    termination=EnumFieldCodec(Termination),
+    state=IntFieldCodec(),
+    modifications=IntFieldCodec(),
+    info=CountsCodec(),
+)
+
+WIN = OverEvent(Outcome.WIN, Termination.CHECKMATE, Color.WHITE)
+# Magic, version and object count.
+HEADER_SIZE = 7
+
+
+def test_mixed_batch_round_trips() -> None:
+    """Every supported object should survive a batch round trip."""
+    objs = [
+        Value(score=0.25, certainty=Certainty.ESTIMATE),
+        Value(score=1.0, certainty=Certainty.FORCED, over_event=WIN, line=["e4", "e5"]),
+        OverEvent(Outcome.DRAW, Termination.STALEMATE),
+        Recommendation(
+            recommended_name="e4",
+            evaluation=Value(score=0.5, certainty=Certainty.ESTIMATE),
+            policy=BranchPolicy(probs={"e4": 0.75, "d4": 0.25}),
+            branch_evals={"e4": Value(score=0.5, certainty=Certainty.ESTIMATE)},
+        ),
+        Recommendation(recommended_name="pass"),
+        Transition(next_state=7),
+        Transition(
+            next_state=8,
+            modifications=-1,
+            is_over=True,
+            over_event=WIN,
+            info={"nodes": 3},
+        ),
+    ]
+
+    buffer = CODEC.encode_many(objs)
+
+    assert CODEC.decode_many(memoryview(buffer)) == objs
+    assert len(buffer) < len(pickle.dumps(objs))
+
+
+def test_decoded_over_events_are_interned() -> None:
+    """Decoded events should reuse the shared flyweights."""
+    first = CODEC.decode(CODEC.encode(WIN))
+    second = CODEC.decode(CODEC.encode(WIN))
+
+    assert first is second
+    assert first == WIN
+
+
+def test_missing_field_codecs_are_reported() -> None:
+    """Present fields without a codec should fail loudly."""
+    codec = WireCodec()
+
+    assert codec.decode(codec.encode(OverEvent(Outcome.DRAW))) == OverEvent(
+        Outcome.DRAW
+    )
+    with pytest.raises(MissingFieldCodecError):
+        codec.encode(WIN)
+    with pytest.raises(MissingFieldCodecError):
+        codec.encode(Value(score=0.0, certainty=Certainty.ESTIMATE, line=["a"]))
+
+
+def test_foreign_buffers_are_rejected() -> None:
+    """Buffers with another magic or version should not be decoded."""
+    buffer = bytearray(CODEC.encode(Value(score=0.0, certainty=Certainty.ESTIMATE)))
+
+    with pytest.raises(WireFormatError):
+        CODEC.decode_many(b"XX" + bytes(buffer[2:]))
+    buffer[2] = 99
+    with pytest.raises(UnsupportedWireVersionError):
+        CODEC.decode_many(buffer)
+
+
+def test_truncated_and_corrupt_buffers_raise_wire_errors() -> None:
+    """Decoding a damaged buffer should only ever raise ``WireFormatError``."""
+    buffer = CODEC.encode_many(
+        [
+            Value(score=1.0, certainty=Certainty.FORCED, over_event=WIN, line=["e4"]),
+            Recommendation(recommended_name="e4"),
+            Transition(next_state=8, info={"nodes": 3}),
+        ]
+    )
+
+    for end in range(len(buffer)):
+        with pytest.raises(WireFormatError):
+            CODEC.decode_many(buffer[:end])
+    corrupt = bytearray(buffer)
+    # The certainty code of the first value, after its tag and score.
+    corrupt[HEADER_SIZE + 1 + 8] = 0xFF
+    with pytest.raises(WireFormatError):
+        CODEC.decode_many(corrupt)
+
+
+def test_unsupported_objects_are_refused() -> None:
+    """Encoding an object the format does not carry should fail clearly."""
+    with pytest.raises(UnsupportedWireObjectError):
+        CODEC.encode_many(["e4"])  # type: ignore[list-item]
+
+
+def test_inconsistent_over_events_raise_wire_errors() -> None:
+    """A damaged outcome should not be interned with a stray winner."""
+    buffer = bytearray(CODEC.encode(WIN))
+    # The outcome code of the event, right after its tag.
+    buffer[HEADER_SIZE + 1] = list(Outcome).index(Outcome.LOSS)
+
+    with pytest.raises(WireFormatError):
+        CODEC.decode_many(buffer)
+    buffer[HEADER_SIZE + 1] = list(Outcome).index(Outcome.WIN)
+    buffer[HEADER_SIZE + 2] = 0xFF
+    with pytest.raises(WireFormatError):
+        CODEC.decode_many(buffer)
+
+
+def test_trailing_bytes_are_rejected() -> None:
+    """Bytes after the declared objects mean a damaged or spliced buffer."""
+    buffer = CODEC.encode(Value(score=0.0, certainty=Certainty.ESTIMATE))
+
+    with pytest.raises(WireFormatError):
+        CODEC.decode_many(buffer + b"\x00")
+
+
+def test_decode_needs_a_batch_of_one() -> None:
+    """``decode`` should refuse batches holding another number of objects."""
+    value = Value(score=0.0, certainty=Certainty.ESTIMATE)
+
+    for objs in ([], [value, value]):
+        with pytest.raises(WireFormatError):
+            CODEC.decode(CODEC.encode_many(objs))